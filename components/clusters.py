@@ -0,0 +1,128 @@
+"""
+텍스처/용도 군집 둘러보기 컴포넌트
+- 사이드바에서 "텍스처/용도 군집" 모드를 고르면 카테고리 검색 대신 표시
+- 군집 목록: 군집 이름(특징 키워드) + 상품 수 + 대표 상품(군집 중심과 가장 가까운 상품)
+- 군집 선택: 미리 계산된 cluster_id로 상품을 고름 (유사도 계산 없음)
+"""
+
+import streamlit as st
+import pandas as pd
+
+from components.product_cards import render_search_results_grid
+from services.product_clusters import (
+    cluster_products,
+    cluster_representatives,
+    load_product_clusters,
+)
+from utils.data_utils import apply_filters
+
+BROWSE_CATEGORY = "카테고리"
+BROWSE_CLUSTER = "텍스처/용도 군집"
+# 군집 목록 카드에 보여 줄 대표 상품 수
+REPRESENTATIVE_SIZE = 3
+# 군집 선택 시 중심과 가까운 순으로 보여 줄 최대 상품 수
+CLUSTER_VIEW_SIZE = 60
+# 군집 목록 열 수
+CLUSTER_COLUMNS = 3
+
+
+def has_clusters(df: pd.DataFrame) -> bool:
+    """군집 배정(cluster-build 결과)이 붙어 있는지"""
+    return "cluster_id" in df.columns and bool((df["cluster_id"] >= 0).any())
+
+
+def is_cluster_mode() -> bool:
+    """사이드바에서 군집 둘러보기를 골랐는지"""
+    return st.session_state.get("browse_mode") == BROWSE_CLUSTER
+
+
+def _select_cluster(cluster_id):
+    st.session_state["selected_cluster"] = cluster_id
+    st.session_state["category_pages"] = {}
+
+
+def _render_cluster_list(df: pd.DataFrame, summary: pd.DataFrame):
+    """군집 목록 (큰 군집 순, 대표 상품 이름 포함)"""
+    st.markdown("## 🧴 텍스처/용도별 둘러보기")
+    st.caption("상품 임베딩이 비슷한 상품끼리 묶은 군집입니다. 이름은 군집에서 특히 많이 언급된 키워드예요.")
+
+    representatives = cluster_representatives(df, REPRESENTATIVE_SIZE)
+    names_by_cluster = representatives.groupby("cluster_id")["product_name"].apply(list)
+
+    for i in range(0, len(summary), CLUSTER_COLUMNS):
+        cols = st.columns(CLUSTER_COLUMNS)
+        for j, row in enumerate(summary.iloc[i : i + CLUSTER_COLUMNS].itertuples()):
+            with cols[j]:
+                with st.container(border=True):
+                    st.markdown(f"**{row.label}**")
+                    st.caption(f"{row.size:,}개 상품")
+                    for name in names_by_cluster.get(row.cluster_id, []):
+                        st.markdown(
+                            f"<div style='font-size:13px;white-space:nowrap;overflow:hidden;"
+                            f"text-overflow:ellipsis;'>· {name}</div>",
+                            unsafe_allow_html=True,
+                        )
+                    st.button(
+                        "둘러보기",
+                        key=f"cluster_select_{row.cluster_id}",
+                        on_click=_select_cluster,
+                        args=(int(row.cluster_id),),
+                        use_container_width=True,
+                    )
+
+
+def render_cluster_browser(
+    df: pd.DataFrame,
+    selected_sub_cat: list,
+    selected_skin: list,
+    min_rating: float,
+    max_rating: float,
+    min_price: int,
+    max_price: int,
+    on_select_callback,
+):
+    """
+    군집 둘러보기 렌더링 (군집 목록 또는 선택한 군집의 상품)
+
+    선택한 군집의 상품에는 사이드바 조건(카테고리/피부 타입/평점/가격)을 그대로 적용한다.
+    """
+    clusters = load_product_clusters()
+    if clusters is None or not has_clusters(df):
+        st.info("텍스처/용도 군집이 아직 준비되지 않았어요. 카테고리로 찾아보세요.")
+        return
+
+    summary = clusters.summary()
+    cluster_id = st.session_state.get("selected_cluster")
+    if cluster_id is None or cluster_id not in set(summary["cluster_id"]):
+        _render_cluster_list(df, summary)
+        return
+
+    label = summary.loc[summary["cluster_id"] == cluster_id, "label"].iloc[0]
+    col_title, col_back = st.columns([8, 2], vertical_alignment="center")
+    with col_title:
+        st.markdown(f"## 🧴 {label}")
+    with col_back:
+        st.button(
+            "← 군집 목록",
+            key="cluster_back",
+            on_click=_select_cluster,
+            args=(None,),
+            use_container_width=True,
+        )
+
+    members = apply_filters(
+        cluster_products(df, cluster_id),
+        selected_sub_cat,
+        selected_skin,
+        min_rating,
+        max_rating,
+        min_price,
+        max_price,
+    ).head(CLUSTER_VIEW_SIZE)
+
+    if members.empty:
+        st.warning("조건에 맞는 상품이 없어요.🥺")
+        return
+
+    category_count = members["sub_category"].nunique(dropna=False)
+    render_search_results_grid(members, category_count, on_select_callback)
@@ -0,0 +1,172 @@
+"""
+최근 본 상품 기반 추천 컴포넌트
+- 세션별 최근 본 상품 목록과 임베딩 합(중심 벡터)을 상품 선택 시마다 증분 갱신
+- 메인 화면 "회원님을 위한 추천": 중심 벡터로 전체 상품 점수 계산
+  (기록이 바뀔 때만 행렬-벡터 곱 1회, 그 외에는 세션 캐시 사용)
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from services.catalog_version import get_catalog_version
+from services.recommend_similar_products import (
+    get_product_vector,
+    recommend_for_vector,
+)
+from components.product_cards import render_popular_product_card
+
+# 최근 본 상품 최대 개수
+HISTORY_SIZE = 20
+# "회원님을 위한 추천" 표시 개수
+HISTORY_RECO_SIZE = 5
+
+
+def _init_history_state():
+    defaults = {
+        "view_history": [],
+        "view_vector_sum": None,
+        "view_vector_version": None,
+        "view_history_version": 0,
+        "history_reco_cache": None,
+        "history_reco_key": None,
+    }
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+
+def _product_vector(product_id: str) -> np.ndarray | None:
+    """상품 임베딩 조회 (저장소 로드 실패 시 None → 기록만 남김)"""
+    try:
+        return get_product_vector(product_id)
+    except Exception as e:
+        print(f"[경고] 상품 벡터 조회 실패 ({product_id}): {e}")
+        return None
+
+
+def _rebuild_vector_sum(history: list):
+    """기록 전체로 임베딩 합 다시 계산 (카탈로그 버전이 바뀐 경우)"""
+    vectors = [_product_vector(pid) for pid in history]
+    vectors = [v for v in vectors if v is not None]
+    st.session_state["view_vector_sum"] = (
+        np.sum(vectors, axis=0, dtype=np.float32) if vectors else None
+    )
+    st.session_state["view_vector_version"] = get_catalog_version()
+
+
+def record_view(product_id: str):
+    """
+    상품 조회 기록 추가 (가장 최근 순)
+
+    새 상품이면 임베딩을 합에 더하고, 최대 개수를 넘으면 가장 오래된 상품의 임베딩을 뺀다.
+    이미 기록에 있는 상품은 순서만 앞으로 옮긴다. (중심 벡터는 그대로)
+    """
+    if not product_id:
+        return
+    _init_history_state()
+
+    history = st.session_state["view_history"]
+    if history and history[0] == product_id:
+        return
+    if product_id in history:
+        history.remove(product_id)
+        history.insert(0, product_id)
+        return
+
+    if st.session_state["view_vector_version"] != get_catalog_version():
+        _rebuild_vector_sum(history)
+
+    vector_sum = st.session_state["view_vector_sum"]
+    vector = _product_vector(product_id)
+    if vector is not None:
+        vector_sum = vector.copy() if vector_sum is None else vector_sum + vector
+
+    history.insert(0, product_id)
+    for evicted in history[HISTORY_SIZE:]:
+        evicted_vector = _product_vector(evicted)
+        if evicted_vector is not None and vector_sum is not None:
+            vector_sum = vector_sum - evicted_vector
+    del history[HISTORY_SIZE:]
+
+    st.session_state["view_vector_sum"] = vector_sum
+    st.session_state["view_history_version"] += 1
+
+
+def get_history_centroid() -> np.ndarray | None:
+    """최근 본 상품 임베딩의 정규화된 중심 벡터 (기록이 없으면 None)"""
+    _init_history_state()
+    if st.session_state["view_vector_version"] != get_catalog_version():
+        _rebuild_vector_sum(st.session_state["view_history"])
+
+    vector_sum = st.session_state["view_vector_sum"]
+    if vector_sum is None:
+        return None
+    norm = np.linalg.norm(vector_sum)
+    if norm == 0:
+        return None
+    return vector_sum / norm
+
+
+def get_history_recommendations(
+    df: pd.DataFrame, top_n: int = HISTORY_RECO_SIZE
+) -> pd.DataFrame:
+    """
+    최근 본 상품 기반 추천 (이미 본 상품 제외)
+
+    결과는 (기록 버전, 카탈로그 버전)이 같으면 세션 캐시에서 재사용한다.
+
+    Returns:
+        추천 상품 DataFrame (점수순, 최대 top_n개)
+    """
+    _init_history_state()
+    history = st.session_state["view_history"]
+    if not history:
+        return pd.DataFrame()
+
+    cache_key = (st.session_state["view_history_version"], get_catalog_version(), top_n)
+    if st.session_state["history_reco_key"] == cache_key:
+        return st.session_state["history_reco_cache"]
+
+    centroid = get_history_centroid()
+    reco_df = pd.DataFrame()
+    if centroid is not None:
+        reco = recommend_for_vector(centroid, top_n=top_n, exclude_ids=history)
+        if reco.size > 0:
+            order = reco.to_frame()[["product_id", "reco_score", "similarity"]]
+            reco_df = order.merge(
+                df.drop_duplicates("product_id"), on="product_id", how="inner"
+            ).reset_index(drop=True)
+
+    st.session_state["history_reco_cache"] = reco_df
+    st.session_state["history_reco_key"] = cache_key
+    return reco_df
+
+
+def render_history_recommendations(df: pd.DataFrame, on_select_callback):
+    """
+    "회원님을 위한 추천" 섹션 렌더링 (최근 본 상품이 있을 때만)
+
+    Args:
+        df: 전체 상품 DataFrame
+        on_select_callback: 선택 콜백
+    """
+    try:
+        reco_df = get_history_recommendations(df)
+    except Exception as e:
+        st.error(f"최근 본 상품 기반 추천 로드 실패: {e}")
+        return
+
+    if reco_df.empty:
+        return
+
+    st.markdown("## 💝 최근 본 상품 기반 추천")
+
+    cols = st.columns(len(reco_df))
+    for i, (_, row) in enumerate(reco_df.iterrows()):
+        with cols[i]:
+            render_popular_product_card(
+                row, i, on_select_callback, key_prefix="history_select"
+            )
+
+    st.markdown("---")
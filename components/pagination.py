@@ -22,7 +22,7 @@ def calculate_pagination(
     """
     # 카테고리 개수 확인
     if "sub_category" in search_df.columns:
-        grouped = search_df.groupby("sub_category", dropna=False)
+        grouped = search_df.groupby("sub_category", dropna=False, observed=True)
         category_count = len(grouped)
     else:
         category_count = 1
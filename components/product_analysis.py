@@ -11,7 +11,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.load_data import rating_trend
 from services.athena_queries import fetch_representative_review_text
 from utils.data_utils import load_reviews_athena
-from services.recommend_similar_products import recommend_similar_products
+from services.reco_client import fetch_similar_products
+from components.recommendations import reco_cache_key
 
 
 def render_top_keywords(product_info: pd.Series):
@@ -163,6 +164,7 @@ def load_product_analysis_async(
     container_review,
     container_trend,
     skip_scroll_callback,
+    product_filter=None,
 ):
     """
     비동기로 대표 리뷰, 평점 추이, 추천 상품 로드
@@ -173,6 +175,7 @@ def load_product_analysis_async(
         container_review: 대표 리뷰 placeholder
         container_trend: 평점 추이 placeholder
         skip_scroll_callback: 스크롤 스킵 콜백
+        product_filter: 추천 사전 필터 (사이드바 조건)
     """
     # 초기 로딩 메시지 표시
     with container_review.container():
@@ -199,12 +202,14 @@ def load_product_analysis_async(
             future_to_type[f_trend] = "TREND"
 
         # 3. 추천 상품 요청 (캐시 체크)
-        if product_id and st.session_state.get("reco_target_product_id") != product_id:
+        reco_key = reco_cache_key(product_id, None, product_filter)
+        if product_id and st.session_state.get("reco_cache_key") != reco_key:
             f_reco = executor.submit(
-                recommend_similar_products,
+                fetch_similar_products,
                 product_id=product_id,
                 categories=None,
                 top_n=100,
+                product_filter=product_filter,
             )
             future_to_type[f_reco] = "RECO"
 
@@ -223,13 +228,8 @@ def load_product_analysis_async(
                     render_rating_trend(container_trend, result, skip_scroll_callback)
 
                 elif task_type == "RECO":
-                    reco_list = (
-                        result
-                        if isinstance(result, list)
-                        else [item for items in result.values() for item in items]
-                    )
-                    st.session_state["reco_cache"] = reco_list
-                    st.session_state["reco_target_product_id"] = product_id
+                    st.session_state["reco_cache"] = result
+                    st.session_state["reco_cache_key"] = reco_key
 
             except Exception as e:
                 if task_type == "REVIEW":
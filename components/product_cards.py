@@ -8,10 +8,12 @@
 import streamlit as st
 import pandas as pd
 
-from utils.data_utils import DEFAULT_IMAGE_URL
+from utils.data_utils import DEFAULT_IMAGE_URL, popular_products
 
 
-def render_popular_product_card(row: pd.Series, index: int, on_select_callback):
+def render_popular_product_card(
+    row: pd.Series, index: int, on_select_callback, key_prefix: str = "popular_select"
+):
     """
     인기 상품 카드 렌더링 (메인 화면 TOP 5용)
 
@@ -19,6 +21,7 @@ def render_popular_product_card(row: pd.Series, index: int, on_select_callback):
         row: 상품 정보
         index: 인덱스
         on_select_callback: 선택 버튼 클릭 시 콜백
+        key_prefix: 선택 버튼 key 접두어 (같은 화면의 다른 섹션과 구분)
     """
     with st.container(border=True):
         if row.get("image_url"):
@@ -56,7 +59,7 @@ def render_popular_product_card(row: pd.Series, index: int, on_select_callback):
         with btn_col:
             st.button(
                 "선택",
-                key=f"popular_select_{st.session_state.page}_{index}",
+                key=f"{key_prefix}_{st.session_state.page}_{index}",
                 on_click=on_select_callback,
                 args=(row.get("product_name", ""),),
                 use_container_width=True,
@@ -184,19 +187,8 @@ def render_popular_products(df: pd.DataFrame, on_select_callback):
     """
     st.markdown("## 🔥 인기 상품 TOP 5")
 
-    sort_cols = []
-    if "total_reviews" in df.columns:
-        sort_cols.append("total_reviews")
-    if "score" in df.columns:
-        sort_cols.append("score")
-
-    popular_df = (
-        df.sort_values(by=sort_cols, ascending=[False] * len(sort_cols))
-        .head(5)
-        .reset_index(drop=True)
-        if sort_cols
-        else df.head(5).reset_index(drop=True)
-    )
+    # 리뷰 많은 순 → 평점 높은 순 (카탈로그 버전별 미리 계산한 순서)
+    popular_df = popular_products(df, 5)
 
     cols = st.columns(len(popular_df)) if len(popular_df) > 0 else []
     for i, (_, row) in enumerate(popular_df.iterrows()):
@@ -220,7 +212,7 @@ def render_search_results_grid(
         on_select_callback: 선택 콜백
     """
     if "sub_category" in page_df.columns:
-        grouped = page_df.groupby("sub_category", dropna=False)
+        grouped = page_df.groupby("sub_category", dropna=False, observed=True)
 
         # 카테고리별 페이지 상태 초기화
         if "category_pages" not in st.session_state:
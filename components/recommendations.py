@@ -5,13 +5,48 @@
 import streamlit as st
 import pandas as pd
 
-from services.recommend_similar_products import recommend_similar_products
+from services.near_duplicates import collapse_duplicates
+from services.product_filter import ProductFilter
+from services.reco_client import fetch_similar_products
+from services.similarity_engine import ScoredProducts
+
+
+def reco_cache_key(
+    product_id: str,
+    selected_categories: list[str] | None,
+    product_filter: ProductFilter | None,
+) -> tuple:
+    """세션 추천 캐시 키 (상품, 카테고리, 사이드바 필터)"""
+    return (
+        product_id,
+        tuple(selected_categories) if selected_categories else None,
+        product_filter.key() if product_filter is not None else None,
+    )
+
+
+def _cached_reco(key: tuple):
+    """
+    세션에 저장된 추천 결과 재사용
+
+    카테고리별 상위 N개는 서로 독립이므로, 같은 상품/필터로 전체 카테고리를
+    계산해 둔 결과(비동기 선조회)는 특정 카테고리 요청에도 그대로 쓸 수 있다.
+    """
+    cached_key = st.session_state.get("reco_cache_key")
+    if cached_key is None:
+        return None
+    product_id, categories, filter_key = key
+    if cached_key[0] != product_id or cached_key[2] != filter_key:
+        return None
+    if cached_key[1] is not None and cached_key[1] != categories:
+        return None
+    return st.session_state.get("reco_cache")
 
 
 def get_recommendations(
     df: pd.DataFrame,
     selected_product: str,
     selected_categories: list[str] | None = None,
+    product_filter: ProductFilter | None = None,
 ) -> pd.DataFrame:
     """
     선택한 상품과 유사한 추천 상품 조회
@@ -19,6 +54,9 @@ def get_recommendations(
     Args:
         df: 전체 상품 DataFrame
         selected_product: 선택한 상품명
+        selected_categories: 추천을 볼 세부 카테고리
+        product_filter: 사이드바 조건 (피부 타입/평점/가격)
+            조건에 맞는 상품만 점수를 계산한다.
 
     Returns:
         추천 상품 DataFrame (최대 6개)
@@ -31,35 +69,23 @@ def get_recommendations(
 
     target_product_id = target_product.iloc[0]["product_id"]
 
-    cache_key = (target_product_id, tuple(selected_categories) if selected_categories else None)
+    cache_key = reco_cache_key(target_product_id, selected_categories, product_filter)
 
     # 캐시 확인
-    if st.session_state.get("reco_target_product_id") != target_product_id:
-        reco_results = recommend_similar_products(
+    reco = _cached_reco(cache_key)
+    if reco is None:
+        reco = fetch_similar_products(
             product_id=target_product_id,
             categories=selected_categories,
             top_n=100,
+            product_filter=product_filter,
         )
 
-        if isinstance(reco_results, list):
-            reco_list = reco_results
-        else:
-            reco_list = []
-            for _, items in reco_results.items():
-                reco_list.extend(items)
-
-        st.session_state["reco_cache"] = reco_list
-        st.session_state["reco_target_product_id"] = target_product_id
-    else:
-        reco_list = st.session_state.get("reco_cache", [])
-
-    if reco_list:
-        tmp_reco_df = pd.DataFrame(reco_list).rename(
-            columns={
-                "recommend_score": "reco_score",
-                "cosine_similarity": "similarity",
-            }
-        )
+        st.session_state["reco_cache"] = reco
+        st.session_state["reco_cache_key"] = cache_key
+
+    if isinstance(reco, ScoredProducts) and reco.size > 0:
+        tmp_reco_df = reco.to_frame()
 
         merged_df = df.merge(
             tmp_reco_df[["product_id", "reco_score", "similarity"]],
@@ -70,13 +96,19 @@ def get_recommendations(
         merged_df["similarity"] = merged_df["similarity"].fillna(0)
 
         merged_df = merged_df[merged_df["product_id"] != target_product_id]
+        if "dup_cluster" in merged_df.columns:
+            # 보고 있는 상품의 다른 구성(중복 상품)은 제외
+            target_cluster = target_product.iloc[0]["dup_cluster"]
+            merged_df = merged_df[merged_df["dup_cluster"] != target_cluster]
 
         if selected_categories:
             merged_df = merged_df[merged_df["sub_category"].isin(selected_categories)]
         reco_df_view = (
             merged_df.query("reco_score > 0")
+            # 중복 상품은 추천 점수가 가장 높은 하나만
+            .pipe(collapse_duplicates, best_by="reco_score")
             # .sort_values(by=["reco_score", "similarity"], ascending=[False, False])
-            .groupby("sub_category", group_keys=False)
+            .groupby("sub_category", group_keys=False, observed=True)
             .head(6)
         )
 
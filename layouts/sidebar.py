@@ -2,6 +2,15 @@ import streamlit as st
 import numpy as np
 import re
 
+from components.clusters import BROWSE_CATEGORY, BROWSE_CLUSTER, has_clusters
+from services.athena_client import get_setting
+from utils.data_utils import invalidate_prepared_catalog
+
+
+def is_catalog_admin() -> bool:
+    """관리자 배포 여부 (환경변수/secrets의 CATALOG_ADMIN)"""
+    return str(get_setting("CATALOG_ADMIN", "")).lower() in ("1", "true", "yes")
+
 
 # 사이드바 함수
 def sidebar(df):
@@ -11,6 +20,10 @@ def sidebar(df):
         st.session_state["search_keyword"] = ""
         st.session_state["page"] = 1
 
+        # 둘러보기 방식 초기화
+        st.session_state["browse_mode"] = BROWSE_CATEGORY
+        st.session_state["selected_cluster"] = None
+
         # 사이드바의 동적 체크박스(카테고리, 피부타입 등) 초기화
         for key in list(st.session_state.keys()):
             if key.startswith(("sub_", "skin_", "all_main_", "all_middle_")):
@@ -21,7 +34,27 @@ def sidebar(df):
 
         st.rerun()  # 즉시 반영을 위해 재실행
 
+    # 관리자: Athena 데이터 갱신을 5분 캐시 만료 전에 바로 반영
+    if is_catalog_admin() and st.sidebar.button(
+        "🔄 카탈로그 새로고침", use_container_width=True
+    ):
+        version = invalidate_prepared_catalog()
+        print(f"[안내] 카탈로그 새로고침 요청 (버전 {version})")
+        st.session_state["page"] = 1
+        st.rerun()
+
     st.sidebar.markdown("---")  # 구분선
+
+    # 둘러보기 방식 (임베딩 군집이 준비된 경우에만)
+    if has_clusters(df):
+        st.sidebar.radio(
+            "둘러보기",
+            [BROWSE_CATEGORY, BROWSE_CLUSTER],
+            key="browse_mode",
+            horizontal=True,
+        )
+        st.sidebar.markdown("---")
+
     st.sidebar.header("검색 조건")
 
     # 전체 카테고리 키 수집
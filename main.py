@@ -24,6 +24,9 @@ from components.product_cards import (
     render_recommendations_grid,
 )
 from components.recommendations import get_recommendations
+from components.clusters import is_cluster_mode, render_cluster_browser
+from components.history import record_view, render_history_recommendations
+from services.product_filter import ProductFilter
 from components.pagination import (
     calculate_pagination,
     init_page_state,
@@ -36,7 +39,7 @@ from components.pagination import (
 from utils.data_utils import (
     prepare_dataframe,
     get_options,
-    apply_filters,
+    filter_catalog,
     sort_products,
 )
 
@@ -52,8 +55,8 @@ def init_session_state():
         "product_search": "",
         "search_keyword": "",
         "page": 1,
-        "reco_cache": {},
-        "reco_target_product_id": None,
+        "reco_cache": None,
+        "reco_cache_key": None,
         "_skip_scroll_apply_once": False,
         "last_loaded_product_id": None,
     }
@@ -133,11 +136,38 @@ def main():
     search_text = get_search_text()
     is_initial = is_initial_state(selected_sub_cat, selected_skin)
 
+    # 추천 사전 필터 (카테고리는 추천 영역의 카테고리 선택을 따름)
+    reco_filter = ProductFilter(
+        skin_types=selected_skin or None,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+    # =========================
+    # 텍스처/용도 군집 둘러보기 (상품 미선택 시)
+    # =========================
+    if is_cluster_mode() and not selected_product:
+        render_cluster_browser(
+            df,
+            selected_sub_cat,
+            selected_skin,
+            min_rating,
+            max_rating,
+            min_price,
+            max_price,
+            select_product_from_reco,
+        )
+        css.set_css()
+        return
+
     # =========================
     # 인기 상품 TOP 5 (초기 상태)
     # =========================
     if is_initial:
         render_popular_products(df, select_product_from_reco)
+        render_history_recommendations(df, select_product_from_reco)
 
     # =========================
     # 제품 상세 정보 (선택 시)
@@ -171,8 +201,10 @@ def main():
                     container_review,
                     container_trend,
                     skip_scroll_apply_once,
+                    reco_filter,
                 )
                 st.session_state["last_loaded_product_id"] = product_id
+                record_view(product_id)
 
     # =========================
     # 추천/검색 헤더
@@ -255,7 +287,7 @@ def main():
         st.info("왼쪽 사이드바 또는 검색어를 입력하여 상품을 찾아보세요.")
     else:
         if not selected_product:
-            filtered_df = apply_filters(
+            filtered_df, catalog_rows = filter_catalog(
                 df,
                 selected_sub_cat,
                 selected_skin,
@@ -266,8 +298,10 @@ def main():
                 search_text,
             )
 
-            # 정렬 적용
-            search_df_view = sort_products(filtered_df, sort_option)
+            # 정렬 적용 (카탈로그 행 위치가 있으면 미리 계산한 순서 사용)
+            search_df_view = sort_products(
+                filtered_df, sort_option, catalog=df, positions=catalog_rows
+            )
 
             # 페이지네이션 계산
             items_page, total_pages, category_count = calculate_pagination(
@@ -313,7 +347,12 @@ def main():
         else:
             # 추천 상품 조회 및 출력
             with st.spinner("정보를 불러오는 중입니다..."):
-                reco_df_view = get_recommendations(df, selected_product, [selected_categories] if selected_categories else None)
+                reco_df_view = get_recommendations(
+                    df,
+                    selected_product,
+                    [selected_categories] if selected_categories else None,
+                    reco_filter,
+                )
 
             if sort_option == "추천순":
                 reco_df_view = reco_df_view.sort_values(
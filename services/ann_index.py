@@ -0,0 +1,236 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 - HNSW 그래프
+
+카테고리별로 HNSW 인덱스를 만들어 유사도 상위 후보만 빠르게 찾는다.
+- 빌드/검색 파라미터(M, ef_construction, ef_search) 조정 가능
+- 디스크에 저장하고 프로세스 시작 후 최초 사용 시 1회 로드
+- hnswlib가 없거나 인덱스가 카탈로그와 맞지 않으면 None → 정확 검색으로 대체
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.embedding_store import EmbeddingStore
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성
+    hnswlib = None
+
+DEFAULT_INDEX_DIR = "./data/ann_index"
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 200
+DEFAULT_EF_SEARCH = 128
+
+
+class AnnIndex:
+    """
+    카테고리별 HNSW 인덱스 묶음
+
+    라벨은 EmbeddingStore의 행 번호를 그대로 사용한다.
+    벡터는 행 정규화되어 있으므로 내적(ip) 공간 = 코사인 유사도.
+    """
+
+    def __init__(
+        self,
+        indexes: Dict[int, "hnswlib.Index"],
+        fingerprint: str,
+        vector_type: str,
+        params: Dict[str, int],
+    ):
+        self.indexes = indexes
+        self.fingerprint = fingerprint
+        self.vector_type = vector_type
+        self.params = params
+        self.set_ef(params["ef_search"])
+
+    def set_ef(self, ef_search: int):
+        """검색 시 후보 리스트 크기 설정 (클수록 정확, 느림)"""
+        self.params["ef_search"] = ef_search
+        for index in self.indexes.values():
+            index.set_ef(ef_search)
+
+    @classmethod
+    def build(
+        cls,
+        store: EmbeddingStore,
+        M: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        num_threads: int = -1,
+    ) -> "AnnIndex":
+        """저장소의 벡터로 카테고리별 인덱스 생성"""
+        if hnswlib is None:
+            raise ImportError("ANN 인덱스를 만들려면 hnswlib가 필요합니다.")
+
+        dim = store.dim
+        indexes = {}
+        for code in range(len(store.category_names)):
+            rows = np.flatnonzero((store.category_codes == code) & store.has_vector)
+            if len(rows) == 0:
+                continue
+
+            index = hnswlib.Index(space="ip", dim=dim)
+            index.init_index(
+                max_elements=len(rows),
+                M=M,
+                ef_construction=ef_construction,
+                random_seed=100,
+            )
+            index.add_items(store.vectors(rows), rows, num_threads=num_threads)
+            indexes[code] = index
+
+        params = {"M": M, "ef_construction": ef_construction, "ef_search": ef_search}
+        return cls(indexes, store.fingerprint, store.vector_type, params)
+
+    def save(self, index_dir: str = DEFAULT_INDEX_DIR):
+        """인덱스 파일과 메타데이터(meta.json) 저장"""
+        os.makedirs(index_dir, exist_ok=True)
+        for code, index in self.indexes.items():
+            index.save_index(os.path.join(index_dir, f"category_{code}.bin"))
+
+        meta = {
+            "fingerprint": self.fingerprint,
+            "vector_type": self.vector_type,
+            "params": self.params,
+            "categories": sorted(self.indexes),
+        }
+        with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(
+        cls, store: EmbeddingStore, index_dir: str = DEFAULT_INDEX_DIR
+    ) -> Optional["AnnIndex"]:
+        """
+        저장된 인덱스 로드
+
+        Returns:
+            AnnIndex 또는 None (hnswlib 없음 / 파일 없음 / 카탈로그 불일치)
+        """
+        meta_path = os.path.join(index_dir, "meta.json")
+        if hnswlib is None or not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if (
+            meta["fingerprint"] != store.fingerprint
+            or meta["vector_type"] != store.vector_type
+        ):
+            print("[경고] ANN 인덱스가 현재 카탈로그와 맞지 않아 사용하지 않습니다.")
+            return None
+
+        dim = store.dim
+        indexes = {}
+        for code in meta["categories"]:
+            index = hnswlib.Index(space="ip", dim=dim)
+            index.load_index(os.path.join(index_dir, f"category_{code}.bin"))
+            indexes[code] = index
+
+        return cls(indexes, meta["fingerprint"], meta["vector_type"], meta["params"])
+
+    def search(
+        self, target_vector: np.ndarray, category_codes: List[int], k: int
+    ) -> Optional[np.ndarray]:
+        """
+        카테고리별 유사도 상위 k개 후보 행 번호 검색
+
+        Returns:
+            후보 행 번호 배열, 검색 실패 시 None (정확 검색으로 대체)
+        """
+        query = np.asarray(target_vector, dtype=np.float32)[None, :]
+        candidates = []
+        for code in category_codes:
+            index = self.indexes.get(code)
+            if index is None:
+                continue
+            k_c = min(k, index.get_current_count())
+            try:
+                labels, _ = index.knn_query(query, k=k_c, num_threads=1)
+            except RuntimeError:
+                # ef/M이 너무 작아 k개를 채우지 못한 경우
+                return None
+            candidates.append(labels[0])
+
+        if not candidates:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(candidates).astype(np.int64)
+
+
+# =========================
+# 프로세스 공용 캐시
+# =========================
+_indexes: Dict[str, Optional[AnnIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ann_index(
+    store: EmbeddingStore, index_dir: str = DEFAULT_INDEX_DIR
+) -> Optional[AnnIndex]:
+    """저장소 버전별로 디스크의 ANN 인덱스를 1회만 로드"""
+    key = f"{store.vector_type}:{store.fingerprint}:{index_dir}"
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = AnnIndex.load(store, index_dir)
+        return _indexes[key]
+
+
+def ann_recall_report(
+    store: EmbeddingStore,
+    ann_index: AnnIndex,
+    n_queries: int = 200,
+    k: int = 10,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """
+    정확 검색 대비 ANN 검색의 recall@k / 지연시간 비교
+
+    쿼리 상품과 같은 카테고리 안에서 유사도 상위 k개를 비교한다.
+
+    Returns:
+        {"recall": ..., "exact_ms": ..., "ann_ms": ..., "n_queries": ...}
+    """
+    rng = np.random.default_rng(seed)
+    rows_with_vector = np.flatnonzero(store.has_vector)
+    queries = rng.choice(
+        rows_with_vector, size=min(n_queries, len(rows_with_vector)), replace=False
+    )
+
+    hits = 0
+    total = 0
+    exact_time = 0.0
+    ann_time = 0.0
+
+    for row in queries:
+        code = int(store.category_codes[row])
+        target = store.vector(row)
+
+        start = time.perf_counter()
+        cat_rows = np.flatnonzero((store.category_codes == code) & store.has_vector)
+        sims = store.vectors(cat_rows) @ target
+        k_c = min(k, len(cat_rows))
+        exact = cat_rows[np.argpartition(-sims, k_c - 1)[:k_c]]
+        exact_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = ann_index.search(target, [code], k_c)
+        ann_time += time.perf_counter() - start
+
+        if approx is not None:
+            hits += len(np.intersect1d(exact, approx))
+        total += k_c
+
+    n = max(len(queries), 1)
+    return {
+        "recall": hits / max(total, 1),
+        "exact_ms": exact_time / n * 1000,
+        "ann_ms": ann_time / n * 1000,
+        "n_queries": len(queries),
+    }
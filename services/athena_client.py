@@ -1,16 +1,47 @@
 # athena_client.py
-import streamlit as st
+import os
+from functools import lru_cache
+
 import awswrangler as wr
 import boto3
 
+_REQUIRED = object()
+
+
+def get_setting(name: str, default=_REQUIRED):
+    """
+    설정값 조회: 환경변수 → Streamlit secrets 순
+
+    대시보드 밖(추천 서비스 프로세스, 배치 CLI)에서는 환경변수만으로 동작하며
+    streamlit을 import하지 않는다.
+    """
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+
+    try:
+        import streamlit as st
+
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        # streamlit 미설치 또는 secrets.toml 없음
+        pass
+
+    if default is _REQUIRED:
+        raise KeyError(
+            f"설정 '{name}'이(가) 없습니다. 환경변수 또는 .streamlit/secrets.toml에 지정하세요."
+        )
+    return default
+
 
-@st.cache_resource
+@lru_cache(maxsize=None)
 def get_boto3_session():
     # AWS 환경(EC2/ECS 등)에서는 IAM Role 권장
     return boto3.Session(
-        region_name=st.secrets["AWS_REGION"],
-        aws_access_key_id=st.secrets["AWS_ACCESS_KEY_ID"],
-        aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
+        region_name=get_setting("AWS_REGION"),
+        aws_access_key_id=get_setting("AWS_ACCESS_KEY_ID", None),
+        aws_secret_access_key=get_setting("AWS_SECRET_ACCESS_KEY", None),
     )
 
 
@@ -18,9 +49,9 @@ def athena_read(sql: str):
     session = get_boto3_session()
     return wr.athena.read_sql_query(
         sql=sql,
-        database=st.secrets["ATHENA_DB"],
-        s3_output=st.secrets["ATHENA_S3_OUTPUT"],
-        workgroup=st.secrets.get("ATHENA_WORKGROUP", None),
+        database=get_setting("ATHENA_DB"),
+        s3_output=get_setting("ATHENA_S3_OUTPUT"),
+        workgroup=get_setting("ATHENA_WORKGROUP", None),
         boto3_session=session,
         ctas_approach=False,
     )
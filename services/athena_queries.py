@@ -1,8 +1,9 @@
 # athena_queries.py
+import numpy as np
 import pandas as pd
-import json
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from services.athena_client import athena_read, quote_list
+from services.vector_ingest import split_vector_columns
 
 SQL_ALL_PRODUCTS = """
 SELECT
@@ -119,45 +120,55 @@ def search_products_flexible(
     return athena_read(sql)
 
 
-def load_products_data_from_athena(
+def load_product_vectors_from_athena(
     categories: Optional[List[str]] = None,
-    vector_type: str = "roberta_semantic",
+    vector_types: Optional[List[str]] = None,
     table_name: str = "coupang_db.integrated_products_final_v3",
-):
-    vector_col = f"product_vector_{vector_type}"
+) -> Tuple[pd.DataFrame, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    추천 계산용 상품 데이터와 임베딩 행렬 조회
+
+    여러 벡터 컬럼을 한 번의 쿼리로 읽고, JSON 배열 문자열은 행마다 json.loads 하지 않고
+    컬럼 단위로 일괄 파싱해 (n, d) float32 행렬로 만든다.
+    category_path / skin_type / rating_1~5는 추천 사전 필터(product_filter)에 쓰인다.
+
+    Returns:
+        (벡터 컬럼을 뺀 상품 DataFrame, {vector_type: (matrix, has_vector)})
+    """
+    vector_types = vector_types or ["roberta_semantic"]
+    vector_cols = [f"product_vector_{t}" for t in vector_types]
 
     where_clause = ""
     if categories:
         cat_list = quote_list(categories)
         where_clause = f"WHERE category IN ({cat_list})"
 
+    vector_select = ",\n        ".join(vector_cols)
     sql = f"""
     SELECT
         product_id,
         product_name,
         brand,
         category,
+        category_path,
+        skin_type,
         sentiment_score,
         avg_rating_with_text,
         total_reviews,
+        rating_1,
+        rating_2,
+        rating_3,
+        rating_4,
+        rating_5,
         product_url,
         price,
         top_keywords,
-        product_vector_roberta_semantic
+        {vector_select}
     FROM {table_name}
     {where_clause}
     """
 
-    df = athena_read(sql)
-
-    if (
-        not df.empty
-        and df[vector_col].dtype == object
-        and isinstance(df[vector_col].iloc[0], str)
-    ):
-        df[vector_col] = df[vector_col].apply(json.loads)
-
-    return df
+    return split_vector_columns(athena_read(sql), vector_types)
 
 
 # athena_queries.py
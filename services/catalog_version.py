@@ -0,0 +1,86 @@
+"""
+카탈로그 데이터 버전 관리
+
+상품 카탈로그로부터 만든 캐시(임베딩 행렬 등)와 디스크 결과 파일(메모리 맵 저장소,
+이웃 테이블, 중복 군집, 임베딩 군집)은 이 버전 단위로 공유/무효화한다.
+- 선언 버전: 환경변수 CATALOG_VERSION (데이터를 바꿀 때마다 운영자가 함께 바꾼다)
+- 데이터 버전: CATALOG_VERSION이 없으면 "<테이블명>@<데이터 지문>"
+  상품 ID 목록과 상품별 벡터 합계의 해시라 프로세스를 다시 띄워도 같은 데이터면 같은 버전이고,
+  데이터가 바뀌면 다른 버전이 된다. 데이터를 읽기 전에는 "<테이블명>@unverified-<세대>"이며
+  이 버전으로는 디스크 결과 파일을 믿지 않는다.
+- 명시적 갱신: bump_catalog_version() 호출 시 세대 번호 증가 + 데이터 지문 초기화
+"""
+
+import hashlib
+import os
+import threading
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CATALOG_TABLE = "coupang_db.integrated_products_final_v3"
+UNVERIFIED = "unverified"
+
+_lock = threading.Lock()
+_generation = 0
+_data_fingerprint: Optional[str] = None
+
+
+def get_catalog_version() -> str:
+    """현재 카탈로그 버전 문자열 반환"""
+    declared = os.environ.get("CATALOG_VERSION")
+    if declared:
+        return f"{declared}@{_generation}" if _generation else declared
+    if _data_fingerprint is not None:
+        return f"{DEFAULT_CATALOG_TABLE}@{_data_fingerprint}"
+    return f"{DEFAULT_CATALOG_TABLE}@{UNVERIFIED}-{_generation}"
+
+
+def is_verified_version(version: str) -> bool:
+    """선언 버전이거나 데이터 지문으로 만든 버전인지 (디스크 결과 파일을 믿어도 되는지)"""
+    return not version.rsplit("@", 1)[-1].startswith(UNVERIFIED)
+
+
+def set_catalog_fingerprint(fingerprint: str) -> str:
+    """읽은 카탈로그 데이터의 지문을 기록하고 현재 버전 반환 (선언 버전이면 그대로)"""
+    global _data_fingerprint
+    with _lock:
+        _data_fingerprint = fingerprint
+    return get_catalog_version()
+
+
+def bump_catalog_version() -> str:
+    """카탈로그 버전을 갱신하고 새 버전 반환 (기존 캐시는 다음 접근 시 재생성)"""
+    global _generation, _data_fingerprint
+    with _lock:
+        _generation += 1
+        _data_fingerprint = None
+    return get_catalog_version()
+
+
+def vector_checksums(matrix: np.ndarray) -> np.ndarray:
+    """행별 벡터 합계 (소수 4자리 반올림, 정규화 전 원본 벡터 기준)"""
+    return np.round(np.asarray(matrix).sum(axis=1, dtype=np.float64), 4)
+
+
+def catalog_fingerprint(
+    product_ids, vectors: Mapping[str, Tuple[np.ndarray, np.ndarray]]
+) -> str:
+    """
+    카탈로그 데이터 지문 (상품 ID 목록 + 임베딩 종류별 상품 벡터 합계)
+
+    조회마다 행 순서가 달라도 같은 값이 나오도록 product_id 순으로 정렬해 해시한다.
+
+    Args:
+        vectors: {vector_type: (정규화 전 matrix, has_vector)}
+    """
+    ids = np.asarray(product_ids).astype(str)
+    order = np.argsort(ids, kind="stable")
+    digest = hashlib.sha1()
+    digest.update("\0".join(ids[order]).encode())
+    for vector_type in sorted(vectors):
+        matrix, has_vector = vectors[vector_type]
+        digest.update(vector_type.encode())
+        digest.update(np.asarray(has_vector, dtype=bool)[order].tobytes())
+        digest.update(vector_checksums(matrix)[order].tobytes())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,682 @@
+"""
+프로세스 공용 임베딩 저장소
+
+카탈로그 버전마다 한 번만 Athena에서 상품/벡터를 읽어
+정규화된 임베딩 행렬, product_id → 행 번호 매핑, 카테고리 코드를 만든다.
+모든 세션/스레드가 같은 읽기 전용 객체를 공유하므로
+상품 클릭 시에는 점수 계산 비용만 든다.
+
+여러 임베딩(semantic/sentiment)은 한 번의 조회로 함께 읽고,
+혼합 저장소(vector_type="blend")는 정규화된 행렬을 열 방향으로 이어 붙여
+가중치만 바꿔 가며 행렬곱 한 번으로 혼합 유사도를 계산한다.
+
+save_embedding_store()로 디스크(.npy)에 저장해 두면 각 프로세스는
+읽기 전용 메모리 맵으로 열기만 하므로 OS 페이지 캐시에 한 벌만 올라가고
+시작 시 벡터 파싱이 없다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.athena_queries import load_product_vectors_from_athena
+from services.catalog_version import (
+    bump_catalog_version,
+    catalog_fingerprint,
+    get_catalog_version,
+    is_verified_version,
+    set_catalog_fingerprint,
+    vector_checksums,
+)
+from services.keyword_index import KeywordIndex
+from services.product_filter import FilterIndex, ProductFilter
+from services.projection import PcaProjection
+from services.quantization import QuantizedMatrix
+from services.similarity_engine import (
+    factorize_categories,
+    normalize_rows,
+    prepare_priors,
+)
+from services.vector_ingest import column_to_matrix, split_vector_columns
+
+# 임베딩 보관 정밀도 ("float32", "float16", "int8")
+EMBEDDING_PRECISION = os.environ.get("EMBEDDING_PRECISION", "float32")
+
+# 카탈로그의 임베딩 종류 (Athena에서 한 번에 함께 읽음)
+VECTOR_TYPES = ("roberta_semantic", "roberta_sentiment")
+# 여러 임베딩을 이어 붙인 혼합 저장소
+BLEND_VECTOR_TYPE = "blend"
+DEFAULT_BLEND_WEIGHTS = {"roberta_semantic": 0.5, "roberta_sentiment": 0.5}
+
+
+class EmbeddingStore:
+    """
+    읽기 전용 임베딩 저장소
+
+    Attributes:
+        products: 상품 메타데이터 (벡터 컬럼 제외)
+        matrix: 행 정규화된 float32 임베딩 행렬 (n, d), 양자화만 보관하면 None
+        quantized: 양자화 행렬 (float16/int8 정밀도일 때)
+        has_vector: 벡터 존재 여부 (n,)
+        id_sorted / id_rows: 정렬된 product_id와 행 번호 (중복 시 첫 번째 행)
+        category_codes: 카테고리 정수 코드 (n,)
+        category_names: 코드 → 카테고리명
+        category_order / category_offsets: 카테고리 코드 순으로 묶은 행 번호와 구간
+        sentiment / avg_rating / normalized_rating: 점수 계산용 배열
+        blocks: 혼합 저장소의 [(vector_type, 차원), ...] (단일 임베딩이면 None)
+        projection: PCA 축소 행렬 (fit_projection() 또는 저장 파일에서 로드, 없으면 None)
+        filter_index: 사전 필터 인덱스 (처음 사용할 때 생성)
+        keyword_index: 상품 × top_keywords 희소 행렬 (처음 사용할 때 생성)
+    """
+
+    def __init__(
+        self,
+        products: pd.DataFrame,
+        matrix: Optional[np.ndarray],
+        has_vector: np.ndarray,
+        vector_type: str,
+        version: str,
+        quantized: Optional[QuantizedMatrix] = None,
+        id_index: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        blocks: Optional[List[Tuple[str, int]]] = None,
+        projection: Optional[PcaProjection] = None,
+        fingerprint: Optional[str] = None,
+    ):
+        self.products = products.reset_index(drop=True)
+        self.vector_type = vector_type
+        self.blocks = blocks
+        self.projection = projection
+        self.version = version
+        self._fingerprint = fingerprint
+        self._filter_index = None
+        self._keyword_index = None
+
+        self.matrix = (
+            None if matrix is None else np.ascontiguousarray(matrix, dtype=np.float32)
+        )
+        self.quantized = quantized
+        self.has_vector = has_vector
+        self.product_ids = self.products["product_id"].to_numpy()
+
+        if id_index is None:
+            ids = self.product_ids.astype(str)
+            order = np.argsort(ids, kind="stable")
+            id_index = (ids[order], order)
+        self.id_sorted, self.id_rows = id_index
+
+        self.category_codes, self.category_names = factorize_categories(
+            _column(self.products, "category", "")
+        )
+        self.category_order = np.argsort(self.category_codes, kind="stable")
+        self.category_offsets = np.r_[
+            0,
+            np.cumsum(
+                np.bincount(self.category_codes, minlength=len(self.category_names))
+            ),
+        ]
+        self.sentiment, self.avg_rating, self.normalized_rating = prepare_priors(
+            _column(self.products, "sentiment_score", None),
+            _column(self.products, "avg_rating_with_text", 0),
+        )
+
+        for arr in (
+            self.has_vector,
+            self.category_codes,
+            self.category_order,
+            self.category_offsets,
+            self.sentiment,
+            self.avg_rating,
+            self.normalized_rating,
+        ):
+            arr.setflags(write=False)
+        if self.matrix is not None:
+            self.matrix.setflags(write=False)
+
+    @classmethod
+    def from_products(
+        cls,
+        products: pd.DataFrame,
+        vector_type: str = "roberta_semantic",
+        version: Optional[str] = None,
+        precision: str = "float32",
+    ) -> "EmbeddingStore":
+        """
+        벡터 컬럼을 포함한 상품 DataFrame으로부터 저장소 생성
+
+        벡터 컬럼은 형태(리스트/JSON 문자열/Arrow)에 맞게 일괄 변환한다.
+        """
+        matrix, has_vector = column_to_matrix(products[f"product_vector_{vector_type}"])
+        vector_cols = [c for c in products.columns if c.startswith("product_vector_")]
+        return cls.from_matrix(
+            products.drop(columns=vector_cols),
+            matrix,
+            has_vector,
+            vector_type=vector_type,
+            version=version,
+            precision=precision,
+        )
+
+    @classmethod
+    def from_matrix(
+        cls,
+        products: pd.DataFrame,
+        matrix: np.ndarray,
+        has_vector: np.ndarray,
+        vector_type: str = "roberta_semantic",
+        version: Optional[str] = None,
+        precision: str = "float32",
+    ) -> "EmbeddingStore":
+        """
+        상품 DataFrame(벡터 컬럼 없음) + (n, d) 임베딩 행렬로 저장소 생성
+
+        matrix는 제자리에서 행 정규화된다.
+        precision이 float16/int8이면 float32 행렬은 버리고 양자화 행렬만 보관한다.
+        이후 유사도는 모두 복원한 벡터로 계산하므로 근사값이다 (quant-report로 재현율 확인).
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        normalize_rows(matrix)
+
+        quantized = None
+        fingerprint = None
+        if precision != "float32":
+            # 지문은 양자화 전 float32 행렬 기준 (같은 데이터면 정밀도와 무관하게 같은 값)
+            fingerprint = _fingerprint(vector_type, products["product_id"].to_numpy(), matrix)
+            quantized = QuantizedMatrix.from_matrix(matrix, precision)
+            matrix = None
+
+        return cls(
+            products,
+            matrix,
+            has_vector,
+            vector_type=vector_type,
+            version=version or get_catalog_version(),
+            quantized=quantized,
+            fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def stack(cls, stores: List["EmbeddingStore"]) -> "EmbeddingStore":
+        """
+        같은 카탈로그의 임베딩 저장소들을 열 방향으로 이어 붙인 혼합 저장소
+
+        각 블록은 따로 정규화된 상태를 유지하고, 가중치는 query_vector()에서
+        기준 벡터에만 곱하므로 가중치를 바꿔도 행렬을 다시 만들 필요가 없다.
+        모든 임베딩이 있는 상품만 벡터가 있는 것으로 본다.
+        """
+        base = stores[0]
+        for other in stores[1:]:
+            if other.version != base.version or not np.array_equal(
+                other.product_ids, base.product_ids
+            ):
+                raise ValueError("같은 카탈로그 버전의 저장소만 합칠 수 있습니다.")
+
+        all_rows = np.arange(len(base))
+        matrix = np.hstack([store.vectors(all_rows) for store in stores])
+        has_vector = np.logical_and.reduce([store.has_vector for store in stores])
+        matrix[~has_vector] = 0
+
+        quantized = None
+        if base.matrix is None:
+            quantized = QuantizedMatrix.from_matrix(matrix, base.quantized.dtype)
+            matrix = None
+
+        return cls(
+            base.products,
+            matrix,
+            has_vector,
+            vector_type=BLEND_VECTOR_TYPE,
+            version=base.version,
+            quantized=quantized,
+            id_index=(base.id_sorted, base.id_rows),
+            blocks=[(store.vector_type, store.dim) for store in stores],
+            fingerprint=hashlib.sha1(
+                "\0".join(store.fingerprint for store in stores).encode()
+            ).hexdigest(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def fit_projection(self, n_components: int) -> PcaProjection:
+        """
+        저장소 임베딩으로 PCA 학습 후 축소 행렬 보관 (오프라인 작업)
+
+        save_embedding_store()로 저장하면 함께 기록된다.
+        """
+        source = self.matrix
+        if source is None:
+            source = self.vectors(np.arange(len(self)))
+        self.projection = PcaProjection.fit(source, self.has_vector, n_components)
+        return self.projection
+
+    @property
+    def dim(self) -> int:
+        """임베딩 차원"""
+        source = self.matrix if self.matrix is not None else self.quantized
+        return source.shape[1]
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """지정 행의 정규화된 float32 벡터 (양자화 저장소는 복원 후 재정규화)"""
+        if self.matrix is not None:
+            return self.matrix[rows]
+        vectors = self.quantized.rows(rows)
+        if not self.blocks:
+            return normalize_rows(vectors)
+        # 혼합 저장소는 임베딩 블록별로 정규화
+        start = 0
+        for _, dim in self.blocks:
+            normalize_rows(vectors[:, start : start + dim])
+            start += dim
+        return vectors
+
+    def vector(self, row: int) -> np.ndarray:
+        """단일 행의 정규화된 float32 벡터"""
+        return self.vectors(np.array([row]))[0]
+
+    def query_vector(
+        self, row: int, blend_weights: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        유사도 계산용 기준 벡터
+
+        혼합 저장소는 블록마다 (합이 1이 되도록 맞춘) 가중치를 곱해
+        행렬곱 결과가 Σ 가중치 × 임베딩별 코사인 유사도가 되게 한다.
+        """
+        return weight_blocks(self.vector(row), self.blocks, blend_weights)
+
+    def similarity(self, target_vector: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        지정 행과 기준 벡터의 코사인 유사도 (float32 행렬 필요)
+
+        행이 전체의 절반을 넘으면 전체 행렬곱 후 인덱싱,
+        아니면 해당 행만 모아서 계산한다.
+        """
+        if len(rows) * 2 > len(self):
+            return (self.matrix @ target_vector)[rows]
+        return self.matrix[rows] @ target_vector
+
+    def similarity_matrix(
+        self, queries: np.ndarray, rows: np.ndarray, chunk_size: int = 8192
+    ) -> np.ndarray:
+        """
+        여러 기준 벡터(b, d)와 지정 행의 유사도 행렬 (b, len(rows)) - 행렬-행렬 곱(BLAS)
+
+        양자화 저장소는 chunk_size 행씩 복원해 계산하므로
+        추가 메모리는 결과 행렬 + 복원 블록 크기로 제한된다.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if self.matrix is not None:
+            if len(rows) * 2 > len(self):
+                return (queries @ self.matrix.T)[:, rows]
+            return queries @ self.matrix[rows].T
+
+        out = np.empty((len(queries), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            out[:, start : start + len(chunk)] = queries @ self.vectors(chunk).T
+        return out
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        상품 ID 순서, 행렬 크기, 행별 벡터 합계로 만든 데이터 식별자 (디스크 결과 파일 검증용)
+
+        같은 상품 목록이라도 벡터가 바뀌면 달라진다.
+        """
+        if self._fingerprint is None:
+            source = self.matrix if self.matrix is not None else self.quantized.codes
+            self._fingerprint = _fingerprint(self.vector_type, self.product_ids, source)
+        return self._fingerprint
+
+    @property
+    def filter_index(self) -> FilterIndex:
+        """카테고리/피부 타입/가격/평점 사전 필터 인덱스"""
+        if self._filter_index is None:
+            self._filter_index = FilterIndex(self.products)
+        return self._filter_index
+
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        """상품 × 키워드 희소 행렬 (하이브리드 유사도용)"""
+        if self._keyword_index is None:
+            self._keyword_index = KeywordIndex(_column(self.products, "top_keywords", None))
+        return self._keyword_index
+
+    def admitted_mask(
+        self, product_filter: Optional[ProductFilter]
+    ) -> Optional[np.ndarray]:
+        """필터를 통과하는 행 bool 마스크 (필터가 없거나 모든 행이 통과하면 None)"""
+        if product_filter is None:
+            return None
+        return self.filter_index.mask(product_filter)
+
+    def row_of(self, product_id) -> Optional[int]:
+        """product_id의 행 번호 (없으면 None)"""
+        key = str(product_id)
+        pos = int(np.searchsorted(self.id_sorted, key))
+        if pos < len(self.id_sorted) and self.id_sorted[pos] == key:
+            return int(self.id_rows[pos])
+        return None
+
+    def rows_of(self, product_id) -> np.ndarray:
+        """product_id에 해당하는 모든 행 번호"""
+        key = str(product_id)
+        start = np.searchsorted(self.id_sorted, key, side="left")
+        end = np.searchsorted(self.id_sorted, key, side="right")
+        return np.asarray(self.id_rows[start:end])
+
+    def rows_of_ids(self, product_ids: np.ndarray) -> np.ndarray:
+        """product_id 배열의 행 번호 배열 (없는 ID는 -1)"""
+        keys = np.asarray(product_ids).astype(str)
+        if len(self.id_sorted) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.id_sorted, keys), len(self.id_sorted) - 1)
+        found = np.asarray(self.id_sorted)[pos] == keys
+        return np.where(found, np.asarray(self.id_rows)[pos], -1)
+
+    def category_rows(
+        self,
+        categories: Optional[List[str]] = None,
+        admitted: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        요청한 카테고리의 행 번호 (None이면 전체)
+
+        카테고리 코드 순으로 묶여 있고, 같은 카테고리 안에서는 행 번호 순이다.
+        admitted(bool 마스크)를 주면 통과한 행만 남긴다.
+        """
+        rows = self._category_rows(categories)
+        if admitted is not None:
+            rows = rows[admitted[rows]]
+        return rows
+
+    def _category_rows(self, categories: Optional[List[str]]) -> np.ndarray:
+        if not categories:
+            return self.category_order
+        categories = set(categories)
+        codes = [
+            code
+            for code, name in enumerate(self.category_names)
+            if name in categories
+        ]
+        if not codes:
+            return np.zeros(0, dtype=np.int64)
+        offsets = self.category_offsets
+        return np.concatenate(
+            [self.category_order[offsets[c] : offsets[c + 1]] for c in codes]
+        )
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """컬럼이 없으면 기본값으로 채운 Series 반환"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index)
+
+
+# =========================
+# 메모리 맵 파일 저장/로드
+# =========================
+DEFAULT_STORE_DIR = "./data/embedding_store"
+
+
+def _store_path(store_dir: str, vector_type: str) -> str:
+    return os.path.join(store_dir, vector_type)
+
+
+def save_embedding_store(store: EmbeddingStore, store_dir: str = DEFAULT_STORE_DIR):
+    """
+    저장소를 메모리 맵용 파일로 저장
+
+    {store_dir}/{vector_type}/
+        matrix.npy 또는 codes.npy + scales.npy  임베딩
+        has_vector.npy, id_sorted.npy, id_rows.npy
+        products.parquet                        메타데이터 (벡터 제외)
+        pca_*.npy                               PCA 축소 행렬 (있을 때만)
+        meta.json                               버전/정밀도/지문
+    """
+    path = _store_path(store_dir, store.vector_type)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    if store.matrix is not None:
+        np.save(os.path.join(tmp_path, "matrix.npy"), store.matrix)
+        precision = "float32"
+    else:
+        np.save(os.path.join(tmp_path, "codes.npy"), store.quantized.codes)
+        np.save(os.path.join(tmp_path, "scales.npy"), store.quantized.scales)
+        precision = store.quantized.dtype
+
+    np.save(os.path.join(tmp_path, "has_vector.npy"), store.has_vector)
+    np.save(os.path.join(tmp_path, "id_sorted.npy"), store.id_sorted)
+    np.save(os.path.join(tmp_path, "id_rows.npy"), store.id_rows)
+    store.products.to_parquet(os.path.join(tmp_path, "products.parquet"), index=False)
+
+    meta = {
+        "version": store.version,
+        "vector_type": store.vector_type,
+        "precision": precision,
+        "fingerprint": store.fingerprint,
+    }
+    if store.projection is not None:
+        projection = store.projection
+        for name in ("mean", "components", "reduced", "offset"):
+            np.save(os.path.join(tmp_path, f"pca_{name}.npy"), getattr(projection, name))
+        meta["pca_dim"] = projection.dim
+        meta["pca_explained"] = projection.explained
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    # 읽는 프로세스가 반쯤 쓰인 파일을 보지 않도록 디렉토리 단위로 교체
+    if os.path.exists(path):
+        old_path = f"{path}.old"
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        for name in os.listdir(old_path):
+            os.remove(os.path.join(old_path, name))
+        os.rmdir(old_path)
+    else:
+        os.replace(tmp_path, path)
+
+
+def load_embedding_store(
+    vector_type: str = "roberta_semantic",
+    store_dir: str = DEFAULT_STORE_DIR,
+    version: Optional[str] = None,
+) -> Optional[EmbeddingStore]:
+    """
+    메모리 맵 파일로 저장소 열기 (읽기 전용, 벡터 파싱 없음)
+
+    Returns:
+        EmbeddingStore 또는 None (파일 없음 / 버전 불일치)
+    """
+    path = _store_path(store_dir, vector_type)
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    # 데이터 지문 없이 만든(unverified) 저장소는 어느 데이터인지 알 수 없으므로 쓰지 않음
+    if not is_verified_version(meta["version"]):
+        return None
+    if version is not None and meta["version"] != version:
+        return None
+
+    def mmap(name):
+        return np.load(os.path.join(path, name), mmap_mode="r")
+
+    matrix = None
+    quantized = None
+    if meta["precision"] == "float32":
+        matrix = mmap("matrix.npy")
+    else:
+        quantized = QuantizedMatrix(mmap("codes.npy"), mmap("scales.npy"))
+
+    projection = None
+    if meta.get("pca_dim"):
+        projection = PcaProjection(
+            np.load(os.path.join(path, "pca_mean.npy")),
+            np.load(os.path.join(path, "pca_components.npy")),
+            mmap("pca_reduced.npy"),
+            mmap("pca_offset.npy"),
+            explained=meta.get("pca_explained", float("nan")),
+        )
+
+    return EmbeddingStore(
+        pd.read_parquet(os.path.join(path, "products.parquet")),
+        matrix,
+        np.asarray(mmap("has_vector.npy")),
+        vector_type=vector_type,
+        version=meta["version"],
+        quantized=quantized,
+        id_index=(mmap("id_sorted.npy"), mmap("id_rows.npy")),
+        projection=projection,
+        fingerprint=meta.get("fingerprint"),
+    )
+
+
+def weight_blocks(
+    vector: np.ndarray,
+    blocks: Optional[List[Tuple[str, int]]],
+    blend_weights: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """혼합 저장소 벡터에 블록별 가중치(합이 1) 적용 (단일 임베딩이면 그대로)"""
+    if not blocks:
+        return vector
+
+    weights = blend_weights or DEFAULT_BLEND_WEIGHTS
+    block_weights = np.array(
+        [weights.get(vector_type, 0.0) for vector_type, _ in blocks],
+        dtype=np.float32,
+    )
+    if block_weights.sum() <= 0:
+        raise ValueError(f"혼합 가중치가 올바르지 않습니다: {weights}")
+    block_weights /= block_weights.sum()
+    return vector * np.repeat(block_weights, [dim for _, dim in blocks])
+
+
+def _fingerprint(vector_type: str, product_ids: np.ndarray, matrix: np.ndarray) -> str:
+    digest = hashlib.sha1()
+    digest.update(f"{vector_type}:{matrix.shape}".encode())
+    for pid in product_ids:
+        digest.update(str(pid).encode())
+        digest.update(b"\0")
+    digest.update(vector_checksums(matrix).tobytes())
+    return digest.hexdigest()
+
+
+# =========================
+# 프로세스 공용 캐시
+# =========================
+_stores: Dict[Tuple[str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+_build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+
+def get_embedding_store(
+    vector_type: str = "roberta_semantic", version: Optional[str] = None
+) -> EmbeddingStore:
+    """
+    카탈로그 버전별 임베딩 저장소 반환
+
+    같은 버전의 메모리 맵 파일이 있으면 그것을 열고,
+    없으면 최초 1회만 Athena에서 조회해 만든다. (모든 임베딩 종류를 함께 읽어 캐시)
+    vector_type="blend"이면 캐시된 임베딩별 저장소를 이어 붙여 만든다.
+    동시에 여러 스레드가 요청해도 저장소는 한 번만 생성된다.
+    버전이 바뀌면 이전 버전 저장소는 제거된다.
+
+    데이터를 읽기 전(unverified 버전)에는 디스크 파일을 믿지 않고 Athena에서 만들며,
+    이때 카탈로그 버전은 읽은 데이터의 지문으로 정해진다 (반환 저장소의 version).
+    """
+    version = version or get_catalog_version()
+    key = (vector_type, version)
+
+    store = _stores.get(key)
+    if store is not None:
+        return store
+
+    with _stores_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        if not is_verified_version(version):
+            # 기다리는 동안 다른 스레드가 데이터를 읽어 버전이 정해졌으면 그 저장소 사용
+            version = get_catalog_version()
+            store = _stores.get((vector_type, version))
+            if store is not None:
+                return store
+        store = _stores.get(key)
+        if store is not None:
+            return store
+
+        built = {}
+        if vector_type == BLEND_VECTOR_TYPE:
+            first = get_embedding_store(VECTOR_TYPES[0], version)
+            built[vector_type] = EmbeddingStore.stack(
+                [first] + [get_embedding_store(t, first.version) for t in VECTOR_TYPES[1:]]
+            )
+        else:
+            store = load_embedding_store(vector_type, version=version)
+            if store is not None:
+                built[vector_type] = store
+            else:
+                built = _build_from_athena(vector_type, version)
+
+        with _stores_lock:
+            for built_type, built_store in built.items():
+                built_key = (built_type, built_store.version)
+                if built_key in _stores:
+                    continue
+                for old_key in [k for k in _stores if k[0] == built_type]:
+                    del _stores[old_key]
+                _stores[built_key] = built_store
+            _build_locks.pop(key, None)
+            store = _stores[(vector_type, built[vector_type].version)]
+
+    return store
+
+
+def _build_from_athena(vector_type: str, version: str) -> Dict[str, EmbeddingStore]:
+    """Athena 한 번 조회로 카탈로그의 모든 임베딩 저장소 생성"""
+    vector_types = list(VECTOR_TYPES) if vector_type in VECTOR_TYPES else [vector_type]
+    products, vectors = load_product_vectors_from_athena(
+        categories=None, vector_types=vector_types
+    )
+    # 정규화(제자리) 전에 데이터 지문을 기록 - 데이터를 읽기 전 버전이었으면 데이터 버전으로 교체
+    current = set_catalog_fingerprint(catalog_fingerprint(products["product_id"], vectors))
+    if not is_verified_version(version):
+        version = current
+    return {
+        t: EmbeddingStore.from_matrix(
+            products, matrix, has_vector, t, version, precision=EMBEDDING_PRECISION
+        )
+        for t, (matrix, has_vector) in vectors.items()
+    }
+
+
+def register_catalog_products(products: pd.DataFrame) -> str:
+    """
+    벡터 컬럼을 포함한 상품 DataFrame(Athena 원본)으로 카탈로그 데이터 지문을 기록
+
+    Athena에서 저장소를 만들 때와 같은 지문이므로, 화면용 카탈로그를 먼저 읽은 프로세스도
+    같은 데이터로 만든 디스크 결과 파일(메모리 맵 저장소, 군집 파일)을 바로 쓸 수 있다.
+
+    Returns:
+        현재 카탈로그 버전
+    """
+    vector_types = [t for t in VECTOR_TYPES if f"product_vector_{t}" in products.columns]
+    _, vectors = split_vector_columns(products, vector_types)
+    return set_catalog_fingerprint(catalog_fingerprint(products["product_id"], vectors))
+
+
+def refresh_embedding_store() -> str:
+    """카탈로그 버전을 올려 다음 요청 시 저장소를 다시 만들도록 함"""
+    with _stores_lock:
+        _stores.clear()
+    return bump_catalog_version()
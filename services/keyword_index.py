@@ -0,0 +1,135 @@
+"""
+상품 × 키워드 희소 행렬 (top_keywords)
+
+상품마다 키워드 집합을 정수 ID로 바꿔 CSR(상품 → 키워드)과
+역색인(키워드 → 상품, CSC)으로 보관한다. 저장소와 함께 카탈로그 버전당 한 번만 만든다.
+
+기준 상품과 모든 후보의 공통 키워드 수는 이진 희소 행렬-벡터 곱 X · x_q 이며,
+기준 상품 키워드들의 역색인 목록을 이어 붙여 np.bincount 한 번으로 계산한다.
+(상품 쌍마다 파이썬 set 연산을 하지 않음)
+
+키워드 유사도 = 자카드 |A ∩ B| / |A ∪ B|
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def parse_keywords(value) -> List[str]:
+    """
+    top_keywords 값 → 정규화된 키워드 리스트 (중복 제거, 순서 유지)
+
+    Athena 배열(list/ndarray)과 "['수분', '진정']" / "수분, 진정" 형태 문자열을 모두 받는다.
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        items = [str(v) for v in value]
+    elif isinstance(value, str):
+        items = re.sub(r"[\[\]'\"]", "", value).split(",")
+    else:
+        return []
+
+    keywords = []
+    for item in items:
+        keyword = item.strip().lower()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+class KeywordIndex:
+    """
+    상품 × 키워드 이진 희소 행렬
+
+    Attributes:
+        vocabulary: 키워드 ID → 키워드
+        indptr / indices: CSR (상품 행 → 키워드 ID)
+        keyword_indptr / keyword_rows: 역색인 (키워드 ID → 상품 행, 행 번호 순)
+        sizes: 상품별 키워드 수 (n,)
+    """
+
+    def __init__(self, keywords: pd.Series):
+        keyword_lists = [parse_keywords(value) for value in keywords]
+        n = len(keyword_lists)
+        self.sizes = np.array([len(kws) for kws in keyword_lists], dtype=np.int32)
+        self.indptr = np.r_[0, np.cumsum(self.sizes)].astype(np.int64)
+
+        flat = [kw for kws in keyword_lists for kw in kws]
+        codes, self.vocabulary = pd.factorize(pd.Series(flat, dtype=object))
+        self.indices = codes.astype(np.int32)
+
+        # 역색인: 키워드 ID 순으로 정렬 (같은 키워드 안에서는 행 번호 순)
+        row_of_entry = np.repeat(np.arange(n, dtype=np.int64), self.sizes)
+        order = np.argsort(self.indices, kind="stable")
+        self.keyword_rows = row_of_entry[order]
+        self.keyword_indptr = np.r_[
+            0, np.cumsum(np.bincount(self.indices, minlength=len(self.vocabulary)))
+        ].astype(np.int64)
+
+        for arr in (
+            self.sizes,
+            self.indptr,
+            self.indices,
+            self.keyword_rows,
+            self.keyword_indptr,
+        ):
+            arr.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            arr.nbytes
+            for arr in (
+                self.sizes,
+                self.indptr,
+                self.indices,
+                self.keyword_rows,
+                self.keyword_indptr,
+            )
+        )
+
+    def keywords_of(self, row: int) -> np.ndarray:
+        """상품 행의 키워드 ID"""
+        return self.indices[self.indptr[row] : self.indptr[row + 1]]
+
+    def overlap(self, row: int) -> np.ndarray:
+        """
+        기준 상품과 모든 상품의 공통 키워드 수 (n,) = X · x_q
+
+        기준 상품 키워드들의 역색인 목록을 이어 붙여 bincount 한 번으로 센다.
+        """
+        keyword_ids = self.keywords_of(row)
+        if len(keyword_ids) == 0:
+            return np.zeros(len(self), dtype=np.int64)
+        postings = np.concatenate(
+            [
+                self.keyword_rows[self.keyword_indptr[k] : self.keyword_indptr[k + 1]]
+                for k in keyword_ids
+            ]
+        )
+        return np.bincount(postings, minlength=len(self))
+
+    def similarity(self, row: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        기준 상품과의 키워드 자카드 유사도 (키워드가 없는 쌍은 0)
+
+        Returns:
+            float64 배열 (len(rows),), rows가 None이면 전체 (n,)
+        """
+        overlap = self.overlap(row)
+        sizes = self.sizes
+        if rows is not None:
+            overlap = overlap[rows]
+            sizes = sizes[rows]
+        union = sizes + self.sizes[row] - overlap
+        return np.divide(
+            overlap,
+            union,
+            out=np.zeros(len(overlap), dtype=np.float64),
+            where=union > 0,
+        )
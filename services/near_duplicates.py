@@ -0,0 +1,369 @@
+"""
+중복 상품(같은 상품의 다른 product_id) 탐지 - 오프라인 작업
+
+용량/묶음 구성만 다른 같은 상품이 여러 product_id로 올라와 있으면
+추천/검색 그리드를 같은 상품이 차지한다. 전체 쌍 비교(O(N²)) 없이 후보 쌍만 만든다.
+
+1. 후보 쌍 (같은 카테고리 안에서만)
+   - 임베딩 LSH: 랜덤 초평면 부호 비트(SimHash) 테이블 여러 개
+   - 상품명 MinHash: 용량/수량 표기를 지운 상품명의 문자 3-gram 집합 → 밴드별 버킷
+   버킷 키로 정렬한 뒤 가까운 window개끼리만 짝지으므로 큰 버킷도 비용이 선형이다.
+2. 검증: 코사인 유사도 ≥ min_cosine 그리고 상품명 MinHash 유사도 ≥ min_name_similarity
+3. 통과한 쌍을 union-find(라벨 전파)로 묶어 군집 생성
+
+결과 컬럼 (Parquet, 카탈로그 버전 메타데이터 포함):
+    product_id, dup_cluster(대표 product_id), dup_rank(군집 내 리뷰 많은 순), dup_size
+화면에서는 dup_cluster로 한 상품만 남긴다. (collapse_duplicates)
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.catalog_version import get_catalog_version, is_verified_version
+
+DEFAULT_DUP_PATH = "./data/near_duplicates/near_duplicates.parquet"
+
+# 임베딩 LSH: 테이블 수 × 테이블당 비트 수
+DEFAULT_HASH_TABLES = 8
+DEFAULT_HASH_BITS = 12
+# 상품명 MinHash: 밴드 수 × 밴드당 해시 수
+DEFAULT_NAME_BANDS = 8
+DEFAULT_NAME_ROWS = 4
+# 버킷 정렬 후 짝지을 이웃 수
+DEFAULT_WINDOW = 8
+# 중복 판정 기준
+MIN_COSINE = 0.95
+MIN_NAME_SIMILARITY = 0.5
+
+# 용량/수량/묶음 표기 (상품명 비교 전에 제거)
+_QUANTITY_PATTERN = re.compile(
+    r"\d+(\.\d+)?\s*(ml|l|g|kg|mg|oz|매|개입|개|입|ea|팩|세트|병|통|호)"
+    r"|\d+\s*\+\s*\d+"
+    r"|[x×*]\s*\d+",
+    re.IGNORECASE,
+)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def normalize_name(name) -> str:
+    """상품명 정규화: 소문자, 용량/수량 표기와 공백/기호 제거"""
+    if not isinstance(name, str):
+        return ""
+    name = _QUANTITY_PATTERN.sub(" ", name.lower())
+    return _NON_WORD_PATTERN.sub("", name)
+
+
+def _name_shingles(names: pd.Series, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    상품명 문자 k-gram 해시
+
+    Returns:
+        (owner, hashes) 같은 길이의 배열 - owner는 상품 행 번호 (행 순으로 정렬)
+    """
+    owners = []
+    shingles = []
+    for row, name in enumerate(names.map(normalize_name)):
+        grams = {name[i : i + k] for i in range(max(len(name) - k + 1, 1))} if name else ()
+        owners.extend([row] * len(grams))
+        shingles.extend(grams)
+    hashes = pd.util.hash_array(np.asarray(shingles, dtype=object))
+    return np.asarray(owners, dtype=np.int64), hashes
+
+
+def name_minhash(
+    names: pd.Series, n_hashes: int, seed: int = 0, chunk_size: int = 200000
+) -> np.ndarray:
+    """
+    상품명 MinHash 서명 (n, n_hashes) uint64 - 상품명이 비어 있으면 모두 최댓값
+
+    해시 i: (h XOR s_i) * m_i (mod 2^64), m_i는 홀수 → 상품별 최솟값
+    """
+    owner, hashes = _name_shingles(names)
+    rng = np.random.default_rng(seed)
+    salts = rng.integers(0, 2**63, n_hashes, dtype=np.uint64)
+    multipliers = rng.integers(0, 2**63, n_hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    signature = np.full((len(names), n_hashes), _MASK64, dtype=np.uint64)
+    for start in range(0, len(hashes), chunk_size):
+        h = hashes[start : start + chunk_size]
+        rows = owner[start : start + chunk_size]
+        with np.errstate(over="ignore"):
+            values = (h[:, None] ^ salts) * multipliers
+        bounds = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        signature[rows[bounds]] = np.minimum(
+            signature[rows[bounds]], np.minimum.reduceat(values, bounds, axis=0)
+        )
+    return signature
+
+
+def _window_pairs(keys: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """키가 같은 행끼리, 키 정렬 순서에서 window 이내인 쌍 (i < j)"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    left, right = [], []
+    for offset in range(1, window + 1):
+        same = sorted_keys[:-offset] == sorted_keys[offset:]
+        left.append(order[:-offset][same])
+        right.append(order[offset:][same])
+    i = np.concatenate(left) if left else np.zeros(0, dtype=np.int64)
+    j = np.concatenate(right) if right else np.zeros(0, dtype=np.int64)
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def _combine_keys(category_codes: np.ndarray, parts: np.ndarray) -> np.ndarray:
+    """카테고리 코드 + 해시 값 여러 개 → uint64 버킷 키"""
+    key = category_codes.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over="ignore"):
+        for column in parts.T:
+            key = (key ^ column.astype(np.uint64)) * np.uint64(0xBF58476D1CE4E5B9)
+    return key
+
+
+def candidate_pairs(
+    store,
+    signature: np.ndarray,
+    n_tables: int = DEFAULT_HASH_TABLES,
+    n_bits: int = DEFAULT_HASH_BITS,
+    n_bands: int = DEFAULT_NAME_BANDS,
+    band_rows: int = DEFAULT_NAME_ROWS,
+    window: int = DEFAULT_WINDOW,
+    seed: int = 0,
+    block_size: int = 65536,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """임베딩 SimHash 버킷 + 상품명 MinHash 밴드 버킷에서 후보 쌍 생성 (중복 제거)"""
+    n = len(store)
+    codes = store.category_codes
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((store.dim, n_tables * n_bits)).astype(np.float32)
+    weights = (np.uint64(1) << np.arange(n_bits, dtype=np.uint64))
+
+    # 임베딩 부호 비트 (블록 단위) → 테이블별 n_bits 정수
+    bits = np.zeros((n, n_tables), dtype=np.uint64)
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        signs = (store.vectors(rows) @ planes > 0).reshape(len(rows), n_tables, n_bits)
+        bits[rows] = (signs.astype(np.uint64) * weights).sum(axis=2)
+
+    left, right = [], []
+    vector_rows = np.flatnonzero(store.has_vector)
+    for t in range(n_tables):
+        keys = _combine_keys(codes[vector_rows], bits[vector_rows, t : t + 1])
+        i, j = _window_pairs(keys, window)
+        left.append(vector_rows[i])
+        right.append(vector_rows[j])
+
+    named = np.flatnonzero(signature[:, 0] != _MASK64)
+    for b in range(n_bands):
+        band = signature[named, b * band_rows : (b + 1) * band_rows]
+        i, j = _window_pairs(_combine_keys(codes[named], band), window)
+        left.append(named[i])
+        right.append(named[j])
+
+    pair_keys = np.unique(np.concatenate(left) * n + np.concatenate(right))
+    return pair_keys // n, pair_keys % n
+
+
+def _pair_cosine(store, i: np.ndarray, j: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    out = np.empty(len(i), dtype=np.float32)
+    for start in range(0, len(i), chunk_size):
+        a = store.vectors(i[start : start + chunk_size])
+        b = store.vectors(j[start : start + chunk_size])
+        out[start : start + len(a)] = np.einsum("ij,ij->i", a, b)
+    return out
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """간선 (i, j)로 연결된 행 묶음 라벨 (각 묶음의 최소 행 번호) - 라벨 전파 + 포인터 점프"""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[i], labels[j])
+        updated = labels.copy()
+        np.minimum.at(updated, i, low)
+        np.minimum.at(updated, j, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def find_near_duplicates(
+    store,
+    min_cosine: float = MIN_COSINE,
+    min_name_similarity: float = MIN_NAME_SIMILARITY,
+    n_tables: int = DEFAULT_HASH_TABLES,
+    n_bits: int = DEFAULT_HASH_BITS,
+    n_bands: int = DEFAULT_NAME_BANDS,
+    band_rows: int = DEFAULT_NAME_ROWS,
+    window: int = DEFAULT_WINDOW,
+    seed: int = 0,
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    중복 상품 군집 계산
+
+    Returns:
+        product_id, dup_cluster, dup_rank, dup_size 컬럼 DataFrame (product_id당 1행)
+        dup_cluster는 군집에서 리뷰가 가장 많은 상품의 product_id이다.
+    """
+    n = len(store)
+    start = time.perf_counter()
+    signature = name_minhash(store.products["product_name"], n_bands * band_rows, seed)
+    i, j = candidate_pairs(
+        store, signature, n_tables, n_bits, n_bands, band_rows, window, seed
+    )
+    candidate_s = time.perf_counter() - start
+
+    name_similarity = (signature[i] == signature[j]).mean(axis=1)
+    valid = (
+        store.has_vector[i]
+        & store.has_vector[j]
+        & (name_similarity >= min_name_similarity)
+    )
+    i, j = i[valid], j[valid]
+    cosine = _pair_cosine(store, i, j)
+    i, j = i[cosine >= min_cosine], j[cosine >= min_cosine]
+    labels = connected_components(n, i, j)
+
+    # 군집 내 순위: 리뷰 많은 순, 같으면 행 번호 순
+    reviews = pd.to_numeric(
+        store.products.get("total_reviews", pd.Series(0, index=store.products.index)),
+        errors="coerce",
+    ).fillna(0).to_numpy()
+    order = np.lexsort((np.arange(n), -reviews, labels))
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    rank = np.empty(n, dtype=np.int32)
+    rank[order] = np.arange(n) - np.repeat(starts, sizes)
+    size = np.empty(n, dtype=np.int32)
+    size[order] = np.repeat(sizes, sizes)
+    head = np.empty(n, dtype=np.int64)
+    head[order] = np.repeat(order[starts], sizes)
+
+    ids = store.product_ids.astype(str)
+    result = pd.DataFrame(
+        {
+            "product_id": ids,
+            "dup_cluster": ids[head],
+            "dup_rank": rank,
+            "dup_size": size,
+        }
+    ).drop_duplicates("product_id")
+
+    if verbose:
+        n_clusters = int((sizes > 1).sum())
+        print(
+            f"✓ 중복 상품 탐지: 후보 쌍 {len(valid):,}개 ({candidate_s:.1f}초) → "
+            f"중복 쌍 {len(i):,}개, 군집 {n_clusters:,}개 "
+            f"({int(sizes[sizes > 1].sum()):,}개 상품), 총 {time.perf_counter() - start:.1f}초"
+        )
+    return result
+
+
+def write_dup_clusters(
+    clusters: pd.DataFrame, version: str, path: str = DEFAULT_DUP_PATH
+):
+    """중복 군집 Parquet 저장 (카탈로그 버전 메타데이터 포함, 임시 파일 작성 후 교체)"""
+    table = pa.Table.from_pandas(clusters, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {"catalog_version": version, "created_at": str(time.time())}
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+_dup_tables: Dict[str, tuple] = {}
+_dup_tables_lock = threading.Lock()
+
+
+def load_dup_clusters(path: str = DEFAULT_DUP_PATH) -> Optional[pd.DataFrame]:
+    """
+    중복 군집 로드 (파일 수정 시각 기준 1회)
+
+    파일이 없거나 현재 카탈로그 버전과 다르면 None
+    (데이터를 읽기 전 unverified 버전이면 어느 데이터의 결과인지 알 수 없으므로 None)
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _dup_tables_lock:
+        cached = _dup_tables.get(path)
+        if cached is None or cached[0] != mtime:
+            table = pq.read_table(path)
+            meta = {
+                k.decode(): v.decode()
+                for k, v in (table.schema.metadata or {}).items()
+            }
+            cached = (mtime, meta.get("catalog_version", ""), table.to_pandas())
+            _dup_tables[path] = cached
+
+    version = get_catalog_version()
+    if cached[1] != version or not is_verified_version(version):
+        return None
+    return cached[2]
+
+
+def attach_dup_clusters(
+    df: pd.DataFrame, clusters: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    상품 DataFrame에 dup_cluster / dup_rank / dup_size 컬럼 추가
+
+    군집 파일이 없거나 목록에 없는 상품은 자기 자신만의 군집으로 둔다.
+    """
+    if clusters is None:
+        clusters = load_dup_clusters()
+
+    df = df.drop(columns=["dup_cluster", "dup_rank", "dup_size"], errors="ignore")
+    product_ids = df["product_id"].astype(str)
+    if clusters is None:
+        return df.assign(dup_cluster=product_ids, dup_rank=0, dup_size=1)
+
+    indexed = clusters.set_index("product_id")
+    return df.assign(
+        dup_cluster=product_ids.map(indexed["dup_cluster"]).fillna(product_ids),
+        dup_rank=product_ids.map(indexed["dup_rank"]).fillna(0).astype(np.int32),
+        dup_size=product_ids.map(indexed["dup_size"]).fillna(1).astype(np.int32),
+    )
+
+
+def collapse_duplicates(
+    df: pd.DataFrame, best_by: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    군집마다 한 상품만 남김 (행 순서 유지)
+
+    Args:
+        best_by: 군집 안에서 남길 상품 기준 컬럼 (큰 값 우선, 예: "reco_score")
+            None이면 dup_rank(리뷰 많은 순)가 가장 앞선 상품
+    """
+    if "dup_cluster" not in df.columns or df.empty:
+        return df
+
+    # 군집이 2개 이상인 행만 골라 정렬 → 나머지는 그대로 통과
+    multi = df["dup_size"].to_numpy() > 1
+    if not multi.any():
+        return df
+
+    # 인덱스 라벨이 겹쳐도(concat 결과 등) 맞도록 행 위치로 고름
+    rows = np.flatnonzero(multi)
+    key = "dup_rank" if best_by is None else best_by
+    members = df[["dup_cluster", key]].iloc[rows].reset_index(drop=True)
+    members = members.sort_values(key, ascending=best_by is None, kind="stable")
+    keep = ~multi
+    keep[rows[members.index[~members["dup_cluster"].duplicated()]]] = True
+    return df[keep]
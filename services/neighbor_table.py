@@ -0,0 +1,271 @@
+"""
+사전 계산 유사 상품 테이블 (오프라인 top-K)
+
+배치 작업에서 모든 상품의 카테고리별 상위 K개 이웃을 블록 행렬곱으로 계산해
+Parquet(컬럼형) 파일로 저장하고, 온라인에서는 product_id → 구간 조회(O(1))로 응답한다.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.catalog_version import is_verified_version
+from services.embedding_store import EmbeddingStore
+from services.similarity_engine import SIMILAR_WEIGHTS, ScoredProducts
+
+DEFAULT_TABLE_PATH = "./data/neighbors/neighbors.parquet"
+DEFAULT_TOP_K = 100
+DEFAULT_BLOCK_SIZE = 256
+# 테이블 유효 시간
+MAX_AGE_HOURS = 24
+
+
+def compute_neighbor_table(
+    store: EmbeddingStore,
+    top_k: int = DEFAULT_TOP_K,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> pa.Table:
+    """
+    전체 상품의 카테고리별 top-K 이웃 계산 (블록 행렬곱)
+
+    점수 = 유사도 * 0.5 + 긍정확률 * 0.3 + 정규화_평점 * 0.2
+    자기 자신(같은 product_id)과 벡터가 없는 상품은 제외한다.
+
+    Returns:
+        pa.Table: source_id, category, rank, neighbor_id,
+                  recommend_score, cosine_similarity 컬럼
+    """
+    if store.matrix is None:
+        raise ValueError("이웃 테이블 생성에는 float32 임베딩 저장소가 필요합니다.")
+
+    w_sim, w_sent, w_rating = SIMILAR_WEIGHTS
+    prior = (
+        store.sentiment * w_sent + store.normalized_rating * w_rating
+    ).astype(np.float32)
+
+    # 같은 product_id가 여러 행이면 그만큼 여유 있게 뽑은 뒤 제외
+    _, id_codes, id_counts = np.unique(
+        store.product_ids.astype(str), return_inverse=True, return_counts=True
+    )
+    extra = int(id_counts.max()) if len(id_counts) else 1
+
+    source_rows = np.flatnonzero(store.has_vector)
+    category_cols = [
+        np.flatnonzero((store.category_codes == code) & store.has_vector)
+        for code in range(len(store.category_names))
+    ]
+
+    parts = {name: [] for name in ("src", "nb", "rank", "score", "sim")}
+
+    for start in range(0, len(source_rows), block_size):
+        block = source_rows[start : start + block_size]
+        sims = store.matrix[block] @ store.matrix.T
+
+        for cols in category_cols:
+            if len(cols) == 0:
+                continue
+
+            sub_sim = sims[:, cols]
+            sub_score = sub_sim * w_sim + prior[cols]
+            k_sel = min(top_k + extra, len(cols))
+
+            top = np.argpartition(-sub_score, k_sel - 1, axis=1)[:, :k_sel]
+            top_score = np.take_along_axis(sub_score, top, axis=1)
+            nb_rows = cols[top]
+
+            # 점수 내림차순, 동점이면 행 번호 순
+            order = np.lexsort((nb_rows, -top_score), axis=-1)
+            nb_rows = np.take_along_axis(nb_rows, order, axis=1)
+            top_score = np.take_along_axis(top_score, order, axis=1)
+            top_sim = np.take_along_axis(
+                np.take_along_axis(sub_sim, top, axis=1), order, axis=1
+            )
+
+            src_rows = np.broadcast_to(block[:, None], nb_rows.shape)
+            valid = id_codes[nb_rows] != id_codes[src_rows]
+            rank = np.cumsum(valid, axis=1) - 1
+            keep = valid & (rank < top_k)
+
+            parts["src"].append(src_rows[keep])
+            parts["nb"].append(nb_rows[keep])
+            parts["rank"].append(rank[keep])
+            parts["score"].append(top_score[keep])
+            parts["sim"].append(top_sim[keep])
+
+    if parts["src"]:
+        arrays = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+    else:
+        arrays = {name: np.zeros(0, dtype=np.int64) for name in parts}
+
+    # source 행 → 카테고리 → 순위 순으로 정렬 (온라인 구간 조회용)
+    nb_codes = store.category_codes[arrays["nb"]]
+    order = np.lexsort((arrays["rank"], nb_codes, arrays["src"]))
+
+    ids = store.product_ids.astype(str)
+    category_names = np.asarray(store.category_names).astype(str)
+    table = pa.table(
+        {
+            "source_id": pa.array(ids[arrays["src"][order]]),
+            "category": pa.DictionaryArray.from_arrays(
+                pa.array(nb_codes[order].astype(np.int32)),
+                pa.array(category_names),
+            ),
+            "rank": pa.array(arrays["rank"][order].astype(np.int16)),
+            "neighbor_id": pa.array(ids[arrays["nb"][order]]),
+            "recommend_score": pa.array(arrays["score"][order].astype(np.float32)),
+            "cosine_similarity": pa.array(arrays["sim"][order].astype(np.float32)),
+        }
+    )
+    return table.replace_schema_metadata(
+        {
+            "catalog_version": store.version,
+            "fingerprint": store.fingerprint,
+            "vector_type": store.vector_type,
+            "top_k": str(top_k),
+            "created_at": str(time.time()),
+        }
+    )
+
+
+def write_neighbor_table(table: pa.Table, path: str = DEFAULT_TABLE_PATH):
+    """이웃 테이블을 Parquet 파일로 저장 (임시 파일 작성 후 교체)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+class NeighborTable:
+    """사전 계산 이웃 테이블 (product_id → 행 구간 조회)"""
+
+    def __init__(self, table: pa.Table):
+        meta = {
+            k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()
+        }
+        self.catalog_version = meta.get("catalog_version", "")
+        self.fingerprint = meta.get("fingerprint", "")
+        self.vector_type = meta.get("vector_type", "")
+        self.top_k = int(meta.get("top_k", 0))
+        self.created_at = float(meta.get("created_at", 0))
+
+        self.category = np.asarray(
+            table.column("category").to_pandas().astype(str), dtype=object
+        )
+        self.rank = table.column("rank").to_numpy()
+        self.neighbor_id = table.column("neighbor_id").to_numpy(zero_copy_only=False)
+        self.recommend_score = table.column("recommend_score").to_numpy()
+        self.cosine_similarity = table.column("cosine_similarity").to_numpy()
+
+        source_id = table.column("source_id").to_numpy(zero_copy_only=False)
+        starts = np.flatnonzero(np.r_[True, source_id[1:] != source_id[:-1]])
+        ends = np.r_[starts[1:], len(source_id)]
+        self.offsets = {
+            source_id[s]: (int(s), int(e)) for s, e in zip(starts, ends)
+        }
+
+    def is_fresh(self, store, max_age_hours: float = MAX_AGE_HOURS) -> bool:
+        """
+        현재 저장소와 같은 데이터로 만들었고 유효 시간 이내인지 확인
+
+        카탈로그 버전만으로는 프로세스마다 같은 값이 나올 수 있으므로 저장소 지문도 비교한다.
+        """
+        return (
+            self.catalog_version == store.version
+            and is_verified_version(self.catalog_version)
+            and self.fingerprint == store.fingerprint
+            and self.vector_type == store.vector_type
+            and time.time() - self.created_at < max_age_hours * 3600
+        )
+
+    def lookup(
+        self,
+        product_id: str,
+        categories: Optional[List[str]] = None,
+        top_n: int = 10,
+        admit: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> Optional[ScoredProducts]:
+        """
+        사전 계산된 카테고리별 상위 top_n 이웃 조회
+
+        Args:
+            admit: 이웃 product_id 배열 → 통과 여부 bool 배열 (사전 필터)
+                   필터 후 카테고리별 top_k 목록 안에서 top_n개를 못 채우면 None
+
+        Returns:
+            ScoredProducts (카테고리 순, 카테고리 내 점수순),
+            테이블에 없거나 top_n > top_k 이면 None
+        """
+        span = self.offsets.get(product_id)
+        if span is None or top_n > self.top_k:
+            return None
+
+        start, end = span
+        if admit is None:
+            keep = self.rank[start:end] < top_n
+            if categories:
+                keep &= np.isin(self.category[start:end], list(categories))
+            idx = np.flatnonzero(keep) + start
+        else:
+            idx = np.arange(start, end)
+            if categories:
+                idx = idx[np.isin(self.category[idx], list(categories))]
+            idx = self._admitted_top_n(idx, admit(self.neighbor_id[idx]), top_n)
+            if idx is None:
+                return None
+
+        return ScoredProducts(
+            self.neighbor_id[idx],
+            self.category[idx],
+            self.recommend_score[idx].astype(np.float64),
+            self.cosine_similarity[idx].astype(np.float64),
+        )
+
+    def _admitted_top_n(
+        self, idx: np.ndarray, admitted: np.ndarray, top_n: int
+    ) -> Optional[np.ndarray]:
+        """
+        카테고리별로 통과한 이웃 중 앞에서 top_n개 선택
+
+        테이블 순서가 전체 점수 순서와 같으므로, 목록이 top_k개로 잘려 있지 않거나
+        통과한 이웃이 top_n개 이상이면 필터 적용 결과와 정확히 같다.
+        """
+        if len(idx) == 0:
+            return idx
+
+        cats = self.category[idx]
+        bounds = np.flatnonzero(np.r_[True, cats[1:] != cats[:-1], True])
+
+        picked = []
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            group = idx[s:e][admitted[s:e]][:top_n]
+            if len(group) < top_n and e - s >= self.top_k:
+                return None
+            picked.append(group)
+        return np.concatenate(picked)
+
+
+# =========================
+# 프로세스 공용 캐시
+# =========================
+_tables: Dict[str, tuple] = {}
+_tables_lock = threading.Lock()
+
+
+def get_neighbor_table(path: str = DEFAULT_TABLE_PATH) -> Optional[NeighborTable]:
+    """파일 수정 시각 기준으로 이웃 테이블을 1회만 로드 (파일이 없으면 None)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _tables_lock:
+        cached = _tables.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, NeighborTable(pq.read_table(path)))
+            _tables[path] = cached
+        return cached[1]
@@ -0,0 +1,436 @@
+"""
+임베딩 군집(텍스처/용도 군집) - 오프라인 작업
+
+카테고리 트리와 별개로, 상품 임베딩을 구면 k-means(코사인)로 묶어 "비슷한 사용감/용도" 단위로
+둘러볼 수 있게 한다. 전체 행렬을 한 번에 올리지 않도록
+
+1. 초기 중심: 표본 행에서 k-means++
+2. 학습: 미니배치 k-means (배치마다 가까운 중심에 배정 → 중심별 누적 개수로 학습률을 줄이며 이동)
+3. 배정: 전체 행을 chunk_size 행씩 복원해 가장 가까운 중심과 유사도 계산
+
+결과 (Parquet, 군집 번호 → 중심 유사도 순으로 정렬, 카탈로그 버전/군집 이름 메타데이터 포함):
+    product_id, cluster_id, cluster_rank(군집 내 중심과 가까운 순), cluster_similarity
+중심 벡터는 같은 디렉토리의 centroids.npy에 저장한다.
+화면에서는 미리 계산된 cluster_id로 상품을 고르므로 유사도 계산이 없다.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.catalog_version import get_catalog_version, is_verified_version
+from services.similarity_engine import normalize_rows
+
+DEFAULT_CLUSTER_DIR = "./data/product_clusters"
+DEFAULT_N_CLUSTERS = 24
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_ITERATIONS = 100
+DEFAULT_CHUNK_SIZE = 65536
+# k-means++ 초기화 표본 크기
+DEFAULT_INIT_SAMPLE = 20000
+# 군집 이름에 쓰는 키워드 수
+LABEL_KEYWORDS = 3
+
+
+def _unit_vectors(store, rows: np.ndarray) -> np.ndarray:
+    """지정 행의 벡터를 다시 단위 길이로 (혼합 저장소는 블록별 정규화라 길이가 1이 아님)"""
+    return normalize_rows(np.array(store.vectors(rows), dtype=np.float32))
+
+
+def _init_centroids(
+    store, rows: np.ndarray, k: int, rng: np.random.Generator, sample_size: int
+) -> np.ndarray:
+    """표본 행에서 k-means++ 초기 중심 선택 (거리 = 1 - 코사인)"""
+    sample = rng.choice(rows, size=min(sample_size, len(rows)), replace=False)
+    vectors = _unit_vectors(store, np.sort(sample))
+
+    centroids = np.empty((k, vectors.shape[1]), dtype=np.float32)
+    centroids[0] = vectors[rng.integers(len(vectors))]
+    distance = np.maximum(1.0 - vectors @ centroids[0], 0.0)
+    for c in range(1, k):
+        total = distance.sum()
+        if total <= 0:
+            pick = rng.integers(len(vectors))
+        else:
+            pick = rng.choice(len(vectors), p=distance / total)
+        centroids[c] = vectors[pick]
+        distance = np.minimum(distance, np.maximum(1.0 - vectors @ centroids[c], 0.0))
+    return centroids
+
+
+def minibatch_kmeans(
+    store,
+    n_clusters: int = DEFAULT_N_CLUSTERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_iter: int = DEFAULT_ITERATIONS,
+    init_sample: int = DEFAULT_INIT_SAMPLE,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    미니배치 구면 k-means 중심 학습
+
+    배치마다 가까운 중심에 배정한 뒤 중심 c를
+        c ← (1 - η)·c + η·(배치 내 배정 벡터 평균),  η = 이번 배정 수 / 누적 배정 수
+    로 옮기고 단위 길이로 맞춘다. 한 번에 메모리에 올리는 벡터는 batch_size 행뿐이다.
+
+    Returns:
+        정규화된 중심 (n_clusters, dim) float32
+    """
+    rows = np.flatnonzero(store.has_vector)
+    if len(rows) == 0:
+        raise ValueError("벡터가 있는 상품이 없습니다")
+    n_clusters = min(n_clusters, len(rows))
+    rng = np.random.default_rng(seed)
+
+    centroids = _init_centroids(store, rows, n_clusters, rng, init_sample)
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    for _ in range(n_iter):
+        batch = np.sort(rng.choice(rows, size=min(batch_size, len(rows)), replace=False))
+        vectors = _unit_vectors(store, batch)
+        assigned = np.argmax(vectors @ centroids.T, axis=1)
+
+        batch_counts = np.bincount(assigned, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assigned, vectors)
+        counts += batch_counts
+
+        moved = batch_counts > 0
+        eta = (batch_counts[moved] / counts[moved]).astype(np.float32)[:, None]
+        means = sums[moved] / batch_counts[moved, None]
+        centroids[moved] = (1.0 - eta) * centroids[moved] + eta * means
+        normalize_rows(centroids)
+    return centroids
+
+
+def assign_clusters(
+    store, centroids: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    전체 행을 가장 가까운 중심에 배정 (chunk_size 행씩)
+
+    Returns:
+        (cluster_id (n,) int32 - 벡터 없는 행은 -1, 중심과의 코사인 유사도 (n,) float32)
+    """
+    n = len(store)
+    labels = np.full(n, -1, dtype=np.int32)
+    similarity = np.zeros(n, dtype=np.float32)
+    rows = np.flatnonzero(store.has_vector)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        scores = _unit_vectors(store, chunk) @ centroids.T
+        best = np.argmax(scores, axis=1)
+        labels[chunk] = best
+        similarity[chunk] = scores[np.arange(len(chunk)), best]
+    return labels, similarity
+
+
+def _cluster_labels(store, labels: np.ndarray, n_clusters: int) -> List[str]:
+    """
+    군집 이름 - 전체 대비 군집에서 유난히 많이 등장하는 키워드 LABEL_KEYWORDS개
+
+    점수 = 군집 내 키워드 비율 - 전체 키워드 비율 (흔한 키워드가 모든 군집 이름을 차지하지 않게)
+    """
+    index = store.keyword_index
+    vocabulary = len(index.vocabulary)
+    if vocabulary == 0:
+        return [f"군집 {c + 1}" for c in range(n_clusters)]
+
+    entry_cluster = np.repeat(labels, index.sizes)
+    valid = entry_cluster >= 0
+    counts = np.bincount(
+        entry_cluster[valid].astype(np.int64) * vocabulary + index.indices[valid],
+        minlength=n_clusters * vocabulary,
+    ).reshape(n_clusters, vocabulary)
+
+    sizes = np.bincount(labels[labels >= 0], minlength=n_clusters)
+    share = counts / np.maximum(sizes, 1)[:, None]
+    lift = share - counts.sum(axis=0) / max(int(sizes.sum()), 1)
+
+    names = []
+    for c in range(n_clusters):
+        order = np.argsort(-lift[c], kind="stable")
+        picked = [index.vocabulary[k] for k in order[:LABEL_KEYWORDS] if counts[c, k] > 0]
+        names.append(" · ".join(picked) if picked else f"군집 {c + 1}")
+    return names
+
+
+def build_product_clusters(
+    store,
+    n_clusters: int = DEFAULT_N_CLUSTERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_iter: int = DEFAULT_ITERATIONS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: int = 0,
+    verbose: bool = True,
+) -> "ProductClusters":
+    """
+    임베딩 군집 계산 (미니배치 k-means + 전체 배정 + 군집 이름)
+
+    Returns:
+        ProductClusters (product_id당 1행)
+    """
+    start = time.perf_counter()
+    centroids = minibatch_kmeans(store, n_clusters, batch_size, n_iter, seed=seed)
+    fit_s = time.perf_counter() - start
+    labels, similarity = assign_clusters(store, centroids, chunk_size)
+    n_clusters = len(centroids)
+
+    # 군집 내 순위: 중심과 가까운 순, 같으면 행 번호 순 (벡터 없는 행은 제외)
+    rows = np.flatnonzero(labels >= 0)
+    order = rows[np.lexsort((rows, -similarity[rows], labels[rows]))]
+    sorted_labels = labels[order]
+    starts = np.searchsorted(sorted_labels, np.arange(n_clusters))
+    rank = np.arange(len(order)) - starts[sorted_labels]
+
+    frame = pd.DataFrame(
+        {
+            "product_id": store.product_ids[order].astype(str),
+            "cluster_id": sorted_labels,
+            "cluster_rank": rank.astype(np.int32),
+            "cluster_similarity": similarity[order],
+        }
+    ).drop_duplicates("product_id")
+
+    clusters = ProductClusters(
+        frame.reset_index(drop=True),
+        centroids,
+        _cluster_labels(store, labels, n_clusters),
+        catalog_version=store.version,
+        vector_type=store.vector_type,
+    )
+    if verbose:
+        sizes = clusters.sizes
+        print(
+            f"✓ 임베딩 군집 {n_clusters}개: 학습 {fit_s:.1f}초, "
+            f"총 {time.perf_counter() - start:.1f}초, 평균 중심 유사도 "
+            f"{float(similarity[rows].mean()) if len(rows) else 0.0:.3f}, "
+            f"군집 크기 {int(sizes.min()):,}~{int(sizes.max()):,}"
+        )
+    return clusters
+
+
+class ProductClusters:
+    """
+    미리 계산된 임베딩 군집 (군집 번호 → 행 구간 조회)
+
+    frame은 (cluster_id, cluster_rank) 순으로 정렬되어 있어
+    군집의 상품 목록은 offsets 구간을 잘라 읽기만 하면 된다.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        centroids: np.ndarray,
+        labels: List[str],
+        catalog_version: str = "",
+        vector_type: str = "",
+    ):
+        self.frame = frame
+        self.centroids = centroids
+        self.labels = list(labels)
+        self.catalog_version = catalog_version
+        self.vector_type = vector_type
+
+        cluster_id = frame["cluster_id"].to_numpy()
+        self.offsets = np.searchsorted(cluster_id, np.arange(len(centroids) + 1))
+
+    def __len__(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """군집별 상품 수"""
+        return np.diff(self.offsets)
+
+    def members(self, cluster_id: int, limit: Optional[int] = None) -> np.ndarray:
+        """군집 상품 product_id (중심과 가까운 순)"""
+        start, end = self.offsets[cluster_id], self.offsets[cluster_id + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.frame["product_id"].to_numpy()[start:end]
+
+    def summary(self) -> pd.DataFrame:
+        """군집 목록 (cluster_id, label, size) - 큰 군집 순, 빈 군집 제외"""
+        summary = pd.DataFrame(
+            {
+                "cluster_id": np.arange(len(self), dtype=np.int32),
+                "label": self.labels,
+                "size": self.sizes,
+            }
+        )
+        summary = summary[summary["size"] > 0]
+        return summary.sort_values(
+            ["size", "cluster_id"], ascending=[False, True], kind="stable"
+        ).reset_index(drop=True)
+
+
+def _cluster_paths(cluster_dir: str) -> Tuple[str, str]:
+    return (
+        os.path.join(cluster_dir, "product_clusters.parquet"),
+        os.path.join(cluster_dir, "centroids.npy"),
+    )
+
+
+def write_product_clusters(
+    clusters: ProductClusters, cluster_dir: str = DEFAULT_CLUSTER_DIR
+):
+    """
+    군집 배정 Parquet + 중심 벡터 저장 (임시 파일 작성 후 교체)
+
+    중심 벡터를 먼저 교체하고 Parquet를 나중에 교체한다.
+    로더는 Parquet 수정 시각을 기준으로 둘을 함께 다시 읽는다.
+    """
+    parquet_path, centroid_path = _cluster_paths(cluster_dir)
+    os.makedirs(cluster_dir, exist_ok=True)
+
+    tmp_centroids = f"{centroid_path}.tmp.npy"
+    np.save(tmp_centroids, clusters.centroids.astype(np.float32))
+    os.replace(tmp_centroids, centroid_path)
+
+    table = pa.Table.from_pandas(clusters.frame, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            "catalog_version": clusters.catalog_version,
+            "vector_type": clusters.vector_type,
+            "labels": json.dumps(clusters.labels, ensure_ascii=False),
+            "created_at": str(time.time()),
+        }
+    )
+    tmp_path = f"{parquet_path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, parquet_path)
+
+
+_cluster_tables: Dict[str, tuple] = {}
+_cluster_tables_lock = threading.Lock()
+
+
+def load_product_clusters(
+    cluster_dir: str = DEFAULT_CLUSTER_DIR,
+) -> Optional[ProductClusters]:
+    """
+    임베딩 군집 로드 (파일 수정 시각 기준 1회)
+
+    파일이 없거나 현재 카탈로그 버전과 다르면 None
+    (데이터를 읽기 전 unverified 버전이면 어느 데이터의 결과인지 알 수 없으므로 None)
+    """
+    parquet_path, centroid_path = _cluster_paths(cluster_dir)
+    try:
+        mtime = os.path.getmtime(parquet_path)
+    except OSError:
+        return None
+
+    with _cluster_tables_lock:
+        cached = _cluster_tables.get(cluster_dir)
+        if cached is None or cached[0] != mtime:
+            table = pq.read_table(parquet_path)
+            meta = {
+                k.decode(): v.decode()
+                for k, v in (table.schema.metadata or {}).items()
+            }
+            clusters = ProductClusters(
+                table.to_pandas(),
+                np.load(centroid_path),
+                json.loads(meta.get("labels", "[]")),
+                catalog_version=meta.get("catalog_version", ""),
+                vector_type=meta.get("vector_type", ""),
+            )
+            cached = (mtime, clusters)
+            _cluster_tables[cluster_dir] = cached
+
+    version = get_catalog_version()
+    if cached[1].catalog_version != version or not is_verified_version(version):
+        return None
+    return cached[1]
+
+
+class ClusterRows:
+    """
+    DataFrame 행 위치를 (cluster_id, cluster_rank) 순으로 정렬한 순열
+
+    attach_product_clusters()가 결과 DataFrame의 attrs["cluster_rows"]에 붙여 두면
+    cluster_products()는 군집 구간을 잘라 take만 한다.
+    attrs는 파생 DataFrame(필터/정렬 결과)에도 그대로 따라가므로 행 수와
+    꺼낸 행의 cluster_id / cluster_rank를 확인한 뒤에만 쓴다.
+    """
+
+    def __init__(self, cluster_id: np.ndarray, cluster_rank: np.ndarray):
+        self.n = len(cluster_id)
+        self.order = np.lexsort((cluster_rank, cluster_id))
+        self.sorted_ids = cluster_id[self.order]
+        for arr in (self.order, self.sorted_ids):
+            arr.setflags(write=False)
+
+    def __deepcopy__(self, memo) -> "ClusterRows":
+        # 읽기 전용이므로 attrs를 복사하는 파생 DataFrame과 공유
+        return self
+
+    def positions(self, df: pd.DataFrame, cluster_id: int) -> Optional[np.ndarray]:
+        """df에서 군집의 행 위치 (중심과 가까운 순), df가 만들 때와 다른 행 구성이면 None"""
+        if len(df) != self.n:
+            return None
+        start, end = np.searchsorted(self.sorted_ids, [cluster_id, cluster_id + 1])
+        positions = self.order[start:end]
+        ranks = df["cluster_rank"].to_numpy()[positions]
+        if (df["cluster_id"].to_numpy()[positions] != cluster_id).any() or (
+            np.diff(ranks) < 0
+        ).any():
+            return None
+        return positions
+
+
+def attach_product_clusters(
+    df: pd.DataFrame, clusters: Optional[ProductClusters] = None
+) -> pd.DataFrame:
+    """
+    상품 DataFrame에 cluster_id / cluster_rank 컬럼 추가
+
+    군집 파일이 없거나 목록에 없는 상품(벡터 없음 등)은 cluster_id = -1
+    군집별 행 위치(ClusterRows)는 attrs["cluster_rows"]에 미리 계산해 둔다.
+    """
+    if clusters is None:
+        clusters = load_product_clusters()
+
+    df = df.drop(columns=["cluster_id", "cluster_rank"], errors="ignore")
+    if clusters is None:
+        return df.assign(cluster_id=np.int32(-1), cluster_rank=np.int32(0))
+
+    product_ids = df["product_id"].astype(str)
+    indexed = clusters.frame.set_index("product_id")
+    cluster_id = product_ids.map(indexed["cluster_id"]).fillna(-1).astype(np.int32)
+    cluster_rank = product_ids.map(indexed["cluster_rank"]).fillna(0).astype(np.int32)
+    df = df.assign(cluster_id=cluster_id, cluster_rank=cluster_rank)
+    df.attrs["cluster_rows"] = ClusterRows(cluster_id.to_numpy(), cluster_rank.to_numpy())
+    return df
+
+
+def cluster_products(df: pd.DataFrame, cluster_id: int) -> pd.DataFrame:
+    """
+    군집 상품 (중심과 가까운 순)
+
+    attach_product_clusters()가 붙인 군집별 행 위치가 있으면 그대로 take하고,
+    없거나 df의 행 구성이 바뀌었으면 cluster_id 비교 후 cluster_rank로 정렬한다.
+    """
+    if "cluster_id" not in df.columns:
+        return df.iloc[:0]
+    rows = df.attrs.get("cluster_rows")
+    positions = rows.positions(df, cluster_id) if isinstance(rows, ClusterRows) else None
+    if positions is not None:
+        return df.take(positions)
+    positions = np.flatnonzero(df["cluster_id"].to_numpy() == cluster_id)
+    return df.iloc[positions].sort_values("cluster_rank", kind="stable")
+
+
+def cluster_representatives(df: pd.DataFrame, per_cluster: int = 3) -> pd.DataFrame:
+    """군집별 대표 상품 (중심과 가장 가까운 per_cluster개, cluster_id / cluster_rank 순)"""
+    if "cluster_id" not in df.columns:
+        return df.iloc[:0]
+    heads = df[(df["cluster_id"] >= 0) & (df["cluster_rank"] < per_cluster)]
+    return heads.sort_values(["cluster_id", "cluster_rank"], kind="stable")
@@ -0,0 +1,368 @@
+"""
+추천 검색용 사전 필터 (카테고리 / 피부 타입 / 가격 / 평점)
+
+사이드바 조건을 임베딩 저장소 행에 대한 bool 마스크로 바꿔
+조건을 통과한 행만 점수 계산하도록 한다.
+- 카테고리/피부 타입: 값별 비트맵(np.packbits)을 미리 만들어 두고 OR
+- 가격/평점: 정렬된 값 배열에서 searchsorted로 구간 선택
+- 화면용 카탈로그 필터(filter_catalog)는 rows()로 통과한 행 번호만 받는다
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 메인 카테고리 목록
+MAIN_CATS = [
+    "스킨케어",
+    "클렌징/필링",
+    "선케어/태닝",
+    "메이크업",
+]
+
+
+def norm_cat(path: str) -> str:
+    """카테고리 경로 정규화"""
+    if not isinstance(path, str):
+        return ""
+    parts = [p.strip() for p in path.split(">")]
+    for main in MAIN_CATS:
+        if main in parts:
+            idx = parts.index(main)
+            return " > ".join(parts[idx:])
+    return ""
+
+
+def split_category(path: str) -> tuple:
+    """카테고리 경로를 main/middle/sub로 분리"""
+    if not isinstance(path, str):
+        return "", "", ""
+    parts = [p.strip() for p in path.split(">")]
+    main = parts[0] if len(parts) >= 1 else ""
+    middle = parts[1] if len(parts) >= 2 else ""
+    sub = parts[-1] if len(parts) >= 3 else (parts[-1] if parts else "")
+    return main, middle, sub
+
+
+def _unique_codes(values: pd.Series) -> Tuple[np.ndarray, list]:
+    """값 → (고유값 번호, 고유값 목록), 결측은 마지막 번호(None)로"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = list(uniques) + [None]
+    codes = np.where(codes < 0, len(uniques) - 1, codes)
+    return codes, uniques
+
+
+def normalize_category_paths(paths: pd.Series) -> pd.Series:
+    """norm_cat()을 고유 경로마다 한 번만 계산해 전체 행에 매핑"""
+    codes, uniques = _unique_codes(paths)
+    normalized = np.array([norm_cat(p) for p in uniques], dtype=object)
+    return pd.Series(normalized[codes], index=paths.index)
+
+
+def split_category_paths(paths: pd.Series) -> pd.DataFrame:
+    """
+    split_category()를 고유 경로마다 한 번만 계산해 전체 행에 매핑
+
+    Returns:
+        main_category, middle_category, sub_category 컬럼 DataFrame (paths와 같은 인덱스)
+    """
+    codes, uniques = _unique_codes(paths)
+    parts = np.array([split_category(p) for p in uniques], dtype=object).reshape(-1, 3)
+    return pd.DataFrame(
+        {
+            "main_category": parts[codes, 0],
+            "middle_category": parts[codes, 1],
+            "sub_category": parts[codes, 2],
+        },
+        index=paths.index,
+    )
+
+
+def rating_scores(counts: pd.DataFrame) -> pd.Series:
+    """
+    화면용 카탈로그 평점(score): 별점 분포 가중평균 (소수 2자리, 리뷰 없으면 0)
+
+    Args:
+        counts: rating_1~5, total_reviews 컬럼 (make_df는 product_id별 합계를 넘긴다)
+    """
+    weighted = sum(counts[f"rating_{i}"] * i for i in range(1, 6))
+    return (weighted / counts["total_reviews"]).round(2).fillna(0)
+
+
+class ProductFilter:
+    """
+    사이드바 검색 조건
+
+    None인 조건은 적용하지 않는다. 범위 조건은 양 끝 포함.
+    """
+
+    def __init__(
+        self,
+        sub_categories: Optional[List[str]] = None,
+        skin_types: Optional[List[str]] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ):
+        self.sub_categories = sub_categories
+        self.skin_types = skin_types
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def key(self) -> tuple:
+        """캐시 키"""
+        return (
+            tuple(sorted(self.sub_categories)) if self.sub_categories else None,
+            tuple(sorted(self.skin_types)) if self.skin_types else None,
+            self.min_rating,
+            self.max_rating,
+            self.min_price,
+            self.max_price,
+        )
+
+    def to_dict(self) -> dict:
+        """JSON 직렬화용 딕셔너리"""
+        return {
+            "sub_categories": self.sub_categories,
+            "skin_types": self.skin_types,
+            "min_rating": self.min_rating,
+            "max_rating": self.max_rating,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["ProductFilter"]:
+        """to_dict() 결과로 복원 (None이면 None)"""
+        if not data:
+            return None
+        return cls(**{k: data.get(k) for k in cls().to_dict()})
+
+    def __repr__(self) -> str:
+        return f"ProductFilter{self.key()}"
+
+
+class FilterIndex:
+    """
+    저장소 행 기준 필터 인덱스
+
+    products에 sub_category(없으면 category_path에서 계산), skin_type,
+    score(없으면 make_df와 같이 product_id별 rating_1~5 / total_reviews 합계로 계산),
+    price 컬럼을 사용한다.
+    컬럼이 없으면 해당 조건은 적용하지 않는다.
+    """
+
+    def __init__(self, products: pd.DataFrame):
+        self.n = len(products)
+        self.sub_category = _bitmaps(_sub_category_column(products))
+        self.skin_type = _bitmaps(_optional_column(products, "skin_type"))
+        self.score = _sorted_values(_score_column(products))
+        self.price = _sorted_values(_optional_column(products, "price"))
+        # 행별 정렬 순위 (결측 -1) - rows()가 후보 행만 범위 비교
+        self.score_rank = _ranks(self.score, self.n)
+        self.price_rank = _ranks(self.price, self.n)
+
+    def mask(self, product_filter: Optional[ProductFilter]) -> Optional[np.ndarray]:
+        """
+        조건을 통과하는 행 bool 마스크
+
+        Returns:
+            bool 배열 (n,), 모든 행이 통과하면 None
+        """
+        if product_filter is None:
+            return None
+
+        masks = [
+            self._values_mask(self.sub_category, product_filter.sub_categories),
+            self._values_mask(self.skin_type, product_filter.skin_types),
+            self._range_mask(
+                self.score, product_filter.min_rating, product_filter.max_rating
+            ),
+            self._range_mask(
+                self.price, product_filter.min_price, product_filter.max_price
+            ),
+        ]
+        masks = [m for m in masks if m is not None]
+        if not masks:
+            return None
+
+        admitted = np.logical_and.reduce(masks)
+        if admitted.all():
+            return None
+        return admitted
+
+    def rows(self, product_filter: Optional[ProductFilter]) -> Optional[np.ndarray]:
+        """
+        조건을 통과하는 행 번호 (오름차순)
+
+        값 조건은 비트맵을 압축된 채로 AND 한 뒤 한 번만 풀고,
+        범위 조건은 남은 후보 행의 정렬 순위만 비교한다 (bool 마스크 (n,)를 조건마다 만들지 않음).
+
+        Returns:
+            int 배열, 모든 행이 통과하면 None
+        """
+        if product_filter is None:
+            return None
+
+        packed = [
+            p
+            for p in (
+                self._values_packed(self.sub_category, product_filter.sub_categories),
+                self._values_packed(self.skin_type, product_filter.skin_types),
+            )
+            if p is not None
+        ]
+        ranges = [
+            (ranks, bounds)
+            for ranks, bounds in (
+                (
+                    self.score_rank,
+                    _range_bounds(
+                        self.score, product_filter.min_rating, product_filter.max_rating
+                    ),
+                ),
+                (
+                    self.price_rank,
+                    _range_bounds(
+                        self.price, product_filter.min_price, product_filter.max_price
+                    ),
+                ),
+            )
+            # 모든 행이 들어가는 범위(예: 평점 0~5)는 건너뜀
+            if bounds is not None and bounds != (0, self.n)
+        ]
+        if not packed and not ranges:
+            return None
+
+        rows = None
+        if packed:
+            bits = np.unpackbits(np.bitwise_and.reduce(packed), count=self.n)
+            rows = np.flatnonzero(bits.view(bool))
+        keep = None
+        for ranks, (start, end) in ranges:
+            candidate = ranks if rows is None else ranks[rows]
+            admitted = (candidate >= start) & (candidate < end)
+            keep = admitted if keep is None else keep & admitted
+        if keep is not None:
+            rows = np.flatnonzero(keep) if rows is None else rows[keep]
+
+        if len(rows) == self.n:
+            return None
+        return rows
+
+    def _values_packed(
+        self, bitmaps: Optional[Dict[str, np.ndarray]], values: Optional[List[str]]
+    ) -> Optional[np.ndarray]:
+        """값 조건의 압축 비트맵 (값별 비트맵 OR)"""
+        if bitmaps is None or not values:
+            return None
+        packed = [bitmaps[v] for v in set(values) if v in bitmaps]
+        if not packed:
+            return np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(packed)
+
+    def _values_mask(
+        self, bitmaps: Optional[Dict[str, np.ndarray]], values: Optional[List[str]]
+    ) -> Optional[np.ndarray]:
+        packed = self._values_packed(bitmaps, values)
+        if packed is None:
+            return None
+        return np.unpackbits(packed, count=self.n).astype(bool)
+
+    def _range_mask(
+        self,
+        sorted_values: Optional[Tuple[np.ndarray, np.ndarray]],
+        low: Optional[float],
+        high: Optional[float],
+    ) -> Optional[np.ndarray]:
+        bounds = _range_bounds(sorted_values, low, high)
+        if bounds is None:
+            return None
+        start, end = bounds
+        mask = np.zeros(self.n, dtype=bool)
+        mask[sorted_values[1][start:end]] = True
+        return mask
+
+
+def _optional_column(products: pd.DataFrame, name: str) -> Optional[pd.Series]:
+    return products[name] if name in products.columns else None
+
+
+def _sub_category_column(products: pd.DataFrame) -> Optional[pd.Series]:
+    """UI(make_df/normalize_columns)와 같은 규칙의 sub_category"""
+    if "sub_category" in products.columns:
+        return products["sub_category"]
+    if "category_path" not in products.columns:
+        return None
+    # 경로 종류가 적으므로 고유값 단위로 계산
+    return split_category_paths(normalize_category_paths(products["category_path"]))[
+        "sub_category"
+    ]
+
+
+def _score_column(products: pd.DataFrame) -> Optional[pd.Series]:
+    """
+    화면용 카탈로그와 같은 평점 (make_df의 score)
+
+    Athena 원본 행(임베딩 저장소)에는 score가 없으므로 make_df와 똑같이
+    같은 product_id 행의 별점 개수를 합쳐 rating_scores()로 계산한다.
+    """
+    if "score" in products.columns:
+        return products["score"]
+    count_cols = [f"rating_{i}" for i in range(1, 6)] + ["total_reviews"]
+    if all(c in products.columns for c in count_cols):
+        counts = products[count_cols].apply(pd.to_numeric, errors="coerce")
+        return rating_scores(counts.groupby(products["product_id"]).transform("sum"))
+    return _optional_column(products, "avg_rating_with_text")
+
+
+def _bitmaps(values: Optional[pd.Series]) -> Optional[Dict[str, np.ndarray]]:
+    """값별 행 비트맵 (np.packbits)"""
+    if values is None:
+        return None
+    codes, uniques = pd.factorize(values)
+    return {
+        value: np.packbits(codes == code) for code, value in enumerate(uniques)
+    }
+
+
+def _sorted_values(
+    values: Optional[pd.Series],
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(정렬된 값, 원래 행 번호) - 결측은 제외"""
+    if values is None:
+        return None
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    rows = np.flatnonzero(~np.isnan(values))
+    order = rows[np.argsort(values[rows], kind="stable")]
+    return values[order], order
+
+
+def _range_bounds(
+    sorted_values: Optional[Tuple[np.ndarray, np.ndarray]],
+    low: Optional[float],
+    high: Optional[float],
+) -> Optional[Tuple[int, int]]:
+    """양 끝 포함 범위 → 정렬 배열 구간 [start, end) (조건이 없으면 None)"""
+    if sorted_values is None or (low is None and high is None):
+        return None
+    values = sorted_values[0]
+    start = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+    end = len(values) if high is None else int(np.searchsorted(values, high, side="right"))
+    return start, end
+
+
+def _ranks(
+    sorted_values: Optional[Tuple[np.ndarray, np.ndarray]], n: int
+) -> Optional[np.ndarray]:
+    """행별 정렬 배열 위치 (결측 행은 -1 → 어떤 범위에도 들지 않음)"""
+    if sorted_values is None:
+        return None
+    ranks = np.full(n, -1, dtype=np.int32 if n < 2**31 else np.int64)
+    order = sorted_values[1]
+    ranks[order] = np.arange(len(order), dtype=ranks.dtype)
+    return ranks
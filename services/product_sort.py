@@ -0,0 +1,107 @@
+"""
+화면 정렬 옵션 / 미리 계산한 정렬 순서
+
+정렬 옵션별 정렬 기준을 한곳에 두고, 화면용 카탈로그 전체의 정렬 순서(행 번호 순열)와
+행별 순위를 카탈로그 버전당 한 번 계산해 둔다.
+필터 결과(카탈로그 행 부분집합)는 정렬하지 않고 미리 계산한 순서에서 해당 행만 골라 순서를 얻는다.
+- 결과가 크면: 순열에서 포함된 행만 남김 (perm[member[perm]])
+- 결과가 작으면: 행별 순위만 정렬 (정수 1개 키)
+
+sort_values의 여러 컬럼 정렬은 안정 정렬이므로, 전체 순서에서 부분집합을 고른 결과는
+부분집합을 (카탈로그 행 순서대로) 직접 정렬한 결과와 같다.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 정렬 옵션 → (정렬 컬럼, 오름차순 여부)
+SORT_KEYS: Dict[str, Tuple[List[str], List[bool]]] = {
+    "추천순": (["badge_rank", "score", "total_reviews"], [True, False, False]),
+    "평점 높은 순": (["score", "total_reviews"], [False, False]),
+    "리뷰 많은 순": (["total_reviews", "score"], [False, False]),
+    "가격 낮은 순": (["price", "score"], [True, False]),
+    "가격 높은 순": (["price", "score"], [False, False]),
+}
+DEFAULT_SORT = "추천순"
+# 인기 상품 TOP 5 기준 (리뷰 많은 순 → 평점 높은 순)
+POPULAR = "인기"
+POPULAR_KEYS = (["total_reviews", "score"], [False, False])
+
+# 뱃지 순서
+BADGE_ORDER = {"BEST": 0, "추천": 1, "": 2}
+
+
+def sort_keys(sort_option: str) -> Tuple[List[str], List[bool]]:
+    """정렬 옵션의 기준 (모르는 옵션은 기본 정렬)"""
+    return SORT_KEYS.get(sort_option, SORT_KEYS[DEFAULT_SORT])
+
+
+def badge_rank(df: pd.DataFrame) -> pd.Series:
+    """뱃지 순서 (BEST → 추천 → 없음)"""
+    badge = df["badge"] if "badge" in df.columns else pd.Series("", index=df.index)
+    return badge.map(BADGE_ORDER).fillna(2).astype(np.int8)
+
+
+def popular_columns(df: pd.DataFrame) -> Tuple[List[str], List[bool]]:
+    """인기 상품 정렬 기준 중 df에 있는 컬럼만"""
+    columns, ascending = POPULAR_KEYS
+    present = [i for i, c in enumerate(columns) if c in df.columns]
+    return [columns[i] for i in present], [ascending[i] for i in present]
+
+
+class SortIndex:
+    """
+    화면용 카탈로그 정렬 순서 (정렬 옵션 + 인기 상품)
+
+    옵션별로 순열 perm (정렬된 행 번호)과 순위 rank (rank[perm] = 0..n-1)를 가진다.
+    정렬 컬럼이 없는 옵션은 만들지 않는다 (호출하는 쪽에서 sort_values로 처리).
+    """
+
+    def __init__(self, products: pd.DataFrame):
+        self.n = len(products)
+        keyed = products.assign(badge_rank=badge_rank(products)).reset_index(drop=True)
+        # 행별 뱃지 순서 (정렬 결과에 badge_rank 컬럼으로 붙임)
+        self.badge_rank = keyed["badge_rank"].to_numpy()
+
+        self.orders: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        specs = dict(SORT_KEYS)
+        if popular_columns(products)[0]:
+            specs[POPULAR] = popular_columns(products)
+        for option, (columns, ascending) in specs.items():
+            if not all(c in keyed.columns for c in columns):
+                continue
+            perm = keyed[columns].sort_values(by=columns, ascending=ascending).index.to_numpy()
+            rank = np.empty(self.n, dtype=np.int32 if self.n < 2**31 else np.int64)
+            rank[perm] = np.arange(self.n, dtype=rank.dtype)
+            self.orders[option] = (perm, rank)
+
+    def has(self, option: str) -> bool:
+        return option in self.orders
+
+    def top(self, option: str, k: int) -> np.ndarray:
+        """옵션 기준 상위 k개 행 번호"""
+        return self.orders[option][0][:k]
+
+    def order(self, option: str, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        positions(카탈로그 행 번호, 중복 없음)의 정렬 순서
+
+        Returns:
+            positions 안의 위치 배열 (positions[order]가 정렬된 행 번호),
+            positions가 None이면 전체 카탈로그의 정렬된 행 번호
+        """
+        perm, rank = self.orders[option]
+        if positions is None:
+            return perm
+        m = len(positions)
+        if m * np.log2(max(m, 2)) < self.n:
+            # 작은 결과: 순위 정수만 정렬
+            return np.argsort(rank[positions], kind="stable")
+        # 큰 결과: 전체 순서에서 포함된 행만 남김
+        member = np.zeros(self.n, dtype=bool)
+        member[positions] = True
+        slot = np.empty(self.n, dtype=np.int64)
+        slot[positions] = np.arange(m)
+        return slot[perm[member[perm]]]
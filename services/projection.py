@@ -0,0 +1,226 @@
+"""
+임베딩 차원 축소 (PCA)
+
+오프라인에서 카탈로그 임베딩으로 PCA를 학습해 저장소와 함께 보관하고,
+온라인에서는 축소 공간에서 1차 후보를 뽑은 뒤 원래 벡터로 재정렬한다.
+
+코사인 유사도 근사:
+    x · q = (x - μ) · (q - μ) + x · μ + q · μ - μ · μ
+          ≈ z_x · z_q + offset_x + (q · μ - μ · μ)
+    z = (x - μ) W  (W: 상위 주성분, d × k),  offset_x = x · μ (행마다 미리 계산)
+평균 방향 성분을 따로 보존하므로 축소 후에도 유사도 크기가 원래와 같은 척도다.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_PCA_DIM = 128
+# PCA 학습에 사용할 최대 표본 수
+DEFAULT_FIT_SAMPLE = 20000
+
+
+class PcaProjection:
+    """
+    PCA 투영과 축소된 카탈로그 행렬
+
+    Attributes:
+        mean: 평균 벡터 μ (d,)
+        components: 주성분 W (d, k)
+        reduced: 축소 행렬 z (n, k) float32
+        offset: x · μ (n,) float32
+        explained: 보존된 분산 비율
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        components: np.ndarray,
+        reduced: np.ndarray,
+        offset: np.ndarray,
+        explained: float = float("nan"),
+    ):
+        self.mean = mean
+        self.components = components
+        self.reduced = reduced
+        self.offset = offset
+        self.explained = explained
+        self._mean_sq = float(mean @ mean)
+        for arr in (self.mean, self.components, self.reduced, self.offset):
+            arr.setflags(write=False)
+
+    @classmethod
+    def fit(
+        cls,
+        matrix: np.ndarray,
+        has_vector: np.ndarray,
+        n_components: int = DEFAULT_PCA_DIM,
+        sample: int = DEFAULT_FIT_SAMPLE,
+        seed: int = 0,
+    ) -> "PcaProjection":
+        """
+        행 정규화된 임베딩 행렬로 PCA 학습 (표본 SVD) 후 전체 행렬 축소
+
+        벡터가 없는 행은 학습에서 빼고, 축소 결과도 0으로 둔다.
+        """
+        rows = np.flatnonzero(has_vector)
+        if len(rows) > sample:
+            rng = np.random.default_rng(seed)
+            rows = np.sort(rng.choice(rows, size=sample, replace=False))
+
+        fit_matrix = np.asarray(matrix[rows], dtype=np.float32)
+        mean = fit_matrix.mean(axis=0)
+        centered = fit_matrix - mean
+        _, singular, vt = np.linalg.svd(centered, full_matrices=False)
+
+        n_components = min(n_components, vt.shape[0])
+        components = np.ascontiguousarray(vt[:n_components].T, dtype=np.float32)
+        variance = singular**2
+        explained = float(variance[:n_components].sum() / max(variance.sum(), 1e-12))
+
+        reduced, offset = _project(matrix, has_vector, mean, components)
+        return cls(mean, components, reduced, offset, explained)
+
+    @property
+    def dim(self) -> int:
+        """축소 차원"""
+        return self.components.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.reduced.nbytes + self.offset.nbytes + self.components.nbytes
+
+    def project_query(self, vector: np.ndarray) -> np.ndarray:
+        """기준 벡터를 축소 공간으로 투영 (q - μ) W"""
+        vector = np.asarray(vector, dtype=np.float32)
+        return (vector - self.mean) @ self.components
+
+    def dot(self, vector: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        축소 공간에서 근사한 코사인 유사도
+
+        Returns:
+            float32 배열 (len(rows),)
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        constant = float(vector @ self.mean) - self._mean_sq
+        query = self.project_query(vector)
+        if rows is None:
+            return self.reduced @ query + self.offset + constant
+        # 행이 전체의 절반을 넘으면 전체 곱 후 인덱싱 (행 복사 방지)
+        if len(rows) * 2 > len(self.reduced):
+            return (self.reduced @ query + self.offset)[rows] + constant
+        return self.reduced[rows] @ query + self.offset[rows] + constant
+
+
+def _project(
+    matrix: np.ndarray,
+    has_vector: np.ndarray,
+    mean: np.ndarray,
+    components: np.ndarray,
+    block_size: int = 8192,
+):
+    """전체 행렬을 블록 단위로 축소 → (reduced, offset)"""
+    n = len(matrix)
+    reduced = np.zeros((n, components.shape[1]), dtype=np.float32)
+    offset = np.zeros(n, dtype=np.float32)
+    for start in range(0, n, block_size):
+        block = np.asarray(matrix[start : start + block_size], dtype=np.float32)
+        reduced[start : start + len(block)] = (block - mean) @ components
+        offset[start : start + len(block)] = block @ mean
+    reduced[~has_vector] = 0
+    offset[~has_vector] = 0
+    return reduced, offset
+
+
+def pca_report(
+    matrix: np.ndarray,
+    has_vector: np.ndarray,
+    dims: List[int],
+    n_queries: int = 200,
+    k: int = 10,
+    shortlist: int = 300,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    축소 차원별 유사도 검색 recall@k / 지연시간 비교
+
+    - recall: 축소 유사도만으로 뽑은 top-k의 재현율 (float32 정확 검색 기준)
+    - rerank_recall: 축소 공간에서 shortlist개를 뽑고 원래 벡터로 재정렬한 top-k의 재현율
+    - ms: 쿼리당 검색 시간 (재정렬 포함)
+
+    Returns:
+        {"exact": {...}, "pca64": {...}, ...}
+    """
+    rng = np.random.default_rng(seed)
+    valid_rows = np.flatnonzero(has_vector)
+    queries = rng.choice(valid_rows, size=min(n_queries, len(valid_rows)), replace=False)
+    k = min(k, len(valid_rows))
+    shortlist = min(max(shortlist, k), len(valid_rows))
+    valid_matrix = np.ascontiguousarray(matrix[valid_rows])
+
+    exact_top = {}
+    start = time.perf_counter()
+    for row in queries:
+        exact = valid_matrix @ matrix[row]
+        exact_top[row] = set(np.argpartition(-exact, k - 1)[:k])
+    report = {
+        "exact": {
+            "dim": matrix.shape[1],
+            "mb": valid_matrix.nbytes / 2**20,
+            "recall": 1.0,
+            "rerank_recall": 1.0,
+            "ms": (time.perf_counter() - start) / max(len(queries), 1) * 1000,
+        }
+    }
+
+    for dim in dims:
+        start = time.perf_counter()
+        projection = PcaProjection.fit(matrix, has_vector, n_components=dim)
+        fit_s = time.perf_counter() - start
+        reduced = np.ascontiguousarray(projection.reduced[valid_rows])
+        offset = projection.offset[valid_rows]
+
+        hits = rerank_hits = 0
+        search_s = 0.0
+        for row in queries:
+            start = time.perf_counter()
+            query = projection.project_query(matrix[row])
+            approx = reduced @ query + offset
+            short = np.argpartition(-approx, shortlist - 1)[:shortlist]
+            reranked = short[
+                np.argpartition(-(valid_matrix[short] @ matrix[row]), k - 1)[:k]
+            ]
+            search_s += time.perf_counter() - start
+
+            hits += len(exact_top[row] & set(np.argpartition(-approx, k - 1)[:k]))
+            rerank_hits += len(exact_top[row] & set(reranked))
+
+        total = max(len(queries) * k, 1)
+        report[f"pca{dim}"] = {
+            "dim": projection.dim,
+            "mb": (reduced.nbytes + offset.nbytes) / 2**20,
+            "explained": projection.explained,
+            "recall": hits / total,
+            "rerank_recall": rerank_hits / total,
+            "fit_s": fit_s,
+            "ms": search_s / max(len(queries), 1) * 1000,
+        }
+
+    return report
+
+
+def print_pca_report(report: Dict[str, Dict[str, float]], k: int, shortlist: int):
+    """pca_report() 결과 출력"""
+    print(
+        f"{'표현':<10} {'차원':<6} {'메모리(MB)':<12} {'분산보존':<9} "
+        f"{'recall@' + str(k):<10} {'재정렬(' + str(shortlist) + ')':<12} {'검색(ms)':<8}"
+    )
+    for name, row in report.items():
+        explained = row.get("explained")
+        print(
+            f"{name:<10} {row['dim']:<6} {row['mb']:<12.1f} "
+            f"{'-' if explained is None else format(explained, '.3f'):<9} "
+            f"{row['recall']:<10.4f} {row['rerank_recall']:<12.4f} {row['ms']:<8.2f}"
+        )
@@ -0,0 +1,192 @@
+"""
+임베딩 양자화 (float16 / int8)
+
+정규화된 float32 임베딩을 행 단위 스케일과 함께 int8(또는 float16)로 보관한다.
+- int8: 행마다 scale = max|x| / 127, code = round(x / scale)
+- 유사도는 코드를 블록 단위로 float32로 풀어 바로 계산 (추가 메모리는 블록 크기만큼)
+- float32 원본은 보관하지 않으므로 후보 재정렬도 복원한 벡터로 하며, 결과는 근사값이다.
+"""
+
+import sys
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from services.similarity_engine import normalize_rows
+
+QUANT_DTYPES = ("float16", "int8")
+DEFAULT_BLOCK_SIZE = 8192
+
+
+class QuantizedMatrix:
+    """행 단위 스케일을 가진 양자화 행렬"""
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+        self.codes.setflags(write=False)
+        self.scales.setflags(write=False)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, dtype: str = "int8") -> "QuantizedMatrix":
+        """float32 행렬을 양자화"""
+        if dtype not in QUANT_DTYPES:
+            raise ValueError(f"지원하지 않는 양자화 타입입니다: {dtype}")
+
+        if dtype == "float16":
+            return cls(
+                matrix.astype(np.float16), np.ones(len(matrix), dtype=np.float32)
+            )
+
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return cls(codes, scales.astype(np.float32))
+
+    @property
+    def dtype(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def rows(self, rows: np.ndarray) -> np.ndarray:
+        """지정 행을 float32로 복원"""
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    def dot(
+        self,
+        vector: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> np.ndarray:
+        """
+        양자화 행렬 · 벡터 (근사 유사도)
+
+        Args:
+            vector: float32 쿼리 벡터 (d,)
+            rows: 계산할 행 번호 (None이면 전체)
+
+        Returns:
+            float32 배열 (len(rows),)
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        n = len(self.codes) if rows is None else len(rows)
+        out = np.empty(n, dtype=np.float32)
+
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            if rows is None:
+                block = self.codes[start:end]
+                scales = self.scales[start:end]
+            else:
+                block = self.codes[rows[start:end]]
+                scales = self.scales[rows[start:end]]
+            out[start:end] = (block.astype(np.float32) @ vector) * scales
+
+        return out
+
+
+def _python_list_nbytes(dim: int) -> int:
+    """float 리스트 1개(dim개 원소)의 메모리 크기"""
+    sample = [float(i) + 0.5 for i in range(dim)]
+    return sys.getsizeof(sample) + sum(sys.getsizeof(x) for x in sample)
+
+
+def quantization_report(
+    matrix: np.ndarray,
+    has_vector: np.ndarray,
+    n_queries: int = 200,
+    k: int = 10,
+    rerank_factor: int = 4,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    표현 방식별 메모리 / 정확도 비교
+
+    정확도: 임의 쿼리에 대해 float32 정확 검색 top-k 대비
+    기준 벡터도 양자화 저장소처럼 복원·재정규화한 벡터를 쓴다.
+    - recall: 양자화 유사도만으로 뽑은 top-k의 재현율
+    - rerank_recall: 양자화로 k * rerank_factor개를 뽑고 복원·재정규화한 벡터로
+      다시 계산한 top-k의 재현율 (양자화 저장소의 추천 경로와 같은 계산)
+    - max_abs_err: 유사도 최대 절대 오차
+
+    Returns:
+        {"python_list": {...}, "float32": {...}, "float16": {...}, "int8": {...}}
+    """
+    n, dim = matrix.shape
+    report = {
+        "python_list": {"mb": _python_list_nbytes(dim) * int(has_vector.sum()) / 2**20},
+        "float32": {"mb": matrix.nbytes / 2**20, "recall": 1.0, "rerank_recall": 1.0},
+    }
+
+    rng = np.random.default_rng(seed)
+    valid_rows = np.flatnonzero(has_vector)
+    queries = rng.choice(valid_rows, size=min(n_queries, len(valid_rows)), replace=False)
+    k = min(k, len(valid_rows))
+    shortlist = min(k * rerank_factor, len(valid_rows))
+
+    for dtype in QUANT_DTYPES:
+        start = time.perf_counter()
+        quantized = QuantizedMatrix.from_matrix(matrix, dtype)
+        build_s = time.perf_counter() - start
+
+        hits = rerank_hits = 0
+        max_err = 0.0
+        scan_s = 0.0
+        for row in queries:
+            exact = matrix[valid_rows] @ matrix[row]
+            exact_top = set(valid_rows[np.argpartition(-exact, k - 1)[:k]])
+            query = normalize_rows(quantized.rows(np.array([row])))[0]
+
+            start = time.perf_counter()
+            approx = quantized.dot(query, valid_rows)
+            scan_s += time.perf_counter() - start
+
+            max_err = max(max_err, float(np.abs(approx - exact).max()))
+            hits += len(exact_top & set(valid_rows[np.argpartition(-approx, k - 1)[:k]]))
+
+            short = valid_rows[np.argpartition(-approx, shortlist - 1)[:shortlist]]
+            rescored = normalize_rows(quantized.rows(short)) @ query
+            reranked = short[np.argsort(-rescored)[:k]]
+            rerank_hits += len(exact_top & set(reranked))
+
+        total = max(len(queries) * k, 1)
+        report[dtype] = {
+            "mb": quantized.nbytes / 2**20,
+            "recall": hits / total,
+            "rerank_recall": rerank_hits / total,
+            "max_abs_err": max_err,
+            "build_s": build_s,
+            "scan_ms": scan_s / max(len(queries), 1) * 1000,
+        }
+
+    return report
+
+
+def print_quantization_report(vector_type: str, report: Dict[str, Dict[str, float]]):
+    """quantization_report() 결과 출력"""
+    print(f"\n[{vector_type}]")
+    print(
+        f"{'표현':<12} {'메모리(MB)':<12} {'recall':<8} {'재정렬':<8} "
+        f"{'최대오차':<10} {'스캔(ms)':<8}"
+    )
+    for name, row in report.items():
+        print(
+            f"{name:<12} {row['mb']:<12.1f} "
+            f"{_fmt(row.get('recall')):<8} {_fmt(row.get('rerank_recall')):<8} "
+            f"{_fmt(row.get('max_abs_err'), '.2e'):<10} {_fmt(row.get('scan_ms'), '.2f'):<8}"
+        )
+
+
+def _fmt(value, spec: str = ".4f") -> str:
+    return "-" if value is None else format(value, spec)
@@ -0,0 +1,553 @@
+"""
+유사 상품 추천 오프라인 작업 (인덱스/테이블/저장소 생성, 리포트)
+
+Streamlit과 추천 서비스가 읽어 가는 파일을 미리 만들고,
+근사 검색 방식별 정확도/시간을 현재 카탈로그로 확인한다.
+
+실행:
+    python -m services.reco_cli build-store --precision int8 --pca-dim 128
+    python -m services.reco_cli precompute --top-k 100
+    python -m services.reco_cli ann-build --report
+    python -m services.reco_cli dedup-build
+    python -m services.reco_cli cluster-build --clusters 24
+    python -m services.reco_cli weight-replay --sources 5000
+"""
+
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.ann_index import (
+    DEFAULT_EF_CONSTRUCTION,
+    DEFAULT_EF_SEARCH,
+    DEFAULT_INDEX_DIR,
+    DEFAULT_M,
+    AnnIndex,
+    ann_recall_report,
+)
+from services.athena_queries import load_product_vectors_from_athena
+from services.embedding_store import (
+    BLEND_VECTOR_TYPE,
+    DEFAULT_STORE_DIR,
+    VECTOR_TYPES,
+    EmbeddingStore,
+    get_embedding_store,
+    save_embedding_store,
+)
+from services.near_duplicates import (
+    DEFAULT_DUP_PATH,
+    find_near_duplicates,
+    write_dup_clusters,
+)
+from services.neighbor_table import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_TABLE_PATH,
+    DEFAULT_TOP_K,
+    compute_neighbor_table,
+    write_neighbor_table,
+)
+from services.product_clusters import (
+    DEFAULT_CLUSTER_DIR,
+    DEFAULT_N_CLUSTERS,
+    build_product_clusters,
+    write_product_clusters,
+)
+from services.product_filter import ProductFilter
+from services.projection import DEFAULT_PCA_DIM, pca_report, print_pca_report
+from services.quantization import print_quantization_report, quantization_report
+from services.recommend_similar_products import (
+    DEFAULT_BATCH_BLOCK_SIZE,
+    PCA_SHORTLIST,
+    _batch_from_store,
+    _select_from_store,
+    load_products_matrix,
+)
+from services.sharded_scoring import DEFAULT_SHARD_DIR, write_category_shards
+from services.vector_ingest import ingest_benchmark, print_ingest_benchmark
+from services.weight_replay import (
+    DEFAULT_RANKING_CONFIGS,
+    DEFAULT_SIMILAR_CONFIGS,
+    parse_weights,
+    replay_weight_configs,
+)
+
+
+def _load_store(args) -> EmbeddingStore:
+    """현재 카탈로그 버전의 저장소 (메모리 맵 파일 또는 Athena)"""
+    return get_embedding_store(vector_type=args.vector_type)
+
+
+def _run_ann_build(args):
+    store = _load_store(args)
+    start = time.perf_counter()
+    ann_index = AnnIndex.build(
+        store,
+        M=args.M,
+        ef_construction=args.ef_construction,
+        ef_search=args.ef_search,
+    )
+    ann_index.save(args.index_dir)
+    print(
+        f"✓ ANN 인덱스 생성 완료: {len(store):,}개 상품, "
+        f"{time.perf_counter() - start:.1f}초 → {args.index_dir}"
+    )
+
+    if args.report:
+        _print_ann_report(store, ann_index, args)
+
+
+def _run_ann_report(args):
+    store = _load_store(args)
+    ann_index = AnnIndex.load(store, args.index_dir)
+    if ann_index is None:
+        print("[오류] 사용할 수 있는 ANN 인덱스가 없습니다. ann-build를 먼저 실행하세요.")
+        return
+    _print_ann_report(store, ann_index, args)
+
+
+def _print_ann_report(store, ann_index, args):
+    print(f"\n{'ef_search':<10} {'recall@' + str(args.k):<10} {'exact(ms)':<10} {'ann(ms)':<10}")
+    for ef in args.ef_values:
+        ann_index.set_ef(ef)
+        report = ann_recall_report(store, ann_index, n_queries=args.queries, k=args.k)
+        print(
+            f"{ef:<10} {report['recall']:<10.4f} "
+            f"{report['exact_ms']:<10.3f} {report['ann_ms']:<10.3f}"
+        )
+
+
+def _run_precompute(args):
+    store = _load_store(args)
+    start = time.perf_counter()
+    table = compute_neighbor_table(
+        store, top_k=args.top_k, block_size=args.block_size
+    )
+    write_neighbor_table(table, args.output)
+    print(
+        f"✓ 이웃 테이블 생성 완료: {len(store):,}개 상품, {table.num_rows:,}행, "
+        f"{time.perf_counter() - start:.1f}초 → {args.output} "
+        f"({os.path.getsize(args.output) / 1024 / 1024:.1f}MB)"
+    )
+
+
+def _run_build_store(args):
+    # blend는 구성 임베딩 저장소를 모두 저장 (혼합 행렬은 로드 시 이어 붙임)
+    vector_types = (
+        list(VECTOR_TYPES)
+        if args.vector_type == BLEND_VECTOR_TYPE
+        else [args.vector_type]
+    )
+
+    start = time.perf_counter()
+    if args.source == "parquet":
+        products, vectors = load_products_matrix(
+            processed_data_dir=args.processed_data_dir, vector_types=vector_types
+        )
+    else:
+        products, vectors = load_product_vectors_from_athena(vector_types=vector_types)
+
+    for vector_type in vector_types:
+        store = EmbeddingStore.from_matrix(
+            products, *vectors[vector_type], vector_type, precision=args.precision
+        )
+        if args.pca_dim:
+            projection = store.fit_projection(args.pca_dim)
+            print(
+                f"✓ PCA 학습 완료 ({vector_type}): {store.dim} → {projection.dim}차원, "
+                f"분산 보존 {projection.explained:.3f}"
+            )
+        save_embedding_store(store, args.store_dir)
+        print(
+            f"✓ 임베딩 저장소 생성 완료: {len(store):,}개 상품 ({args.precision}), "
+            f"{time.perf_counter() - start:.1f}초 → {args.store_dir}/{vector_type}"
+        )
+
+
+def _run_quant_report(args):
+    products, vectors = load_product_vectors_from_athena(
+        vector_types=args.vector_types
+    )
+
+    for vector_type in args.vector_types:
+        store = EmbeddingStore.from_matrix(products, *vectors[vector_type], vector_type)
+        report = quantization_report(
+            store.matrix, store.has_vector, n_queries=args.queries, k=args.k
+        )
+        print_quantization_report(vector_type, report)
+
+
+def _run_batch(args):
+    store = _load_store(args)
+    if args.product_ids:
+        product_ids = args.product_ids
+    else:
+        product_ids = store.product_ids[store.has_vector][: args.limit].tolist()
+
+    start = time.perf_counter()
+    parts = []
+    for pid, results in _batch_from_store(
+        store,
+        product_ids,
+        categories=args.categories,
+        top_n=args.top_n,
+        block_size=args.block_size,
+    ):
+        parts.append((pid, results))
+    elapsed = time.perf_counter() - start
+    print(
+        f"✓ 배치 추천 완료: {len(product_ids):,}개 상품, {elapsed:.2f}초 "
+        f"({elapsed / max(len(product_ids), 1) * 1000:.2f}ms/상품, block_size={args.block_size})"
+    )
+
+    if args.compare:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for pid in product_ids:
+                _select_from_store(
+                    store, pid, categories=args.categories, top_n=args.top_n
+                )
+        elapsed = time.perf_counter() - start
+        print(
+            f"  상품별 반복 호출: {elapsed:.2f}초 "
+            f"({elapsed / max(len(product_ids), 1) * 1000:.2f}ms/상품)"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        pd.DataFrame(
+            {
+                "source_id": np.repeat(
+                    [pid for pid, _ in parts], [r.size for _, r in parts]
+                ),
+                "neighbor_id": np.concatenate([r.product_ids for _, r in parts]),
+                "category": np.concatenate([r.categories for _, r in parts]),
+                "reco_score": np.concatenate([r.recommend_score for _, r in parts]),
+                "similarity": np.concatenate([r.cosine_similarity for _, r in parts]),
+            }
+        ).to_parquet(args.output, index=False)
+        print(f"✓ 저장 완료 → {args.output}")
+
+
+def _run_ingest_bench(args):
+    print(f"벡터 컬럼 로드 비교: {args.n:,}개 상품 × {args.dim}차원")
+    print_ingest_benchmark(ingest_benchmark(n=args.n, dim=args.dim))
+
+
+def _run_filter_bench(args):
+    store = _load_store(args)
+    product_filter = ProductFilter(
+        skin_types=args.skin_types,
+        min_rating=args.min_rating,
+        max_price=args.max_price,
+    )
+    admitted = store.admitted_mask(product_filter)
+    n_admitted = len(store) if admitted is None else int(admitted.sum())
+    print(
+        f"사전 필터 {product_filter}: {n_admitted:,} / {len(store):,}개 상품 통과"
+    )
+
+    product_ids = store.product_ids[store.has_vector][: args.queries]
+    for label, current in (("필터 없음", None), ("사전 필터", product_filter)):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for pid in product_ids:
+                _select_from_store(
+                    store, pid, top_n=args.top_n, product_filter=current
+                )
+        elapsed = (time.perf_counter() - start) / max(len(product_ids), 1) * 1000
+        print(f"  {label:<8} {elapsed:.2f}ms/상품")
+
+
+def _run_dedup_build(args):
+    store = _load_store(args)
+    clusters = find_near_duplicates(
+        store, min_cosine=args.min_cosine, min_name_similarity=args.min_name_similarity
+    )
+    write_dup_clusters(clusters, store.version, args.output)
+    print(f"✓ 저장 완료 → {args.output}")
+
+
+def _run_cluster_build(args):
+    store = _load_store(args)
+    clusters = build_product_clusters(
+        store, n_clusters=args.clusters, batch_size=args.batch_size, n_iter=args.iterations
+    )
+    write_product_clusters(clusters, args.cluster_dir)
+    for row in clusters.summary().head(10).itertuples():
+        print(f"  #{row.cluster_id:<3} {row.size:>7,}개  {row.label}")
+    print(f"✓ 저장 완료 → {args.cluster_dir}")
+
+
+def _run_weight_replay(args):
+    """가중치 설정별 추천 재생 지표"""
+    store = _load_store(args)
+    similar_configs = dict(DEFAULT_SIMILAR_CONFIGS)
+    for text in args.similar_weights or []:
+        similar_configs[f"유사 {text}"] = parse_weights(text, 3)
+    ranking_configs = dict(DEFAULT_RANKING_CONFIGS)
+    for text in args.ranking_weights or []:
+        ranking_configs[f"랭킹 {text}"] = parse_weights(text, 2)
+
+    reports = replay_weight_configs(
+        store,
+        similar_configs,
+        ranking_configs,
+        top_n=args.top_n,
+        n_sources=args.sources,
+        block_size=args.block_size,
+    )
+    if args.output:
+        pd.concat(reports, names=["mode"]).to_csv(args.output, encoding="utf-8-sig")
+        print(f"\n✓ 저장 완료 → {args.output}")
+
+
+def _run_shard_build(args):
+    store = _load_store(args)
+    start = time.perf_counter()
+    count = write_category_shards(store, args.shard_dir)
+    print(
+        f"✓ 카테고리 샤드 {count}개 저장 완료 → {args.shard_dir}/{store.vector_type} "
+        f"({len(store):,}개 상품, {time.perf_counter() - start:.1f}초)"
+    )
+
+
+def _run_pca_report(args):
+    store = _load_store(args)
+    matrix = store.matrix if store.matrix is not None else store.vectors(
+        np.arange(len(store))
+    )
+    print(f"유사도 검색 비교: {len(store):,}개 상품 × {store.dim}차원")
+    print_pca_report(
+        pca_report(
+            matrix,
+            store.has_vector,
+            args.dims,
+            n_queries=args.queries,
+            k=args.k,
+            shortlist=args.shortlist,
+        ),
+        args.k,
+        args.shortlist,
+    )
+
+    # 추천 결과 기준 (감성/평점 포함 점수, 카테고리별 top_n)
+    print(f"\n추천 결과 비교 (카테고리별 top {args.k}, 재정렬 후보 {PCA_SHORTLIST}개 이상)")
+    print(f"{'표현':<10} {'recall':<10} {'추천(ms)':<10}")
+    product_ids = store.product_ids[store.has_vector][: args.queries]
+
+    def run(search_mode):
+        results = []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for pid in product_ids:
+                rows, _, _ = _select_from_store(
+                    store, pid, top_n=args.k, search_mode=search_mode
+                )
+                results.append(set(rows.tolist()))
+        elapsed = (time.perf_counter() - start) / max(len(product_ids), 1) * 1000
+        return results, elapsed
+
+    exact, exact_ms = run("exact")
+    print(f"{'exact':<10} {1.0:<10.4f} {exact_ms:<10.2f}")
+    for dim in args.dims:
+        store.fit_projection(dim)
+        approx, approx_ms = run("pca")
+        hits = sum(len(a & e) for a, e in zip(approx, exact))
+        total = max(sum(len(e) for e in exact), 1)
+        print(f"{'pca' + str(dim):<10} {hits / total:<10.4f} {approx_ms:<10.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="유사 상품 추천 오프라인 작업")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_store_args(sub):
+        sub.add_argument("--vector-type", default="roberta_semantic")
+        sub.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+
+    def add_report_args(sub):
+        sub.add_argument("--queries", type=int, default=200)
+        sub.add_argument("--k", type=int, default=10)
+        sub.add_argument(
+            "--ef-values", type=int, nargs="+", default=[32, 64, 128, 256]
+        )
+
+    ann_build_parser = subparsers.add_parser("ann-build", help="ANN 인덱스 생성/저장")
+    add_store_args(ann_build_parser)
+    add_report_args(ann_build_parser)
+    ann_build_parser.add_argument("--M", type=int, default=DEFAULT_M)
+    ann_build_parser.add_argument(
+        "--ef-construction", type=int, default=DEFAULT_EF_CONSTRUCTION
+    )
+    ann_build_parser.add_argument("--ef-search", type=int, default=DEFAULT_EF_SEARCH)
+    ann_build_parser.add_argument(
+        "--report", action="store_true", help="생성 후 recall/지연시간 리포트 출력"
+    )
+
+    ann_report_parser = subparsers.add_parser(
+        "ann-report", help="정확 검색 대비 ANN recall/지연시간 리포트"
+    )
+    add_store_args(ann_report_parser)
+    add_report_args(ann_report_parser)
+
+    precompute_parser = subparsers.add_parser(
+        "precompute", help="전체 상품의 카테고리별 top-K 이웃 테이블 생성"
+    )
+    add_store_args(precompute_parser)
+    precompute_parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    precompute_parser.add_argument(
+        "--block-size", type=int, default=DEFAULT_BLOCK_SIZE
+    )
+    precompute_parser.add_argument("--output", default=DEFAULT_TABLE_PATH)
+
+    quant_parser = subparsers.add_parser(
+        "quant-report", help="float32/float16/int8 임베딩 메모리·정확도 리포트"
+    )
+    add_store_args(quant_parser)
+    quant_parser.add_argument(
+        "--vector-types",
+        nargs="+",
+        default=["roberta_semantic", "roberta_sentiment"],
+    )
+    quant_parser.add_argument("--queries", type=int, default=200)
+    quant_parser.add_argument("--k", type=int, default=10)
+
+    build_store_parser = subparsers.add_parser(
+        "build-store", help="메모리 맵 임베딩 저장소 파일 생성"
+    )
+    add_store_args(build_store_parser)
+    build_store_parser.add_argument(
+        "--source", choices=["athena", "parquet"], default="athena"
+    )
+    build_store_parser.add_argument(
+        "--processed-data-dir", default="./data/processed_data"
+    )
+    build_store_parser.add_argument(
+        "--precision", choices=["float32", "float16", "int8"], default="float32"
+    )
+    build_store_parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    build_store_parser.add_argument(
+        "--pca-dim",
+        type=int,
+        default=0,
+        help=f"PCA 축소 차원 (0이면 사용 안 함, 권장 {DEFAULT_PCA_DIM})",
+    )
+
+    pca_parser = subparsers.add_parser(
+        "pca-report", help="PCA 축소 차원별 recall@K / 지연시간 비교"
+    )
+    add_store_args(pca_parser)
+    pca_parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+    pca_parser.add_argument("--queries", type=int, default=200)
+    pca_parser.add_argument("--k", type=int, default=10)
+    pca_parser.add_argument("--shortlist", type=int, default=PCA_SHORTLIST)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="여러 상품의 유사 상품 일괄 계산 (블록 행렬곱)"
+    )
+    add_store_args(batch_parser)
+    batch_parser.add_argument(
+        "--product-ids", nargs="+", default=None, help="기준 상품 ID (없으면 앞에서 --limit개)"
+    )
+    batch_parser.add_argument("--limit", type=int, default=1000)
+    batch_parser.add_argument("--categories", nargs="+", default=None)
+    batch_parser.add_argument("--top-n", type=int, default=10)
+    batch_parser.add_argument(
+        "--block-size", type=int, default=DEFAULT_BATCH_BLOCK_SIZE
+    )
+    batch_parser.add_argument("--output", default=None, help="결과 Parquet 경로")
+    batch_parser.add_argument(
+        "--compare", action="store_true", help="상품별 반복 호출과 시간 비교"
+    )
+
+    ingest_parser = subparsers.add_parser(
+        "ingest-bench", help="벡터 컬럼 로드 방식별(json.loads/일괄 파싱/Arrow) 시간 비교"
+    )
+    ingest_parser.add_argument("--n", type=int, default=50000)
+    ingest_parser.add_argument("--dim", type=int, default=768)
+
+    filter_parser = subparsers.add_parser(
+        "filter-bench", help="사전 필터 유무에 따른 유사 상품 검색 시간 비교"
+    )
+    add_store_args(filter_parser)
+    filter_parser.add_argument("--queries", type=int, default=200)
+    filter_parser.add_argument("--top-n", type=int, default=10)
+    filter_parser.add_argument("--skin-types", nargs="+", default=["건성"])
+    filter_parser.add_argument("--min-rating", type=float, default=None)
+    filter_parser.add_argument("--max-price", type=float, default=20000)
+
+    def add_dedup_args(sub):
+        sub.add_argument("--min-cosine", type=float, default=0.95)
+        sub.add_argument("--min-name-similarity", type=float, default=0.5)
+
+    dedup_build_parser = subparsers.add_parser(
+        "dedup-build", help="중복 상품 군집(dup_cluster) 계산 후 저장"
+    )
+    add_store_args(dedup_build_parser)
+    add_dedup_args(dedup_build_parser)
+    dedup_build_parser.add_argument("--output", default=DEFAULT_DUP_PATH)
+
+    cluster_build_parser = subparsers.add_parser(
+        "cluster-build", help="임베딩 군집(텍스처/용도 군집) 계산 후 저장"
+    )
+    add_store_args(cluster_build_parser)
+    cluster_build_parser.add_argument("--clusters", type=int, default=DEFAULT_N_CLUSTERS)
+    cluster_build_parser.add_argument("--batch-size", type=int, default=4096)
+    cluster_build_parser.add_argument("--iterations", type=int, default=100)
+    cluster_build_parser.add_argument("--cluster-dir", default=DEFAULT_CLUSTER_DIR)
+
+    replay_parser = subparsers.add_parser(
+        "weight-replay", help="가중치 설정별 추천 재생 (겹침/커버리지/시간 비교)"
+    )
+    add_store_args(replay_parser)
+    replay_parser.add_argument(
+        "--similar-weights", nargs="*", help="유사 상품 가중치 (유사도,감성,평점) 예: 0.6,0.3,0.1"
+    )
+    replay_parser.add_argument(
+        "--ranking-weights", nargs="*", help="전체 랭킹 가중치 (감성,평점) 예: 0.5,0.5"
+    )
+    replay_parser.add_argument("--top-n", type=int, default=10)
+    replay_parser.add_argument("--sources", type=int, default=None, help="기준 상품 표본 수 (기본: 전체)")
+    replay_parser.add_argument("--block-size", type=int, default=256)
+    replay_parser.add_argument("--output", default=None, help="지표 CSV 저장 경로")
+
+    shard_build_parser = subparsers.add_parser(
+        "shard-build", help="카테고리별 샤드 파일 생성 (RECO_SHARD_WORKERS로 병렬 계산)"
+    )
+    add_store_args(shard_build_parser)
+    shard_build_parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR)
+
+    args = parser.parse_args()
+
+    if args.command == "ann-build":
+        _run_ann_build(args)
+    elif args.command == "ann-report":
+        _run_ann_report(args)
+    elif args.command == "precompute":
+        _run_precompute(args)
+    elif args.command == "quant-report":
+        _run_quant_report(args)
+    elif args.command == "build-store":
+        _run_build_store(args)
+    elif args.command == "pca-report":
+        _run_pca_report(args)
+    elif args.command == "dedup-build":
+        _run_dedup_build(args)
+    elif args.command == "cluster-build":
+        _run_cluster_build(args)
+    elif args.command == "weight-replay":
+        _run_weight_replay(args)
+    elif args.command == "shard-build":
+        _run_shard_build(args)
+    elif args.command == "batch":
+        _run_batch(args)
+    elif args.command == "ingest-bench":
+        _run_ingest_bench(args)
+    elif args.command == "filter-bench":
+        _run_filter_bench(args)
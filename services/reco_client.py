@@ -0,0 +1,140 @@
+"""
+추천 서비스(services/reco_server.py) HTTP 클라이언트
+
+RECO_SERVICE_URL(환경변수 또는 secrets)이 있으면 대시보드는 추천 계산을 서비스에 맡기고,
+없거나 서비스에 연결할 수 없으면 같은 프로세스에서 직접 계산한다.
+"""
+
+import json
+import urllib.error
+import urllib.request
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from services.athena_client import get_setting
+from services.product_filter import ProductFilter
+from services.recommend_similar_products import get_similar_products
+from services.similarity_engine import ScoredProducts
+
+DEFAULT_TIMEOUT = 10.0
+
+
+class RecoClient:
+    """추천 서비스 호출 (요청마다 연결, 스레드 안전)"""
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: Optional[Dict[str, Any]] = None) -> dict:
+        data = None
+        headers = {}
+        if payload is not None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def similar(
+        self,
+        product_id: str,
+        categories: Optional[List[str]] = None,
+        top_n: int = 10,
+        vector_type: str = "roberta_semantic",
+        product_filter: Optional[ProductFilter] = None,
+        blend_weights: Optional[Dict[str, float]] = None,
+        search_mode: Optional[str] = None,
+        keyword_weight: Optional[float] = None,
+    ) -> ScoredProducts:
+        """유사 상품 추천 (get_similar_products()와 같은 결과)"""
+        return ScoredProducts.from_dict(
+            self._request(
+                "/similar",
+                {
+                    "product_id": product_id,
+                    "categories": categories,
+                    "top_n": top_n,
+                    "vector_type": vector_type,
+                    "blend_weights": blend_weights,
+                    "search_mode": search_mode,
+                    "keyword_weight": keyword_weight,
+                    "filter": product_filter.to_dict() if product_filter else None,
+                },
+            )
+        )
+
+    def search(
+        self,
+        categories: Optional[List[str]] = None,
+        top_n: int = 10,
+        product_filter: Optional[ProductFilter] = None,
+    ) -> ScoredProducts:
+        """조건 검색 (카테고리별 전체 랭킹 상위 top_n)"""
+        return ScoredProducts.from_dict(
+            self._request(
+                "/search",
+                {
+                    "categories": categories,
+                    "top_n": top_n,
+                    "filter": product_filter.to_dict() if product_filter else None,
+                },
+            )
+        )
+
+    def health(self) -> dict:
+        return self._request("/health")
+
+    def stats(self) -> dict:
+        return self._request("/stats")
+
+
+@lru_cache(maxsize=None)
+def _client_for(base_url: str) -> RecoClient:
+    return RecoClient(base_url)
+
+
+def get_reco_client() -> Optional[RecoClient]:
+    """설정된 추천 서비스 클라이언트 (RECO_SERVICE_URL이 없으면 None)"""
+    base_url = get_setting("RECO_SERVICE_URL", None)
+    if not base_url:
+        return None
+    return _client_for(base_url)
+
+
+def fetch_similar_products(
+    product_id: str,
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: Optional[float] = None,
+) -> ScoredProducts:
+    """
+    유사 상품 조회 - 추천 서비스가 설정되어 있으면 서비스, 아니면 직접 계산
+
+    서비스 호출이 실패하면 경고를 남기고 같은 프로세스에서 계산한다.
+    keyword_weight가 None이면 계산하는 쪽의 기본값(RECO_KEYWORD_WEIGHT)을 쓴다.
+    """
+    client = get_reco_client()
+    if client is not None:
+        try:
+            return client.similar(
+                product_id,
+                categories=categories,
+                top_n=top_n,
+                product_filter=product_filter,
+                keyword_weight=keyword_weight,
+            )
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f"[경고] 추천 서비스 호출 실패, 직접 계산으로 대체: {e}")
+
+    kwargs = {} if keyword_weight is None else {"keyword_weight": keyword_weight}
+    return get_similar_products(
+        product_id=product_id,
+        categories=categories,
+        top_n=top_n,
+        product_filter=product_filter,
+        **kwargs,
+    )
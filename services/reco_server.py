@@ -0,0 +1,423 @@
+"""
+추천/검색 서비스 - Streamlit과 분리된 독립 프로세스
+
+대시보드 세션(rerun)과 상관없이 한 프로세스가 임베딩 저장소를 들고 HTTP로 응답한다.
+- POST /similar: 유사 상품 추천 (사전 계산 테이블 → 공유 캐시 → 마이크로 배치 계산)
+- POST /search: 조건(카테고리/사이드바 필터)에 맞는 전체 랭킹
+- GET /health, GET /stats
+
+마이크로 배치:
+    수 ms(RECO_BATCH_WINDOW_MS) 안에 들어온 exact 모드 요청을
+    (카테고리, 임베딩 종류, 혼합 가중치, 필터, top_n)별로 묶어
+    기준 벡터를 쌓은 행렬-행렬 곱 한 번(_batch_from_store)으로 계산한다.
+
+실행:
+    python -m services.reco_server serve
+    python -m services.reco_server loadtest --product-ids 상품A 상품B --concurrency 32
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.catalog_version import get_catalog_version
+from services.embedding_store import get_embedding_store
+from services.product_filter import ProductFilter
+from services.recommend_similar_products import (
+    DEFAULT_KEYWORD_WEIGHT,
+    DEFAULT_SEARCH_MODE,
+    _batch_from_store,
+    _lookup_neighbor_table,
+    _reco_cache,
+    _reco_flight,
+    _reco_key,
+    _recommend_and_cache,
+)
+
+DEFAULT_HOST = os.environ.get("RECO_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("RECO_SERVICE_PORT", "8765"))
+
+# 요청을 모으는 최대 대기 시간(ms)과 한 배치의 최대 요청 수
+BATCH_WINDOW_MS = float(os.environ.get("RECO_BATCH_WINDOW_MS", "5"))
+BATCH_MAX = int(os.environ.get("RECO_BATCH_MAX", "64"))
+# 배치 계산 결과를 기다리는 최대 시간(초) - 넘으면 503 (클라이언트 기본 타임아웃 10초보다 짧게)
+REQUEST_TIMEOUT_S = float(os.environ.get("RECO_REQUEST_TIMEOUT_S", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    짧은 시간 창 안에 들어온 유사 상품 요청을 모아 한 번의 행렬곱으로 계산
+
+    작업 스레드 하나가 큐에서 첫 요청을 꺼낸 뒤 window_ms 동안(최대 max_batch개) 더 모으고,
+    캐시 키에서 상품 ID를 뺀 조건별로 묶어 _batch_from_store()를 호출한다.
+    같은 상품이 여러 번 들어오면 한 번만 계산한다.
+    결과는 요청별 Future와 공유 캐시(_reco_cache)에 함께 넣는다.
+    """
+
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_batch: int = BATCH_MAX):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[tuple, Optional[ProductFilter], Future]]" = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self._stats = {"batched_requests": 0, "batches": 0, "largest_batch": 0}
+        self._worker = threading.Thread(
+            target=self._run, name="reco-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, key: tuple, product_filter: Optional[ProductFilter]) -> Future:
+        """
+        요청 등록
+
+        Args:
+            key: _reco_key() 캐시 키 (exact 모드)
+            product_filter: 키에 대응하는 사전 필터
+        """
+        future = Future()
+        self._queue.put((key, product_filter, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_batch"] = stats["batched_requests"] / max(stats["batches"], 1)
+        return stats
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            # 상품 ID를 뺀 나머지 키(카테고리/임베딩/가중치/필터/top_n/버전)로 묶음
+            groups: Dict[tuple, list] = {}
+            for item in batch:
+                groups.setdefault(item[0][1:], []).append(item)
+
+            for items in groups.values():
+                try:
+                    self._compute(items)
+                except Exception as e:
+                    logger.exception("배치 추천 실패 (%d건)", len(items))
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+
+            with self._lock:
+                self._stats["batched_requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["largest_batch"] = max(
+                    self._stats["largest_batch"], len(batch)
+                )
+
+    @staticmethod
+    def _compute(items: list):
+        key, product_filter, _ = items[0]
+        _, categories, vector_type, blend_weights, _, top_n, _, keyword_weight, version = key
+        store = get_embedding_store(vector_type=vector_type, version=version)
+
+        product_ids = list(dict.fromkeys(item[0][0] for item in items))
+        results = dict(
+            _batch_from_store(
+                store,
+                product_ids,
+                categories=list(categories) if categories else None,
+                top_n=top_n,
+                blend_weights=dict(blend_weights) if blend_weights else None,
+                block_size=len(product_ids),
+                product_filter=product_filter,
+                keyword_weight=keyword_weight,
+            )
+        )
+        for key, _, future in items:
+            _reco_cache.set(key, results[key[0]])
+            future.set_result(results[key[0]])
+
+
+class RecoService:
+    """HTTP 핸들러가 호출하는 추천/검색 로직 (streamlit 없이 엔진 코드만 사용)"""
+
+    def __init__(
+        self,
+        batcher: Optional[MicroBatcher] = None,
+        timeout: float = REQUEST_TIMEOUT_S,
+    ):
+        self.batcher = batcher or MicroBatcher()
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._counts = {"similar": 0, "search": 0, "table_hits": 0, "cache_hits": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def similar(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        유사 상품 추천
+
+        payload: {"product_id", "categories", "top_n", "vector_type",
+                  "blend_weights", "search_mode", "keyword_weight", "filter"}
+
+        Raises:
+            concurrent.futures.TimeoutError: 배치 계산이 timeout초 안에 끝나지 않음 (HTTP 503)
+        """
+        self._count("similar")
+        product_id = str(payload["product_id"])
+        categories = payload.get("categories") or None
+        top_n = int(payload.get("top_n", 10))
+        vector_type = payload.get("vector_type") or "roberta_semantic"
+        blend_weights = payload.get("blend_weights") or None
+        search_mode = payload.get("search_mode") or DEFAULT_SEARCH_MODE
+        keyword_weight = payload.get("keyword_weight")
+        if keyword_weight is None:
+            keyword_weight = DEFAULT_KEYWORD_WEIGHT
+        keyword_weight = float(keyword_weight)
+        product_filter = ProductFilter.from_dict(payload.get("filter"))
+
+        results, product_filter = _lookup_neighbor_table(
+            product_id,
+            categories,
+            top_n,
+            vector_type,
+            product_filter=product_filter,
+            keyword_weight=keyword_weight,
+        )
+        if results is not None:
+            self._count("table_hits")
+            return results.to_dict()
+
+        key = _reco_key(
+            product_id,
+            categories,
+            vector_type,
+            blend_weights,
+            top_n,
+            product_filter,
+            search_mode,
+            keyword_weight,
+        )
+        results = _reco_cache.get(key)
+        if results is not None:
+            self._count("cache_hits")
+            return results.to_dict()
+
+        store = get_embedding_store(vector_type=vector_type)
+        if search_mode == "exact" and store.matrix is not None:
+            results = self.batcher.submit(key, product_filter).result(timeout=self.timeout)
+        else:
+            # 근사 검색/양자화 저장소는 요청별 후보 선택이 달라 배치하지 않음
+            results = _reco_flight.do(key, _recommend_and_cache, key, product_filter)
+        return results.to_dict()
+
+    def search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        조건 검색 (전체 랭킹: 긍정확률 * 0.6 + 정규화_평점 * 0.4)
+
+        payload: {"categories", "top_n", "vector_type", "filter"}
+        """
+        self._count("search")
+        categories = payload.get("categories") or None
+        top_n = int(payload.get("top_n", 10))
+        vector_type = payload.get("vector_type") or "roberta_semantic"
+        product_filter = ProductFilter.from_dict(payload.get("filter"))
+
+        key = _reco_key(None, categories, vector_type, None, top_n, product_filter)
+        results = _reco_cache.get(key)
+        if results is None:
+            results = _reco_flight.do(key, _recommend_and_cache, key, product_filter)
+        else:
+            self._count("cache_hits")
+        return results.to_dict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counts)
+        stats.update(self.batcher.stats())
+        stats["catalog_version"] = get_catalog_version()
+        return stats
+
+
+class _RecoHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 접속이 몰릴 때 연결이 거부되지 않도록 대기열을 늘림 (기본 5)
+    request_queue_size = 256
+
+
+class _RecoHandler(BaseHTTPRequestHandler):
+    server_version = "RecoServer/1.0"
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "catalog_version": get_catalog_version()})
+        elif self.path == "/stats":
+            self._send(200, service.stats())
+        else:
+            self._send(404, {"error": f"알 수 없는 경로: {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        routes = {"/similar": service.similar, "/search": service.search}
+        handler = routes.get(self.path)
+        if handler is None:
+            self._send(404, {"error": f"알 수 없는 경로: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            self._send(200, handler(payload))
+        except (KeyError, ValueError, TypeError) as e:
+            self._send(400, {"error": f"잘못된 요청: {e}"})
+        except FutureTimeoutError:
+            logger.warning("%s 배치 계산 대기 시간 초과", self.path)
+            self._send(503, {"error": "추천 계산 대기 시간 초과"})
+        except Exception as e:
+            logger.exception("%s 처리 실패", self.path)
+            self._send(500, {"error": str(e)})
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 요청마다 접근 로그를 찍지 않음 (/stats로 집계 확인)
+        pass
+
+
+def create_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    service: Optional[RecoService] = None,
+) -> ThreadingHTTPServer:
+    """추천 서비스 HTTP 서버 생성 (port=0이면 빈 포트 자동 선택)"""
+    server = _RecoHTTPServer((host, port), _RecoHandler)
+    server.service = service or RecoService()
+    return server
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def _run_serve(args):
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    store = get_embedding_store()
+    print(f"✓ 임베딩 저장소 로드 완료: {len(store):,}개 상품")
+
+    server = create_server(
+        args.host,
+        args.port,
+        RecoService(MicroBatcher(window_ms=args.window_ms, max_batch=args.max_batch)),
+    )
+    host, port = server.server_address[:2]
+    print(
+        f"✓ 추천 서비스 시작: http://{host}:{port} "
+        f"(배치 창 {args.window_ms}ms, 최대 {args.max_batch}건)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[안내] 추천 서비스 종료")
+    finally:
+        server.server_close()
+
+
+def _run_loadtest(args):
+    from services.reco_client import RecoClient
+
+    client = RecoClient(args.url, timeout=args.timeout)
+    rng = np.random.default_rng(0)
+    targets = rng.choice(args.product_ids, size=args.requests).tolist()
+    before = client.stats()
+
+    def call(pid):
+        start = time.perf_counter()
+        client.similar(pid, categories=args.categories, top_n=args.top_n)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(call, targets))
+    elapsed = time.perf_counter() - start
+
+    after = client.stats()
+    batches = after["batches"] - before["batches"]
+    batched = after["batched_requests"] - before["batched_requests"]
+    print(
+        f"✓ 부하 테스트 완료: {args.requests:,}건, 동시 {args.concurrency}, {elapsed:.2f}초 "
+        f"({args.requests / elapsed:,.0f} req/s)"
+    )
+    print(
+        f"  지연시간(ms): p50 {_percentile(latencies, 50):.1f} / "
+        f"p95 {_percentile(latencies, 95):.1f} / p99 {_percentile(latencies, 99):.1f}"
+    )
+    print(
+        f"  배치 계산: {batches:,}회, 평균 {batched / max(batches, 1):.1f}건/배치 "
+        f"(캐시 적중 {after['cache_hits'] - before['cache_hits']:,}건)"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="추천/검색 서비스")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="추천 서비스 실행")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    serve_parser.add_argument("--max-batch", type=int, default=BATCH_MAX)
+
+    loadtest_parser = subparsers.add_parser(
+        "loadtest", help="실행 중인 서비스에 동시 요청을 보내 처리량/지연시간 측정"
+    )
+    loadtest_parser.add_argument(
+        "--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+    )
+    loadtest_parser.add_argument("--concurrency", type=int, default=32)
+    loadtest_parser.add_argument("--requests", type=int, default=2000)
+    loadtest_parser.add_argument("--top-n", type=int, default=10)
+    loadtest_parser.add_argument("--categories", nargs="+", default=None)
+    loadtest_parser.add_argument("--timeout", type=float, default=30.0)
+    loadtest_parser.add_argument(
+        "--product-ids", nargs="+", required=True, help="요청할 기준 상품 ID"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        _run_serve(args)
+    elif args.command == "loadtest":
+        _run_loadtest(args)
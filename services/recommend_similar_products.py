@@ -2,8 +2,52 @@ import os
 import numpy as np
 import pandas as pd
 import glob
-from typing import List, Optional, Dict, Any
-from services.athena_queries import load_products_data_from_athena
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from services.ann_index import get_ann_index
+from services.catalog_version import get_catalog_version
+from services.embedding_store import (
+    BLEND_VECTOR_TYPE,
+    DEFAULT_BLEND_WEIGHTS,
+    EmbeddingStore,
+    get_embedding_store,
+)
+from services.product_filter import ProductFilter
+from services.neighbor_table import DEFAULT_TABLE_PATH, get_neighbor_table
+from services.sharded_scoring import get_sharded_scorer
+from services.similarity_engine import (
+    SIMILAR_WEIGHTS,
+    ScoredProducts,
+    combine_similar,
+    score_ranking,
+    hybrid_similarity,
+    select_top_k,
+    top_k_per_category,
+    top_k_per_category_batch,
+)
+from services.singleflight import SingleFlight, TTLCache
+from services.vector_ingest import read_parquet_vectors
+
+# ANN 모드에서 top_n 대비 가져올 후보 배수
+ANN_OVERSAMPLE = 3
+# 양자화 저장소에서 복원 벡터로 다시 점수를 계산할 후보 배수
+QUANT_OVERSAMPLE = 4
+# PCA 모드에서 원래 벡터로 재정렬할 카테고리별 최소 후보 수
+PCA_SHORTLIST = 300
+
+# 실시간 추천 기본 검색 방식 ("exact", "ann", "pca")
+DEFAULT_SEARCH_MODE = os.environ.get("RECO_SEARCH_MODE", "exact")
+# 실시간 추천 기본 키워드 가중치 (0이면 임베딩 유사도만 사용)
+DEFAULT_KEYWORD_WEIGHT = float(os.environ.get("RECO_KEYWORD_WEIGHT", "0"))
+
+# 배치 추천에서 한 번에 계산할 기준 상품 수
+DEFAULT_BATCH_BLOCK_SIZE = 64
+
+# 실시간 추천 결과 공유 캐시 (세션 간)
+RECO_CACHE_SIZE = 512
+RECO_CACHE_TTL = 300
+
+_reco_cache = TTLCache(max_entries=RECO_CACHE_SIZE, ttl=RECO_CACHE_TTL)
+_reco_flight = SingleFlight()
 
 
 def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
@@ -42,23 +86,7 @@ def load_products_data(
     Returns:
         pd.DataFrame: 상품 데이터
     """
-    products_final_dir = os.path.join(processed_data_dir, "integrated_products_final")
-
-    # Hive 파티셔닝: category=*/data.parquet 패턴
-    if categories is None:
-        # 모든 카테고리 로드
-        parquet_files = glob.glob(
-            os.path.join(products_final_dir, "category=*", "data.parquet")
-        )
-    else:
-        # 특정 카테고리만 로드
-        parquet_files = []
-        for category in categories:
-            file_path = os.path.join(
-                products_final_dir, f"category={category}", "data.parquet"
-            )
-            if os.path.exists(file_path):
-                parquet_files.append(file_path)
+    parquet_files = _product_parquet_files(processed_data_dir, categories)
 
     if not parquet_files:
         return pd.DataFrame()
@@ -82,13 +110,55 @@ def load_products_data(
     return all_products
 
 
+def load_products_matrix(
+    processed_data_dir: str = "./data/processed_data",
+    categories: Optional[List[str]] = None,
+    vector_types: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    상품 데이터 로드 (벡터는 Arrow 컬럼에서 바로 float32 행렬로 변환)
+
+    Returns:
+        (벡터 컬럼을 뺀 상품 DataFrame, {vector_type: (matrix, has_vector)})
+    """
+    return read_parquet_vectors(
+        _product_parquet_files(processed_data_dir, categories),
+        vector_types or ["roberta_semantic"],
+    )
+
+
+def _product_parquet_files(
+    processed_data_dir: str, categories: Optional[List[str]] = None
+) -> List[str]:
+    """integrated_products_final Parquet 파일 경로 목록"""
+    products_final_dir = os.path.join(processed_data_dir, "integrated_products_final")
+
+    # Hive 파티셔닝: category=*/data.parquet 패턴
+    if categories is None:
+        # 모든 카테고리 로드
+        return glob.glob(os.path.join(products_final_dir, "category=*", "data.parquet"))
+
+    # 특정 카테고리만 로드
+    parquet_files = []
+    for category in categories:
+        file_path = os.path.join(
+            products_final_dir, f"category={category}", "data.parquet"
+        )
+        if os.path.exists(file_path):
+            parquet_files.append(file_path)
+    return parquet_files
+
+
 def recommend_similar_products(
     product_id: Optional[str] = None,
     categories: Optional[List[str]] = None,
     top_n: int = 10,
-    processed_data_dir: str = "./data/processed_data",
     vector_type: str = "roberta_semantic",
     exclude_self: bool = True,
+    search_mode: str = "exact",
+    blend_weights: Optional[Dict[str, float]] = None,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     유사 상품 추천 또는 전체 상품 랭킹
@@ -104,9 +174,20 @@ def recommend_similar_products(
         product_id: 기준 상품 ID (예: "로션_1"), None이면 전체 랭킹
         categories: 검색할 카테고리 리스트 (None이면 모든 카테고리)
         top_n: 반환할 추천 상품 개수 (카테고리별)
-        processed_data_dir: processed_data 디렉토리 경로
         vector_type: 사용할 벡터 타입
+            ("roberta_semantic", "roberta_sentiment", "blend": 두 임베딩 혼합)
         exclude_self: 자기 자신을 결과에서 제외할지 여부
+        search_mode: 유사도 검색 방식 ("exact": 전체 비교, "ann": HNSW 근사 검색,
+            "pca": 축소 공간에서 후보 선택 후 원래 벡터로 재정렬)
+            ANN 인덱스 / PCA 축소 행렬이 없으면 자동으로 exact로 대체
+        blend_weights: vector_type="blend"일 때 임베딩별 가중치
+            (예: {"roberta_semantic": 0.7, "roberta_sentiment": 0.3}, 기본 0.5/0.5)
+            유사도 = Σ 가중치 × 임베딩별 코사인 유사도 (가중치 합은 1로 맞춤)
+        product_filter: 사전 필터 (세부 카테고리/피부 타입/가격/평점)
+            조건을 통과한 상품만 점수를 계산한다.
+        keyword_weight: 키워드 가중치 w (0~1, 0이면 사용 안 함)
+            유사도 = (1 - w) * 코사인 유사도 + w * top_keywords 자카드 유사도
+            ann/pca 모드에서는 임베딩으로 고른 후보 안에서만 키워드를 반영한다.
 
     Returns:
         Dict[str, List[Dict]]: 카테고리별 추천 상품 딕셔너리
@@ -128,150 +209,703 @@ def recommend_similar_products(
                 ...
             }
     """
-    # 1. 모든 상품 데이터 로드
-    print(f"상품 데이터 로드 중... (카테고리: {categories or '전체'})")
-    all_products = load_products_data_from_athena(
-        categories=categories, vector_type=vector_type
-    )
+    # 1. 공용 임베딩 저장소 조회 (카탈로그 버전당 1회만 로드)
+    store = get_embedding_store(vector_type=vector_type)
 
-    if all_products.empty:
+    if len(store) == 0:
         print("[경고] 상품 데이터를 찾을 수 없습니다.")
         return []
 
-    print(f"✓ {len(all_products):,}개 상품 로드 완료")
+    return _recommend_from_store(
+        store,
+        product_id=product_id,
+        categories=categories,
+        top_n=top_n,
+        exclude_self=exclude_self,
+        search_mode=search_mode,
+        blend_weights=blend_weights,
+        product_filter=product_filter,
+        keyword_weight=keyword_weight,
+    )
+
+
+def recommend_similar_arrays(
+    product_id: str,
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    vector_type: str = "roberta_semantic",
+    exclude_self: bool = True,
+    search_mode: str = "exact",
+    blend_weights: Optional[Dict[str, float]] = None,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> ScoredProducts:
+    """
+    recommend_similar_products()와 같은 계산, 결과만 컬럼 배열(ScoredProducts)로 반환
+
+    상품별 딕셔너리를 만들지 않으므로 화면에서 DataFrame으로 바로 병합할 때 사용한다.
+    exact 모드에서 카테고리 샤드 작업자(RECO_SHARD_WORKERS)가 설정되어 있으면
+    카테고리별 점수 계산을 프로세스 풀에 나눠 맡기고, 이 프로세스는 임베딩 저장소를 열지 않는다.
+    """
+    scorer = None
+    if search_mode == "exact" and product_id is not None and not keyword_weight:
+        scorer = get_sharded_scorer(vector_type)
+    if scorer is not None:
+        store = scorer.catalog
+        selected = scorer.select(
+            product_id,
+            categories=categories,
+            top_n=top_n,
+            exclude_self=exclude_self,
+            blend_weights=blend_weights,
+            product_filter=product_filter,
+        )
+    else:
+        store = get_embedding_store(vector_type=vector_type)
+        selected = _select_from_store(
+            store,
+            product_id=product_id,
+            categories=categories,
+            top_n=top_n,
+            exclude_self=exclude_self,
+            search_mode=search_mode,
+            blend_weights=blend_weights,
+            product_filter=product_filter,
+            keyword_weight=keyword_weight,
+        )
+    if selected is None:
+        return ScoredProducts.empty()
+
+    rows, scores, similarity = selected
+    return ScoredProducts(
+        store.product_ids[rows],
+        store.products["category"].to_numpy(dtype=object)[rows],
+        scores,
+        similarity,
+    )
+
+
+def get_similar_products(
+    product_id: str,
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    vector_type: str = "roberta_semantic",
+    table_path: str = DEFAULT_TABLE_PATH,
+    blend_weights: Optional[Dict[str, float]] = None,
+    product_filter: Optional[ProductFilter] = None,
+    search_mode: str = DEFAULT_SEARCH_MODE,
+    keyword_weight: float = DEFAULT_KEYWORD_WEIGHT,
+) -> ScoredProducts:
+    """
+    유사 상품 조회 (사전 계산 테이블 우선, 없으면 실시간 계산)
+
+    결과는 product_id, category, recommend_score, cosine_similarity 컬럼 배열
+    (ScoredProducts, 카테고리 순 / 카테고리 내 점수순)이다.
+    테이블이 최신(카탈로그 버전/유효 시간)이고 해당 상품이 있으면 테이블에서 바로 반환한다.
+
+    혼합 임베딩(vector_type="blend")은 가중치가 요청마다 다를 수 있어 테이블을 쓰지 않는다.
+    키워드 하이브리드(keyword_weight > 0, 기본값은 환경변수 RECO_KEYWORD_WEIGHT)도
+    테이블이 임베딩 유사도만으로 만들어졌으므로 실시간 계산한다.
+
+    product_filter(사이드바 조건)가 있으면 테이블 이웃 중 통과한 상품만 쓰고,
+    카테고리별 top_n개를 채우지 못하면 통과한 행만 실시간으로 점수 계산한다.
+
+    실시간 계산(search_mode, 기본값은 환경변수 RECO_SEARCH_MODE)은
+    (product_id, categories, vector_type, 혼합 가중치, 필터, top_n, search_mode, 키워드 가중치) 키로
+    - 동시에 들어온 같은 요청은 하나의 계산을 함께 기다리고
+    - 끝난 결과는 세션 간 LRU/TTL 캐시로 재사용한다.
+    반환값은 여러 세션이 공유하므로 호출자는 수정하지 않아야 한다.
+    """
+    results, product_filter = _lookup_neighbor_table(
+        product_id,
+        categories,
+        top_n,
+        vector_type,
+        table_path,
+        product_filter,
+        keyword_weight,
+    )
+    if results is not None:
+        return results
+
+    key = _reco_key(
+        product_id,
+        categories,
+        vector_type,
+        blend_weights,
+        top_n,
+        product_filter,
+        search_mode,
+        keyword_weight,
+    )
+    results = _reco_cache.get(key)
+    if results is None:
+        results = _reco_flight.do(key, _recommend_and_cache, key, product_filter)
+    return results
+
+
+def _lookup_neighbor_table(
+    product_id: str,
+    categories: Optional[List[str]],
+    top_n: int,
+    vector_type: str,
+    table_path: str = DEFAULT_TABLE_PATH,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> Tuple[Optional[ScoredProducts], Optional[ProductFilter]]:
+    """
+    사전 계산 테이블 조회
+
+    Returns:
+        (테이블 결과 또는 None, 실시간 계산에 쓸 필터)
+        모든 상품이 필터를 통과하면 필터 없는 요청과 같으므로 필터는 None으로 바뀐다.
+    """
+    # 필터/ID 조회만 하므로 샤드 계산 중이면 벡터 없는 샤드 카탈로그 사용
+    scorer = get_sharded_scorer(vector_type)
+    if scorer is not None:
+        store = scorer.catalog
+    else:
+        store = get_embedding_store(vector_type=vector_type)
+    admitted = None
+    if product_filter is not None:
+        admitted = store.admitted_mask(product_filter)
+        if admitted is None:
+            product_filter = None
+
+    table = None
+    if vector_type != BLEND_VECTOR_TYPE and not keyword_weight:
+        table = get_neighbor_table(table_path)
+    if table is None or not table.is_fresh(store):
+        return None, product_filter
+
+    admit = None
+    if admitted is not None:
+
+        def admit(neighbor_ids):
+            rows = store.rows_of_ids(neighbor_ids)
+            return (rows >= 0) & admitted[np.maximum(rows, 0)]
+
+    results = table.lookup(product_id, categories=categories, top_n=top_n, admit=admit)
+    return results, product_filter
+
+
+def get_product_vector(
+    product_id: str, vector_type: str = "roberta_semantic"
+) -> Optional[np.ndarray]:
+    """상품의 정규화된 float32 임베딩 (상품이 없거나 벡터가 없으면 None)"""
+    store = get_embedding_store(vector_type=vector_type)
+    row = store.row_of(product_id)
+    if row is None or not store.has_vector[row]:
+        return None
+    return store.vector(row)
+
+
+def recommend_for_vector(
+    query_vector: np.ndarray,
+    top_n: int = 10,
+    vector_type: str = "roberta_semantic",
+    exclude_ids: Optional[List[str]] = None,
+    product_filter: Optional[ProductFilter] = None,
+) -> ScoredProducts:
+    """
+    임의의 기준 벡터(예: 최근 본 상품 임베딩의 중심)로 전체 카탈로그 상위 top_n 추천
+
+    점수는 유사 상품 추천과 같다 (유사도 * 0.5 + 긍정확률 * 0.3 + 정규화_평점 * 0.2).
+    카테고리 구분 없이 점수 내림차순(동점이면 행 번호 순)이며, 행렬-벡터 곱 한 번으로 계산한다.
+
+    Args:
+        query_vector: 정규화된 기준 벡터 (d,)
+        exclude_ids: 결과에서 뺄 product_id (이미 본 상품 등)
+    """
+    store = get_embedding_store(vector_type=vector_type)
+    rows = store.category_rows(None, store.admitted_mask(product_filter))
+    rows = rows[store.has_vector[rows]]
+    if exclude_ids:
+        excluded = store.rows_of_ids(np.asarray(exclude_ids))
+        rows = rows[~np.isin(rows, excluded[excluded >= 0])]
+    if len(rows) == 0:
+        return ScoredProducts.empty()
+
+    query_vector = np.asarray(query_vector, dtype=np.float32)
+    if store.matrix is None:
+        similarity = store.similarity_matrix(query_vector[None, :], rows)[0]
+    else:
+        similarity = store.similarity(query_vector, rows)
+    scores, similarity = combine_similar(
+        similarity, store.sentiment[rows], store.normalized_rating[rows]
+    )
+
+    pos = select_top_k(scores, rows, top_n)
+    return ScoredProducts(
+        store.product_ids[rows[pos]],
+        store.products["category"].to_numpy(dtype=object)[rows[pos]],
+        scores[pos],
+        similarity[pos],
+    )
+
+
+def _reco_key(
+    product_id: str,
+    categories: Optional[List[str]],
+    vector_type: str,
+    blend_weights: Optional[Dict[str, float]],
+    top_n: int,
+    product_filter: Optional[ProductFilter] = None,
+    search_mode: str = DEFAULT_SEARCH_MODE,
+    keyword_weight: float = 0.0,
+) -> tuple:
+    """실시간 추천 캐시 키"""
+    return (
+        product_id,
+        tuple(sorted(categories)) if categories else None,
+        vector_type,
+        tuple(sorted(blend_weights.items())) if blend_weights else None,
+        product_filter.key() if product_filter is not None else None,
+        top_n,
+        search_mode,
+        float(keyword_weight),
+        get_catalog_version(),
+    )
+
+
+def _recommend_and_cache(key: tuple, product_filter: Optional[ProductFilter] = None):
+    """실시간 추천 계산 후 캐시에 저장 (SingleFlight 리더만 실행)"""
+    results = _reco_cache.get(key)
+    if results is not None:
+        return results
+
+    (
+        product_id,
+        categories,
+        vector_type,
+        blend_weights,
+        _,
+        top_n,
+        search_mode,
+        keyword_weight,
+        _,
+    ) = key
+    results = recommend_similar_arrays(
+        product_id=product_id,
+        categories=list(categories) if categories else None,
+        top_n=top_n,
+        vector_type=vector_type,
+        search_mode=search_mode,
+        blend_weights=dict(blend_weights) if blend_weights else None,
+        product_filter=product_filter,
+        keyword_weight=keyword_weight,
+    )
+    _reco_cache.set(key, results)
+    return results
+
+
+def recommend_similar_products_batch(
+    product_ids: List[str],
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    vector_type: str = "roberta_semantic",
+    exclude_self: bool = True,
+    blend_weights: Optional[Dict[str, float]] = None,
+    block_size: int = DEFAULT_BATCH_BLOCK_SIZE,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> Iterator[Tuple[str, ScoredProducts]]:
+    """
+    여러 상품의 유사 상품을 한 번에 계산 (블록 행렬-행렬 곱)
+
+    저장소는 한 번만 조회하고, 기준 상품 block_size개씩 (block_size, n) 유사도 행렬을
+    BLAS 행렬곱으로 계산해 상품별 결과를 순서대로 내보낸다.
+    메모리는 블록 하나의 유사도 행렬(block_size × 대상 상품 수)로 제한된다.
+    BLAS 스레드 수는 OMP_NUM_THREADS / OPENBLAS_NUM_THREADS / MKL_NUM_THREADS로 조정한다.
+
+    결과는 recommend_similar_arrays()(exact 모드)와 같다.
+    기준 상품을 찾을 수 없거나 벡터가 없으면 빈 ScoredProducts를 내보낸다.
+
+    Yields:
+        (product_id, ScoredProducts)
+    """
+    yield from _batch_from_store(
+        get_embedding_store(vector_type=vector_type),
+        product_ids,
+        categories=categories,
+        top_n=top_n,
+        exclude_self=exclude_self,
+        blend_weights=blend_weights,
+        block_size=block_size,
+        product_filter=product_filter,
+        keyword_weight=keyword_weight,
+    )
 
-    # 2. product_id 유무에 따라 분기 처리
-    target_vector = None
-    target_product_name = None
 
+def _batch_from_store(
+    store: EmbeddingStore,
+    product_ids: List[str],
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    exclude_self: bool = True,
+    blend_weights: Optional[Dict[str, float]] = None,
+    block_size: int = DEFAULT_BATCH_BLOCK_SIZE,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> Iterator[Tuple[str, ScoredProducts]]:
+    """임베딩 저장소에 대해 블록 단위 배치 추천"""
+    rows = store.category_rows(categories, store.admitted_mask(product_filter))
+    rows = rows[store.has_vector[rows]]
+    codes = store.category_codes[rows]
+    category_names = store.products["category"].to_numpy(dtype=object)
+
+    # 행 번호 → rows 내 위치 (자기 자신 제외용)
+    position_of = np.full(len(store), -1, dtype=np.int64)
+    position_of[rows] = np.arange(len(rows))
+
+    for start in range(0, len(product_ids), block_size):
+        block_ids = product_ids[start : start + block_size]
+        target_rows = [store.row_of(pid) for pid in block_ids]
+        valid = [
+            i
+            for i, row in enumerate(target_rows)
+            if row is not None and store.has_vector[row]
+        ]
+        if not valid:
+            for pid in block_ids:
+                yield pid, ScoredProducts.empty()
+            continue
+
+        queries = np.stack(
+            [store.query_vector(target_rows[i], blend_weights) for i in valid]
+        )
+        similarity = store.similarity_matrix(queries, rows)
+        if keyword_weight:
+            similarity = hybrid_similarity(
+                similarity,
+                np.stack(
+                    [
+                        store.keyword_index.similarity(target_rows[i], rows)
+                        for i in valid
+                    ]
+                ),
+                keyword_weight,
+            )
+        scores, similarity = combine_similar(
+            similarity, store.sentiment[rows], store.normalized_rating[rows]
+        )
+
+        if exclude_self:
+            for k, i in enumerate(valid):
+                positions = position_of[store.rows_of(block_ids[i])]
+                scores[k, positions[positions >= 0]] = -np.inf
+
+        # 블록 내 위치 → (점수 행렬의 행, 선택된 후보 위치)
+        selected = {
+            i: (k, pos)
+            for k, (i, pos) in enumerate(
+                zip(valid, top_k_per_category_batch(scores, rows, codes, top_n))
+            )
+        }
+
+        for i, pid in enumerate(block_ids):
+            if i not in selected:
+                yield pid, ScoredProducts.empty()
+                continue
+
+            k, pos = selected[i]
+            yield pid, ScoredProducts(
+                store.product_ids[rows[pos]],
+                category_names[rows[pos]],
+                scores[k, pos],
+                similarity[k, pos],
+            )
+
+
+def _recommend_from_store(
+    store: EmbeddingStore,
+    product_id: Optional[str] = None,
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    exclude_self: bool = True,
+    search_mode: str = "exact",
+    blend_weights: Optional[Dict[str, float]] = None,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """임베딩 저장소에 대해 점수 계산 및 카테고리별 상위 N개 결과 딕셔너리 생성"""
+    selected = _select_from_store(
+        store,
+        product_id=product_id,
+        categories=categories,
+        top_n=top_n,
+        exclude_self=exclude_self,
+        search_mode=search_mode,
+        blend_weights=blend_weights,
+        product_filter=product_filter,
+        keyword_weight=keyword_weight,
+    )
+    if selected is None:
+        return {}
+
+    rows, scores, similarity = selected
+    final_results = {}
+    for result in _build_results(store, rows, scores, similarity):
+        final_results.setdefault(result["category"], []).append(result)
+
+    total_count = len(rows)
+    print(f"✓ 추천 상품 {total_count}개 생성 완료 ({len(final_results)}개 카테고리)")
+    for category, products in final_results.items():
+        print(f"  - {category}: {len(products)}개")
+
+    return final_results
+
+
+def _select_from_store(
+    store: EmbeddingStore,
+    product_id: Optional[str] = None,
+    categories: Optional[List[str]] = None,
+    top_n: int = 10,
+    exclude_self: bool = True,
+    search_mode: str = "exact",
+    blend_weights: Optional[Dict[str, float]] = None,
+    product_filter: Optional[ProductFilter] = None,
+    keyword_weight: float = 0.0,
+) -> Optional[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+    """
+    요청 카테고리의 행만 점수 계산 후 카테고리별 상위 N개 선택
+
+    전체 정렬 대신 카테고리별 부분 선택(argpartition)을 사용한다.
+    product_filter가 있으면 사전 필터를 통과한 행만 점수를 계산한다.
+
+    Returns:
+        (rows, scores, similarity) 선택된 행 기준 배열
+            (카테고리 코드 순, 카테고리 내 점수 내림차순 / 동점이면 행 번호 순),
+        기준 상품을 찾을 수 없으면 None
+    """
+    # 요청 카테고리 중 필터를 통과한 행만 선택 (카테고리 코드 순으로 묶여 있음)
+    rows = store.category_rows(categories, store.admitted_mask(product_filter))
+    print(f"✓ {len(rows):,}개 상품 대상 (카테고리: {categories or '전체'})")
+    if product_filter is not None:
+        print(f"✓ 사전 필터: {product_filter}")
+
+    # 2. product_id 유무에 따라 분기 처리
     if product_id is not None:
         # 유사 상품 추천 모드
         print(f"\n[모드] 유사 상품 추천 (product_id={product_id})")
 
         # 기준 상품 찾기
-        target_product = all_products[all_products["product_id"] == product_id]
+        target_row = store.row_of(product_id)
 
-        if target_product.empty:
+        if target_row is None:
             print(f"[오류] 상품 ID '{product_id}'를 찾을 수 없습니다.")
-            return {}
-
-        target_product = target_product.iloc[0]
-        target_product_name = target_product.get("product_name", product_id)
-        vector_col = f"product_vector_{vector_type}"
-        target_vector = target_product[vector_col]
+            return None
 
-        if target_vector is None or (
-            isinstance(target_vector, (list, np.ndarray)) and len(target_vector) == 0
-        ):
+        if not store.has_vector[target_row]:
             print(f"[오류] 상품 '{product_id}'의 벡터가 없습니다.")
-            return {}
+            return None
 
+        target_product_name = store.products.at[target_row, "product_name"]
         print(f"✓ 기준 상품: {target_product_name}")
         print("점수 = 유사도 * 0.5 + 긍정확률 * 0.3 + 정규화_평점 * 0.2")
+        if store.blocks:
+            weights = blend_weights or DEFAULT_BLEND_WEIGHTS
+            print(f"유사도 = 임베딩별 코사인 유사도 가중합 {weights}")
+        if keyword_weight:
+            print(
+                f"유사도 = 코사인 * {1 - keyword_weight:g} + 키워드 자카드 * {keyword_weight:g}"
+            )
     else:
         # 전체 랭킹 모드
         print(f"\n[모드] 전체 상품 랭킹")
         print("점수 = 긍정확률 * 0.6 + 정규화_평점 * 0.4")
 
-    # 3. 모든 상품과 비교하여 점수 계산
+    # 3. 대상 행만 점수 계산
     print(f"\n점수 계산 중...")
-    results = []
-    vector_col = f"product_vector_{vector_type}"
-
-    for idx, product in all_products.iterrows():
-        # 자기 자신 제외 (옵션)
-        if (
-            exclude_self
-            and product_id is not None
-            and product["product_id"] == product_id
-        ):
-            continue
 
-        # sentiment_score 추출 (없으면 0.5로 기본값)
-        sentiment = product.get("sentiment_score")
-        if sentiment is None or pd.isna(sentiment):
-            sentiment = 0.5
-
-        # 정규화 평점 계산 (평균평점 / 5.0)
-        avg_rating = product.get("avg_rating_with_text", 0)
-        if avg_rating is None or pd.isna(avg_rating):
-            avg_rating = 0
-        normalized_rating = avg_rating / 5.0
-
-        if product_id is not None:
-            # 유사 상품 추천 모드: 유사도 계산 필요
-            product_vector = product[vector_col]
-
-            # 벡터가 없으면 스킵
-            if product_vector is None or (
-                isinstance(product_vector, (list, np.ndarray))
-                and len(product_vector) == 0
-            ):
-                continue
-
-            # 코사인 유사도 계산
-            similarity = cosine_similarity(target_vector, product_vector)
+    # 자기 자신 제외 (옵션)
+    if exclude_self and product_id is not None:
+        rows = rows[~np.isin(rows, store.rows_of(product_id))]
 
-            # 최종 점수 = 유사도 * 0.5 + 긍정확률 * 0.3 + 정규화_평점 * 0.2
-            recommend_score = (
-                similarity * 0.5 + sentiment * 0.3 + normalized_rating * 0.2
-            )
+    if product_id is not None:
+        target_vector = store.query_vector(target_row, blend_weights)
+        # 벡터가 없는 상품은 제외
+        rows = rows[store.has_vector[rows]]
+
+        candidate_rows = None
+        if search_mode == "ann":
+            candidate_rows = _ann_candidates(store, target_vector, rows, top_n)
+        elif search_mode == "pca":
+            candidate_rows = _pca_candidates(store, target_vector, rows, top_n)
+        if candidate_rows is None and store.matrix is None:
+            # 양자화 저장소: 양자화 행렬 곱으로 후보를 줄인 뒤 복원·재정규화한 벡터로 다시 계산
+            # (float32 원본은 보관하지 않으므로 점수는 근사값)
+            candidate_rows = _quantized_candidates(store, target_vector, rows, top_n)
+        if candidate_rows is not None:
+            rows = rows[np.isin(rows, candidate_rows)]
+
+        if store.matrix is None:
+            similarity = store.vectors(rows) @ target_vector
         else:
-            # 전체 랭킹 모드: 유사도 불필요
-            similarity = None
+            similarity = store.similarity(target_vector, rows)
+        if keyword_weight:
+            similarity = hybrid_similarity(
+                similarity,
+                store.keyword_index.similarity(target_row, rows),
+                keyword_weight,
+            )
+        scores, similarity = combine_similar(
+            similarity, store.sentiment[rows], store.normalized_rating[rows]
+        )
+    else:
+        scores = score_ranking(store.sentiment[rows], store.normalized_rating[rows])
+        similarity = None
+
+    # 4~5. 카테고리별 점수 높은 순 상위 N개 선택
+    pos = top_k_per_category(scores, rows, store.category_codes[rows], top_n)
+    return (
+        rows[pos],
+        scores[pos],
+        similarity[pos] if similarity is not None else None,
+    )
 
-            # 최종 점수 = 긍정확률 * 0.6 + 정규화_평점 * 0.4
-            recommend_score = sentiment * 0.6 + normalized_rating * 0.4
 
-        # 결과 저장
-        result = {
-            "product_id": product["product_id"],
-            "product_name": product.get("product_name", ""),
-            "brand": product.get("brand", ""),
-            "category": product.get("category", ""),
-            "price": product.get("price"),
-            "recommend_score": float(recommend_score),
-            "sentiment_score": float(sentiment),
-            "normalized_rating": float(normalized_rating),
-            "avg_rating": float(avg_rating),
-            "total_reviews": product.get("total_reviews", 0),
-            "avg_rating_with_text": product.get("avg_rating_with_text", 0),
-            "top_keywords": product.get("top_keywords", []),
-            "product_url": product.get("product_url", ""),
-        }
+def _ann_candidates(
+    store: EmbeddingStore,
+    target_vector: np.ndarray,
+    rows: np.ndarray,
+    top_n: int,
+) -> Optional[np.ndarray]:
+    """
+    ANN 인덱스로 카테고리별 유사도 상위 후보 검색
 
-        # 유사도는 product_id가 있을 때만 포함
-        if similarity is not None:
-            result["cosine_similarity"] = float(similarity)
+    감성/평점 가중치 때문에 유사도 순위와 최종 점수 순위가 다르므로
+    top_n보다 넉넉하게(ANN_OVERSAMPLE배) 후보를 가져오고,
+    감성/평점 항만으로 카테고리별 상위인 상품도 후보에 포함한다.
 
-        results.append(result)
+    Returns:
+        후보 행 번호 배열, 인덱스가 없으면 None
+    """
+    ann_index = get_ann_index(store)
+    if ann_index is None:
+        print("[안내] ANN 인덱스가 없어 정확 검색으로 대체합니다.")
+        return None
+
+    k = top_n * ANN_OVERSAMPLE + 1
+    codes = store.category_codes[rows]
+    similar_rows = ann_index.search(target_vector, np.unique(codes).tolist(), k)
+    if similar_rows is None:
+        return None
+
+    _, w_sent, w_rating = SIMILAR_WEIGHTS
+    prior = store.sentiment[rows] * w_sent + store.normalized_rating[rows] * w_rating
+    prior_rows = rows[top_k_per_category(prior, rows, codes, k)]
+    return np.union1d(similar_rows, prior_rows)
+
+
+def _quantized_candidates(
+    store: EmbeddingStore,
+    target_vector: np.ndarray,
+    rows: np.ndarray,
+    top_n: int,
+) -> np.ndarray:
+    """양자화 행렬로 근사 점수를 계산해 카테고리별 상위 후보(QUANT_OVERSAMPLE배) 선택"""
+    w_sim, w_sent, w_rating = SIMILAR_WEIGHTS
+    approx = (
+        store.quantized.dot(target_vector, rows) * w_sim
+        + store.sentiment[rows] * w_sent
+        + store.normalized_rating[rows] * w_rating
+    )
+    pos = top_k_per_category(
+        approx, rows, store.category_codes[rows], top_n * QUANT_OVERSAMPLE + 1
+    )
+    return rows[pos]
 
-    # 4. 카테고리별로 그룹화
-    from collections import defaultdict
 
-    category_results = defaultdict(list)
+def _pca_candidates(
+    store: EmbeddingStore,
+    target_vector: np.ndarray,
+    rows: np.ndarray,
+    top_n: int,
+) -> Optional[np.ndarray]:
+    """
+    PCA 축소 공간의 근사 점수로 카테고리별 상위 후보 선택
 
-    for result in results:
-        category = result["category"]
-        category_results[category].append(result)
+    후보는 카테고리별 max(top_n * QUANT_OVERSAMPLE + 1, PCA_SHORTLIST)개이며,
+    이후 원래 벡터로 정확한 점수를 다시 계산한다.
 
-    # 5. 각 카테고리별로 점수 높은 순으로 정렬 후 상위 N개 선택
-    final_results = {}
-    total_count = 0
+    Returns:
+        후보 행 번호 배열, 축소 행렬이 없으면 None
+    """
+    if store.projection is None:
+        print("[안내] PCA 축소 행렬이 없어 정확 검색으로 대체합니다.")
+        return None
+
+    w_sim, w_sent, w_rating = SIMILAR_WEIGHTS
+    approx = (
+        store.projection.dot(target_vector, rows) * w_sim
+        + store.sentiment[rows] * w_sent
+        + store.normalized_rating[rows] * w_rating
+    )
+    k = max(top_n * QUANT_OVERSAMPLE + 1, PCA_SHORTLIST)
+    pos = top_k_per_category(approx, rows, store.category_codes[rows], k)
+    return rows[pos]
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """컬럼이 없으면 기본값으로 채운 Series 반환"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index)
+
+
+def _build_results(
+    store: EmbeddingStore,
+    rows: np.ndarray,
+    scores: np.ndarray,
+    similarity: Optional[np.ndarray],
+) -> List[Dict[str, Any]]:
+    """선택된 행에 대해서만 결과 딕셔너리 생성 (scores/similarity는 rows와 같은 순서)"""
+    selected = store.products.iloc[rows]
+
+    def values(name, default):
+        return _column(selected, name, default).tolist()
+
+    columns = zip(
+        values("product_id", None),
+        values("product_name", ""),
+        values("brand", ""),
+        values("category", ""),
+        values("price", None),
+        values("total_reviews", 0),
+        values("avg_rating_with_text", 0),
+        values("top_keywords", []),
+        values("product_url", ""),
+    )
 
-    for category, products in category_results.items():
-        # 점수 높은 순으로 정렬
-        products.sort(key=lambda x: x["recommend_score"], reverse=True)
-        # 상위 N개 선택
-        top_products = products[:top_n]
-        final_results[category] = top_products
-        total_count += len(top_products)
+    results = []
+    for i, (pid, name, brand, category, price, reviews, rating, kws, url) in enumerate(
+        columns
+    ):
+        row = rows[i]
+        result = {
+            "product_id": pid,
+            "product_name": name,
+            "brand": brand,
+            "category": category,
+            "price": price,
+            "recommend_score": float(scores[i]),
+            "sentiment_score": float(store.sentiment[row]),
+            "normalized_rating": float(store.normalized_rating[row]),
+            "avg_rating": float(store.avg_rating[row]),
+            "total_reviews": reviews,
+            "avg_rating_with_text": rating,
+            "top_keywords": kws,
+            "product_url": url,
+        }
 
-    print(f"✓ 추천 상품 {total_count}개 생성 완료 ({len(final_results)}개 카테고리)")
-    for category, products in final_results.items():
-        print(f"  - {category}: {len(products)}개")
+        # 유사도는 product_id가 있을 때만 포함
+        if similarity is not None:
+            result["cosine_similarity"] = float(similarity[i])
 
-    return final_results
+        results.append(result)
+
+    return results
 
 
 def print_recommendations(recommendations: Dict[str, List[Dict[str, Any]]]):
@@ -328,8 +962,7 @@ def print_recommendations(recommendations: Dict[str, List[Dict[str, Any]]]):
     print("\n" + "=" * 100)
 
 
-# 사용 예시
-if __name__ == "__main__":
+def _run_examples():
     # 예시 1: 특정 카테고리에서 추천
     print("=" * 100)
     print("예시 1: 로션 카테고리에서 유사 상품 추천")
@@ -383,3 +1016,7 @@ if __name__ == "__main__":
                 f"Sentiment={item['sentiment_score']:.3f}, "
                 f"Avg Rating={item['avg_rating']:.1f}"
             )
+
+
+if __name__ == "__main__":
+    _run_examples()
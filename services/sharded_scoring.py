@@ -0,0 +1,395 @@
+"""
+카테고리 샤드 병렬 점수 계산
+
+카탈로그가 커서 한 프로세스의 행렬곱이 느려지면 임베딩 저장소를 카테고리별 샤드 파일로 나누고
+프로세스 풀의 작업자가 샤드마다 점수 계산 + 카테고리 내 상위 N개 선택을 맡는다.
+
+- 샤드 = 한 카테고리의 행 (행 번호 오름차순) → 정규화된 float32 행렬과 점수용 배열
+- 작업자는 샤드를 처음 맡을 때 메모리 맵으로 한 번만 열고 계속 재사용한다.
+  (파일은 OS 페이지 캐시에 한 벌만 올라가 작업자끼리 공유된다)
+- 부모 프로세스는 임베딩 행렬을 읽지 않는다. 샤드와 함께 저장한 상품 메타데이터/ID 색인만
+  벡터 없는 저장소(샤드 카탈로그)로 열어 행 번호/필터 마스크를 구하고,
+  기준 상품의 (샤드, 위치)와 필터 마스크만 보낸 뒤 카테고리 코드 순으로 결과를 이어 붙인다.
+  기준 벡터는 작업자가 해당 샤드 메모리 맵에서 직접 읽는다.
+  카테고리 내 순서(점수 내림차순, 동점이면 행 번호 순)는 select_top_k()가 정하므로
+  병합 결과는 단일 프로세스 경로(top_k_per_category)와 같은 순서다.
+
+작업자 수는 환경변수 RECO_SHARD_WORKERS (0이면 사용 안 함)로 정한다.
+샤드는 현재 카탈로그 버전으로 만든 것만 쓰므로, 데이터를 읽기 전(unverified 버전)에는
+선언 버전(CATALOG_VERSION)이 있어야 샤드 경로를 쓴다.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.catalog_version import get_catalog_version, is_verified_version
+from services.embedding_store import EmbeddingStore, weight_blocks
+from services.product_filter import ProductFilter
+from services.similarity_engine import combine_similar, select_top_k
+
+DEFAULT_SHARD_DIR = "./data/embedding_shards"
+SHARD_WORKERS = int(os.environ.get("RECO_SHARD_WORKERS", "0"))
+
+
+def _shard_root(shard_dir: str, vector_type: str) -> str:
+    return os.path.join(shard_dir, vector_type)
+
+
+def _shard_path(root: str, code: int) -> str:
+    return os.path.join(root, f"shard_{code:05d}")
+
+
+def write_category_shards(store, shard_dir: str = DEFAULT_SHARD_DIR) -> int:
+    """
+    저장소를 카테고리별 샤드 파일로 저장
+
+    {shard_dir}/{vector_type}/
+        shard_00000/ matrix.npy rows.npy has_vector.npy sentiment.npy normalized_rating.npy
+        ...
+        products.parquet has_vector.npy id_sorted.npy id_rows.npy  부모용 메타데이터 (벡터 제외)
+        meta.json  버전/지문/카테고리명/혼합 블록
+
+    양자화 저장소도 샤드에는 복원한 float32 벡터를 저장한다.
+
+    Returns:
+        샤드 수
+    """
+    root = _shard_root(shard_dir, store.vector_type)
+    tmp_root = f"{root}.tmp"
+    os.makedirs(tmp_root, exist_ok=True)
+
+    offsets = store.category_offsets
+    for code in range(len(store.category_names)):
+        rows = np.asarray(store.category_order[offsets[code] : offsets[code + 1]])
+        path = _shard_path(tmp_root, code)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "matrix.npy"), store.vectors(rows))
+        np.save(os.path.join(path, "rows.npy"), rows.astype(np.int64))
+        np.save(os.path.join(path, "has_vector.npy"), store.has_vector[rows])
+        np.save(os.path.join(path, "sentiment.npy"), store.sentiment[rows])
+        np.save(
+            os.path.join(path, "normalized_rating.npy"), store.normalized_rating[rows]
+        )
+
+    np.save(os.path.join(tmp_root, "has_vector.npy"), store.has_vector)
+    np.save(os.path.join(tmp_root, "id_sorted.npy"), store.id_sorted)
+    np.save(os.path.join(tmp_root, "id_rows.npy"), store.id_rows)
+    store.products.to_parquet(os.path.join(tmp_root, "products.parquet"), index=False)
+
+    meta = {
+        "version": store.version,
+        "vector_type": store.vector_type,
+        "fingerprint": store.fingerprint,
+        "categories": [str(name) for name in store.category_names],
+        "blocks": store.blocks,
+    }
+    with open(os.path.join(tmp_root, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # 읽는 작업자가 반쯤 쓰인 샤드를 보지 않도록 디렉토리 단위로 교체
+    if os.path.exists(root):
+        old_root = f"{root}.old"
+        os.replace(root, old_root)
+        os.replace(tmp_root, root)
+        _remove_tree(old_root)
+    else:
+        os.replace(tmp_root, root)
+    return len(store.category_names)
+
+
+def _remove_tree(path: str):
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        for name in filenames:
+            os.remove(os.path.join(dirpath, name))
+        for name in dirnames:
+            os.rmdir(os.path.join(dirpath, name))
+    os.rmdir(path)
+
+
+def read_shard_meta(shard_dir: str, vector_type: str) -> Optional[dict]:
+    """샤드 메타데이터 (없으면 None)"""
+    meta_path = os.path.join(_shard_root(shard_dir, vector_type), "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_shard_catalog(
+    shard_dir: str, vector_type: str, version: Optional[str] = None
+) -> Optional[EmbeddingStore]:
+    """
+    샤드 메타데이터를 벡터 없는 저장소로 열기 (부모 프로세스용)
+
+    행 번호/카테고리/필터/점수 배열은 있지만 임베딩 행렬은 없다. (matrix, quantized = None)
+
+    Returns:
+        EmbeddingStore 또는 None (파일 없음 / 미검증 버전 / 버전 불일치)
+    """
+    meta = read_shard_meta(shard_dir, vector_type)
+    if meta is None or not is_verified_version(meta["version"]):
+        return None
+    if version is not None and meta["version"] != version:
+        return None
+
+    root = _shard_root(shard_dir, vector_type)
+
+    def mmap(name):
+        return np.load(os.path.join(root, name), mmap_mode="r")
+
+    blocks = meta.get("blocks")
+    return EmbeddingStore(
+        pd.read_parquet(os.path.join(root, "products.parquet")),
+        None,
+        np.asarray(mmap("has_vector.npy")),
+        vector_type=vector_type,
+        version=meta["version"],
+        id_index=(mmap("id_sorted.npy"), mmap("id_rows.npy")),
+        blocks=[tuple(block) for block in blocks] if blocks else None,
+        fingerprint=meta["fingerprint"],
+    )
+
+
+# =========================
+# 작업자 프로세스
+# =========================
+_worker_root: Optional[str] = None
+_worker_shards: Dict[int, Dict[str, np.ndarray]] = {}
+
+
+def _init_worker(root: str):
+    global _worker_root
+    _worker_root = root
+    _worker_shards.clear()
+
+
+def _open_shard(code: int) -> Dict[str, np.ndarray]:
+    """샤드 파일을 메모리 맵으로 열기 (작업자당 샤드별 1회)"""
+    shard = _worker_shards.get(code)
+    if shard is None:
+        path = _shard_path(_worker_root, code)
+        shard = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in (
+                "matrix",
+                "rows",
+                "has_vector",
+                "sentiment",
+                "normalized_rating",
+            )
+        }
+        _worker_shards[code] = shard
+    return shard
+
+
+def _query_vector(
+    target: Tuple[int, int],
+    blocks: Optional[List[Tuple[str, int]]],
+    blend_weights: Optional[Dict[str, float]],
+) -> np.ndarray:
+    """기준 상품 (샤드 코드, 샤드 내 위치)의 벡터 → 유사도 계산용 기준 벡터"""
+    code, position = target
+    vector = np.array(_open_shard(code)["matrix"][position])
+    return weight_blocks(vector, blocks, blend_weights)
+
+
+def _score_shard(
+    code: int,
+    target: Tuple[int, int],
+    blocks: Optional[List[Tuple[str, int]]],
+    blend_weights: Optional[Dict[str, float]],
+    top_n: int,
+    exclude_rows: np.ndarray,
+    admitted: Optional[np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    샤드 하나의 점수 계산 + 상위 top_n 선택 (작업자에서 실행)
+
+    Args:
+        target: 기준 상품의 (샤드 코드, 샤드 내 위치)
+        admitted: 샤드 행 기준 필터 통과 마스크 (None이면 전체)
+
+    Returns:
+        (rows, scores, similarity) 점수 내림차순 / 동점이면 행 번호 순
+    """
+    shard = _open_shard(code)
+    keep = np.array(shard["has_vector"], dtype=bool)
+    if admitted is not None:
+        keep &= admitted
+    rows = np.asarray(shard["rows"])
+    if len(exclude_rows):
+        keep &= ~np.isin(rows, exclude_rows)
+    positions = np.flatnonzero(keep)
+    if len(positions) == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return np.zeros(0, dtype=np.int64), empty, empty
+
+    # 행이 절반을 넘으면 전체 곱 후 인덱싱 (행 복사 방지)
+    query = _query_vector(target, blocks, blend_weights)
+    matrix = shard["matrix"]
+    if len(positions) * 2 > len(rows):
+        similarity = (matrix @ query)[positions]
+    else:
+        similarity = matrix[positions] @ query
+    scores, similarity = combine_similar(
+        similarity,
+        np.asarray(shard["sentiment"])[positions],
+        np.asarray(shard["normalized_rating"])[positions],
+    )
+
+    rows = rows[positions]
+    pos = select_top_k(scores, rows, top_n)
+    return rows[pos], scores[pos], similarity[pos]
+
+
+# =========================
+# 부모 프로세스
+# =========================
+class ShardedScorer:
+    """
+    카테고리 샤드를 프로세스 풀로 병렬 계산
+
+    작업자는 spawn 방식으로 시작한다. (Streamlit 등 스레드가 있는 부모를 fork하지 않음)
+
+    Attributes:
+        catalog: 샤드 카탈로그 (벡터 없는 저장소, load_shard_catalog())
+    """
+
+    def __init__(self, root: str, catalog: EmbeddingStore, workers: int):
+        self.root = root
+        self.catalog = catalog
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(root,),
+        )
+
+    def select(
+        self,
+        product_id: str,
+        categories: Optional[List[str]] = None,
+        top_n: int = 10,
+        exclude_self: bool = True,
+        blend_weights: Optional[Dict[str, float]] = None,
+        product_filter: Optional[ProductFilter] = None,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        유사 상품 추천 (_select_from_store()의 exact 모드와 같은 결과)
+
+        Returns:
+            (rows, scores, similarity) 샤드 카탈로그 행 기준 / 카테고리 코드 순 / 카테고리 내 점수순,
+            기준 상품이 없거나 벡터가 없으면 None
+        """
+        store = self.catalog
+        target_row = store.row_of(product_id)
+        if target_row is None or not store.has_vector[target_row]:
+            return None
+
+        # 기준 벡터는 작업자가 기준 상품의 샤드에서 읽음 (샤드 내 행 번호는 오름차순)
+        offsets = store.category_offsets
+        target_code = int(store.category_codes[target_row])
+        target_rows = store.category_order[
+            offsets[target_code] : offsets[target_code + 1]
+        ]
+        target = (target_code, int(np.searchsorted(target_rows, target_row)))
+        exclude_rows = (
+            store.rows_of(product_id) if exclude_self else np.zeros(0, dtype=np.int64)
+        )
+        admitted = store.admitted_mask(product_filter)
+
+        if categories:
+            wanted = set(categories)
+            codes = [
+                code
+                for code, name in enumerate(store.category_names)
+                if name in wanted
+            ]
+        else:
+            codes = range(len(store.category_names))
+
+        futures = []
+        for code in codes:
+            shard_admitted = None
+            if admitted is not None:
+                shard_admitted = admitted[
+                    store.category_order[offsets[code] : offsets[code + 1]]
+                ]
+                if not shard_admitted.any():
+                    continue
+            futures.append(
+                self._executor.submit(
+                    _score_shard,
+                    code,
+                    target,
+                    store.blocks,
+                    blend_weights,
+                    top_n,
+                    exclude_rows,
+                    shard_admitted,
+                )
+            )
+
+        # 카테고리 코드 순으로 이어 붙이면 top_k_per_category()와 같은 순서
+        parts = [future.result() for future in futures]
+        if not parts:
+            empty = np.zeros(0, dtype=np.float32)
+            return np.zeros(0, dtype=np.int64), empty, empty
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_scorers: Dict[str, ShardedScorer] = {}
+_scorers_lock = threading.Lock()
+
+
+def get_sharded_scorer(
+    vector_type: str = "roberta_semantic",
+    version: Optional[str] = None,
+    shard_dir: str = DEFAULT_SHARD_DIR,
+    workers: int = SHARD_WORKERS,
+) -> Optional[ShardedScorer]:
+    """
+    현재 카탈로그 버전의 샤드 병렬 계산기 (프로세스 공용)
+
+    임베딩 저장소를 열지 않고 샤드 메타데이터만 확인한다.
+    작업자 수가 0이거나, 버전이 미검증이거나, 샤드 파일이 없거나 다른 버전이면 None
+    → 호출자는 단일 프로세스 경로를 쓴다.
+    """
+    if workers <= 0:
+        return None
+    version = version or get_catalog_version()
+    if not is_verified_version(version):
+        return None
+
+    root = _shard_root(shard_dir, vector_type)
+    scorer = _scorers.get(root)
+    if scorer is not None and scorer.catalog.version == version:
+        return scorer
+
+    with _scorers_lock:
+        scorer = _scorers.get(root)
+        if scorer is not None and scorer.catalog.version == version:
+            return scorer
+
+        catalog = load_shard_catalog(shard_dir, vector_type, version)
+        if catalog is None:
+            # 샤드가 없거나 이전 카탈로그 것이면 다시 만들 때까지 단일 프로세스 경로
+            return None
+        if scorer is not None:
+            # 샤드가 다시 만들어졌으면 작업자도 새로 시작 (열어 둔 메모리 맵 교체)
+            scorer.shutdown()
+
+        scorer = ShardedScorer(root, catalog, workers)
+        _scorers[root] = scorer
+        return scorer
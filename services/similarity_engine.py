@@ -0,0 +1,316 @@
+"""
+행렬 기반 유사 상품 점수 계산 엔진
+
+recommend_similar_products()의 상품별 루프를 대체한다.
+- 임베딩은 행 단위로 정규화된 연속(float32) 행렬로 보관
+- 유사도는 행렬-벡터 곱 한 번으로 계산
+- 감성/평점 가중합과 카테고리별 상위 N개 선택도 벡터 연산으로 처리
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 유사 상품 추천: 유사도, 긍정확률, 정규화_평점 가중치
+SIMILAR_WEIGHTS = (0.5, 0.3, 0.2)
+# 전체 랭킹: 긍정확률, 정규화_평점 가중치
+RANKING_WEIGHTS = (0.6, 0.4)
+
+DEFAULT_SENTIMENT = 0.5
+
+
+def _has_vector(value) -> bool:
+    """벡터 값이 비어있지 않은지 확인 (None/NaN/빈 리스트 제외)"""
+    if value is None:
+        return False
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return len(value) > 0
+    return False
+
+
+def vectors_to_matrix(vectors: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    리스트/배열 벡터 시퀀스를 (n, d) float32 행렬로 변환
+
+    Args:
+        vectors: 상품별 벡터 (list, np.ndarray, None 혼재 가능)
+
+    Returns:
+        (matrix, has_vector)
+            matrix: C-연속 float32 행렬, 벡터가 없는 행은 0
+            has_vector: 벡터 존재 여부 bool 배열
+    """
+    vectors = list(vectors)
+    has_vector = np.fromiter(
+        (_has_vector(v) for v in vectors), dtype=bool, count=len(vectors)
+    )
+
+    if not has_vector.any():
+        return np.zeros((len(vectors), 0), dtype=np.float32), has_vector
+
+    dim = len(vectors[int(np.argmax(has_vector))])
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    rows = np.flatnonzero(has_vector)
+    matrix[rows] = np.asarray([vectors[i] for i in rows], dtype=np.float32)
+
+    return matrix, has_vector
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (in-place). 0 벡터는 0으로 유지"""
+    norms = np.linalg.norm(matrix, axis=1)
+    nonzero = norms > 0
+    matrix[nonzero] /= norms[nonzero, None]
+    return matrix
+
+
+def prepare_priors(
+    sentiment: Sequence, avg_rating: Sequence
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    점수 계산용 감성/평점 배열 준비
+
+    Returns:
+        (sentiment, avg_rating, normalized_rating)
+            sentiment: 결측이면 0.5
+            avg_rating: 결측이면 0
+            normalized_rating: avg_rating / 5.0
+    """
+    sentiment = pd.to_numeric(pd.Series(sentiment), errors="coerce")
+    sentiment = sentiment.fillna(DEFAULT_SENTIMENT).to_numpy(dtype=np.float64)
+
+    avg_rating = pd.to_numeric(pd.Series(avg_rating), errors="coerce")
+    avg_rating = avg_rating.fillna(0).to_numpy(dtype=np.float64)
+
+    return sentiment, avg_rating, avg_rating / 5.0
+
+
+def combine_similar(
+    similarity: np.ndarray,
+    sentiment: np.ndarray,
+    normalized_rating: np.ndarray,
+    weights: Tuple[float, float, float] = SIMILAR_WEIGHTS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """이미 계산된 유사도에 감성/평점 가중합 적용 → (scores, similarity) float64"""
+    similarity = np.asarray(similarity, dtype=np.float64)
+    w_sim, w_sent, w_rating = weights
+    scores = similarity * w_sim + sentiment * w_sent + normalized_rating * w_rating
+    return scores, similarity
+
+
+def hybrid_similarity(
+    cosine: np.ndarray, keyword: np.ndarray, keyword_weight: float
+) -> np.ndarray:
+    """하이브리드 유사도 = (1 - w) * 코사인 유사도 + w * 키워드 자카드 유사도"""
+    return (1.0 - keyword_weight) * np.asarray(cosine, dtype=np.float64) + (
+        keyword_weight * keyword
+    )
+
+
+def score_ranking(
+    sentiment: np.ndarray,
+    normalized_rating: np.ndarray,
+    weights: Tuple[float, float] = RANKING_WEIGHTS,
+) -> np.ndarray:
+    """전체 랭킹 점수 = 긍정확률 * w0 + 정규화_평점 * w1"""
+    w_sent, w_rating = weights
+    return sentiment * w_sent + normalized_rating * w_rating
+
+
+def select_top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    """
+    전체 정렬 없이 점수 상위 k개 위치 선택 (argpartition)
+
+    순서: 점수 내림차순, 동점이면 행 번호 오름차순.
+    k번째 점수와 동점인 항목도 행 번호 순으로 골라 결과가 항상 결정적이다.
+
+    Returns:
+        scores/rows 배열 기준 위치 (정렬됨)
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        threshold = scores[part].min()
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)
+        ties = ties[np.argsort(rows[ties], kind="stable")[: k - len(above)]]
+        picked = np.concatenate([above, ties])
+    else:
+        picked = np.arange(len(scores))
+
+    return picked[np.lexsort((rows[picked], -scores[picked]))]
+
+
+def top_k_per_category(
+    scores: np.ndarray,
+    rows: np.ndarray,
+    category_codes: np.ndarray,
+    k: int,
+) -> np.ndarray:
+    """
+    카테고리별 점수 상위 k개 위치 선택 (카테고리 코드 순, 카테고리 내 점수순)
+
+    Args:
+        scores: 후보 점수
+        rows: 후보 행 번호 (동점 처리 기준)
+        category_codes: 후보의 카테고리 코드
+
+    Returns:
+        scores/rows 배열 기준 위치
+    """
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # EmbeddingStore.category_rows()는 이미 카테고리 코드 순으로 묶여 있음
+    if np.all(category_codes[1:] >= category_codes[:-1]):
+        order = np.arange(len(rows))
+    else:
+        order = np.argsort(category_codes, kind="stable")
+
+    sorted_codes = category_codes[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+
+    picked = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        group = order[start:end]
+        picked.append(group[select_top_k(scores[group], rows[group], k)])
+
+    return np.concatenate(picked)
+
+
+def top_k_per_category_batch(
+    scores: np.ndarray,
+    rows: np.ndarray,
+    category_codes: np.ndarray,
+    k: int,
+) -> List[np.ndarray]:
+    """
+    여러 기준 상품의 점수 행렬 (b, n)에 대해 top_k_per_category()를 한 번에 수행
+
+    카테고리마다 2차원 argpartition 한 번으로 b개 상품의 후보를 고른다.
+    -inf 점수(제외 대상)는 선택하지 않으며, 순서/동점 처리는 top_k_per_category()와 같다.
+
+    Returns:
+        기준 상품별 위치 배열 리스트 (길이 b)
+    """
+    n_queries = scores.shape[0]
+    picked = [[] for _ in range(n_queries)]
+    if len(rows) == 0 or k <= 0:
+        return [np.zeros(0, dtype=np.int64) for _ in range(n_queries)]
+
+    if np.all(category_codes[1:] >= category_codes[:-1]):
+        order = np.arange(len(rows))
+    else:
+        order = np.argsort(category_codes, kind="stable")
+
+    sorted_codes = category_codes[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        group = order[start:end]
+        group_rows = rows[group]
+        sub = scores[:, group]
+
+        # 제외된 항목 수만큼 더 뽑은 뒤 버림
+        n_excluded = int(np.isneginf(sub).sum(axis=1).max())
+        k_sel = min(k + n_excluded, len(group))
+
+        part = np.argpartition(-sub, k_sel - 1, axis=1)[:, :k_sel]
+        top = np.take_along_axis(sub, part, axis=1)
+        ordering = np.lexsort((group_rows[part], -top), axis=-1)
+        part = np.take_along_axis(part, ordering, axis=1)
+
+        # 경계 점수와 동점인 항목이 후보 밖에도 있으면 그 행만 1차원 선택
+        ambiguous = (sub >= top.min(axis=1)[:, None]).sum(axis=1) > k_sel
+
+        for i in range(n_queries):
+            if ambiguous[i]:
+                finite = np.flatnonzero(np.isfinite(sub[i]))
+                pos = finite[select_top_k(sub[i, finite], group_rows[finite], k)]
+            else:
+                pos = part[i]
+                pos = pos[np.isfinite(sub[i, pos])][:k]
+            picked[i].append(group[pos])
+
+    return [np.concatenate(p) for p in picked]
+
+
+class ScoredProducts:
+    """
+    추천 결과 (컬럼형 배열)
+
+    Attributes:
+        product_ids / categories: object 배열
+        recommend_score: float 배열
+        cosine_similarity: float 배열 (전체 랭킹 모드에서는 None)
+    """
+
+    def __init__(
+        self,
+        product_ids: np.ndarray,
+        categories: np.ndarray,
+        recommend_score: np.ndarray,
+        cosine_similarity: Optional[np.ndarray] = None,
+    ):
+        self.product_ids = product_ids
+        self.categories = categories
+        self.recommend_score = recommend_score
+        self.cosine_similarity = cosine_similarity
+
+    @classmethod
+    def empty(cls) -> "ScoredProducts":
+        none = np.zeros(0, dtype=object)
+        return cls(none, none, np.zeros(0), np.zeros(0))
+
+    @property
+    def size(self) -> int:
+        return len(self.product_ids)
+
+    def to_dict(self) -> dict:
+        """JSON 직렬화용 딕셔너리 (컬럼별 리스트)"""
+        return {
+            "product_ids": [str(pid) for pid in self.product_ids],
+            "categories": [str(c) for c in self.categories],
+            "recommend_score": np.asarray(self.recommend_score, dtype=float).tolist(),
+            "cosine_similarity": (
+                None
+                if self.cosine_similarity is None
+                else np.asarray(self.cosine_similarity, dtype=float).tolist()
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScoredProducts":
+        """to_dict() 결과로 복원"""
+        similarity = data.get("cosine_similarity")
+        return cls(
+            np.asarray(data["product_ids"], dtype=object),
+            np.asarray(data["categories"], dtype=object),
+            np.asarray(data["recommend_score"], dtype=np.float64),
+            None if similarity is None else np.asarray(similarity, dtype=np.float64),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """product_id, category, reco_score, similarity 컬럼 DataFrame"""
+        similarity = (
+            self.cosine_similarity
+            if self.cosine_similarity is not None
+            else np.zeros(self.size)
+        )
+        return pd.DataFrame(
+            {
+                "product_id": self.product_ids,
+                "category": self.categories,
+                "reco_score": self.recommend_score,
+                "similarity": similarity,
+            }
+        )
+
+
+def factorize_categories(categories: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """카테고리 값을 정수 코드로 변환 (결측값도 하나의 카테고리로 취급)"""
+    codes, uniques = pd.factorize(pd.Series(categories), use_na_sentinel=False)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object)
@@ -0,0 +1,276 @@
+"""
+임베딩 컬럼 일괄 변환
+
+행마다 json.loads로 파이썬 리스트를 만들지 않고 (n, d) float32 행렬로 바로 변환한다.
+- JSON 배열 문자열 (Athena): Arrow 문자열 커널로 분할 후 float32로 한 번에 변환
+- Arrow list / FixedSizeList<float32> (Parquet): 평탄화된 값 버퍼를 그대로 reshape
+- 리스트/배열 객체: similarity_engine.vectors_to_matrix
+
+변환 결과는 (matrix, has_vector)이며 벡터가 없는 행은 0으로 채운다.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from services.similarity_engine import vectors_to_matrix
+
+VectorMatrix = Tuple[np.ndarray, np.ndarray]
+
+
+def parse_vector_strings(values: Sequence) -> VectorMatrix:
+    """
+    JSON 배열 문자열("[0.1, 0.2, ...]") 컬럼을 한 번에 파싱
+
+    Arrow compute 커널로 공백/대괄호 제거 → "," 분할 → float32 변환을 컬럼 단위로 처리한다.
+    문자열이 아닌 값(None/NaN), "null", "[]"은 벡터 없음으로 처리한다.
+
+    Raises:
+        ValueError: 행마다 차원이 다르거나 숫자가 아닌 값이 있는 경우
+    """
+    strings = pd.Series(values, dtype=object)
+    strings = strings.where(strings.map(type) == str)
+    body = pa.array(strings, type=pa.string(), from_pandas=True)
+    body = pc.utf8_trim(pc.replace_substring(body, " ", ""), "[]\n\t\r")
+    has_vector = (
+        pc.and_(pc.greater(pc.utf8_length(body), 0), pc.not_equal(body, "null"))
+        .fill_null(False)
+        .to_numpy(zero_copy_only=False)
+    )
+
+    n = len(strings)
+    if not has_vector.any():
+        return np.zeros((n, 0), dtype=np.float32), has_vector
+
+    parts = pc.split_pattern(body.filter(pa.array(has_vector)), ",")
+    dims = pc.list_value_length(parts).to_numpy()
+    dim = int(dims[0])
+    if np.any(dims != dim):
+        raise ValueError("벡터 차원이 행마다 다릅니다.")
+
+    try:
+        flat = pc.cast(parts.flatten(), pa.float32()).to_numpy()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"벡터 문자열에 숫자가 아닌 값이 있습니다: {e}") from e
+
+    matrix = np.zeros((n, dim), dtype=np.float32)
+    matrix[has_vector] = flat.reshape(-1, dim)
+    return matrix, has_vector
+
+
+def arrow_vectors_to_matrix(column) -> VectorMatrix:
+    """
+    Arrow list<float> / large_list / fixed_size_list 컬럼을 복사 1회로 행렬 변환
+
+    null 또는 빈 리스트는 벡터 없음으로 처리한다.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = (
+            column.combine_chunks()
+            if column.num_chunks
+            else pa.array([], type=column.type)
+        )
+
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        return parse_vector_strings(column.to_numpy(zero_copy_only=False))
+
+    n = len(column)
+    valid = column.is_valid().to_numpy(zero_copy_only=False)
+
+    if pa.types.is_fixed_size_list(column.type):
+        dim = column.type.list_size
+        values = column.values.slice(column.offset * dim, n * dim)
+        flat = pc.fill_null(values, 0).to_numpy(zero_copy_only=False)
+        matrix = flat.astype(np.float32, copy=False).reshape(n, dim).copy()
+        matrix[~valid] = 0
+        return matrix, valid
+
+    if not (pa.types.is_list(column.type) or pa.types.is_large_list(column.type)):
+        raise TypeError(f"지원하지 않는 벡터 컬럼 타입입니다: {column.type}")
+
+    offsets = column.offsets.to_numpy()
+    lengths = np.diff(offsets)
+    has_vector = valid & (lengths > 0)
+    if not has_vector.any():
+        return np.zeros((n, 0), dtype=np.float32), has_vector
+
+    dim = int(lengths[has_vector][0])
+    if np.any(lengths[has_vector] != dim):
+        raise ValueError("벡터 차원이 행마다 다릅니다.")
+
+    flat = pc.fill_null(column.values, 0).to_numpy(zero_copy_only=False)
+    flat = flat.astype(np.float32, copy=False)
+    matrix = np.zeros((n, dim), dtype=np.float32)
+
+    if lengths[~has_vector].sum() == 0:
+        # 벡터가 있는 행의 값이 연속으로 놓여 있음
+        matrix[has_vector] = flat[offsets[0] : offsets[-1]].reshape(-1, dim)
+    else:
+        # null인데 길이가 있는 행이 섞인 경우
+        for row in np.flatnonzero(has_vector):
+            matrix[row] = flat[offsets[row] : offsets[row + 1]]
+    return matrix, has_vector
+
+
+def column_to_matrix(values) -> VectorMatrix:
+    """벡터 컬럼 형태(Arrow/문자열/리스트)에 맞는 방식으로 행렬 변환"""
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return arrow_vectors_to_matrix(values)
+
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.ArrowDtype):
+        return arrow_vectors_to_matrix(pa.chunked_array(values.array))
+
+    values = pd.Series(values, dtype=object)
+    first = values.dropna()
+    if len(first) and isinstance(first.iloc[0], str):
+        return parse_vector_strings(values)
+    return vectors_to_matrix(values)
+
+
+def split_vector_columns(
+    df: pd.DataFrame, vector_types: Sequence[str]
+) -> Tuple[pd.DataFrame, Dict[str, VectorMatrix]]:
+    """
+    DataFrame에서 벡터 컬럼을 떼어 행렬로 변환
+
+    Returns:
+        (벡터 컬럼을 뺀 상품 DataFrame, {vector_type: (matrix, has_vector)})
+    """
+    vectors = {}
+    for vector_type in vector_types:
+        vector_col = f"product_vector_{vector_type}"
+        if vector_col not in df.columns:
+            raise ValueError(f"'{vector_col}' 컬럼이 존재하지 않습니다.")
+        vectors[vector_type] = column_to_matrix(df[vector_col])
+
+    vector_cols = [c for c in df.columns if c.startswith("product_vector_")]
+    return df.drop(columns=vector_cols), vectors
+
+
+def read_parquet_vectors(
+    paths: List[str], vector_types: Sequence[str]
+) -> Tuple[pd.DataFrame, Dict[str, VectorMatrix]]:
+    """
+    Parquet 파일들을 Arrow로 읽어 벡터 컬럼은 행렬로, 나머지는 DataFrame으로 반환
+
+    벡터 컬럼은 파이썬 객체로 바꾸지 않고 Arrow 값 버퍼에서 바로 행렬을 만든다.
+    """
+    if not paths:
+        return pd.DataFrame(), {
+            t: (np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=bool))
+            for t in vector_types
+        }
+
+    table = pa.concat_tables(
+        [pq.read_table(path) for path in paths], promote_options="default"
+    )
+
+    vectors = {}
+    for vector_type in vector_types:
+        vector_col = f"product_vector_{vector_type}"
+        if vector_col not in table.column_names:
+            raise ValueError(f"'{vector_col}' 컬럼이 존재하지 않습니다.")
+        vectors[vector_type] = arrow_vectors_to_matrix(table.column(vector_col))
+
+    meta_cols = [c for c in table.column_names if not c.startswith("product_vector_")]
+    return table.select(meta_cols).to_pandas(), vectors
+
+
+# =========================
+# 벤치마크
+# =========================
+def ingest_benchmark(
+    n: int = 50000, dim: int = 768, seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    벡터 컬럼 로드 방식별 변환 시간 / 메모리 비교
+
+    - json_loads: 기존 방식 (행마다 json.loads → 리스트 → 행렬)
+    - bulk_string: parse_vector_strings
+    - arrow_list / arrow_fixed: Parquet(list<float>, fixed_size_list<float>) 읽기 + 변환
+
+    Returns:
+        {방식: {"seconds": ..., "mb": ..., "max_abs_err": ...}}
+    """
+    rng = np.random.default_rng(seed)
+    expected = rng.standard_normal((n, dim)).astype(np.float32)
+    strings = pd.Series([json.dumps(row) for row in expected.tolist()], dtype=object)
+    strings.iloc[::97] = None
+
+    expected_has = strings.notna().to_numpy()
+    expected = expected.copy()
+    expected[~expected_has] = 0
+
+    report: Dict[str, Dict[str, float]] = {}
+
+    def record(name, start, matrix, has_vector, mb=None, check_has=True):
+        if check_has:
+            assert np.array_equal(has_vector, expected_has), f"{name}: 벡터 유무 불일치"
+        report[name] = {
+            "seconds": time.perf_counter() - start,
+            "mb": matrix.nbytes / 2**20 if mb is None else mb,
+            "max_abs_err": float(np.abs(matrix - expected).max()),
+        }
+
+    start = time.perf_counter()
+    lists = strings.apply(lambda s: json.loads(s) if isinstance(s, str) else None)
+    list_mb = _object_column_mb(lists)
+    matrix, has_vector = vectors_to_matrix(lists)
+    record("json_loads", start, matrix, has_vector, mb=list_mb)
+    del lists
+
+    start = time.perf_counter()
+    matrix, has_vector = parse_vector_strings(strings)
+    record("bulk_string", start, matrix, has_vector)
+
+    flat = pa.array(expected.reshape(-1))
+    mask = pa.array(~expected_has)
+    # null이 있는 fixed_size_list는 Parquet 왕복이 안 되므로(pyarrow) 결측은 0 벡터로 저장
+    arrow_columns = {
+        "arrow_list": pa.ListArray.from_arrays(
+            pa.array(np.arange(n + 1, dtype=np.int32) * dim), flat, mask=mask
+        ),
+        "arrow_fixed": pa.FixedSizeListArray.from_arrays(flat, dim),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, column in arrow_columns.items():
+            path = os.path.join(tmp_dir, f"{name}.parquet")
+            pq.write_table(pa.table({"product_vector_x": column}), path)
+
+            start = time.perf_counter()
+            _, vectors = read_parquet_vectors([path], ["x"])
+            record(name, start, *vectors["x"], check_has=name != "arrow_fixed")
+
+    return report
+
+
+def _object_column_mb(values: pd.Series, sample: int = 200) -> float:
+    """파이썬 리스트 object 컬럼의 대략적인 메모리 (표본 기준)"""
+    lists = [v for v in values.iloc[:sample] if isinstance(v, list)]
+    if not lists:
+        return 0.0
+    per_row = np.mean(
+        [sys.getsizeof(v) + sum(sys.getsizeof(x) for x in v) for v in lists]
+    )
+    return per_row * int(values.notna().sum()) / 2**20
+
+
+def print_ingest_benchmark(report: Dict[str, Dict[str, float]]):
+    """ingest_benchmark() 결과 출력"""
+    base = report["json_loads"]["seconds"]
+    print(f"{'방식':<14} {'시간(s)':<10} {'배속':<8} {'메모리(MB)':<12} {'최대오차':<10}")
+    for name, row in report.items():
+        print(
+            f"{name:<14} {row['seconds']:<10.2f} {base / row['seconds']:<8.1f} "
+            f"{row['mb']:<12.1f} {row['max_abs_err']:<10.2e}"
+        )
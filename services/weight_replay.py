@@ -0,0 +1,266 @@
+"""
+추천 가중치 오프라인 재생(replay) - 가중치 튜닝용
+
+카탈로그의 모든(또는 표본) 상품을 기준 상품으로 삼아, 대시보드 기본 동작(기준 상품과 같은 카테고리의
+상위 top_n 추천)을 여러 가중치 설정으로 한 번에 다시 계산한다.
+
+- 기준 상품을 카테고리별로 묶고 block_size개씩 유사도 행렬 (b, 카테고리 상품 수)을 한 번만 계산
+- 같은 유사도 행렬에 설정마다 감성/평점 가중합만 다시 적용 → 설정별 상위 top_n 선택
+- 설정별 지표 (기준 설정 대비)
+    overlap@k   : 추천 목록 겹침 비율 평균
+    top1        : 1위 상품이 같은 비율
+    coverage    : 한 번이라도 추천된 상품 비율 (벡터 있는 상품 기준)
+    concentration: 추천 슬롯 중 가장 많이 추천된 상위 1% 상품이 차지하는 비율
+    seconds     : 설정별 점수 합산 + 상위 선택 시간 (공유 유사도 계산 시간은 별도)
+
+전체 랭킹 모드(조건 검색)는 카테고리별 상위 top_n을 설정마다 계산해 같은 지표를 낸다.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.similarity_engine import (
+    RANKING_WEIGHTS,
+    SIMILAR_WEIGHTS,
+    combine_similar,
+    score_ranking,
+    top_k_per_category,
+    top_k_per_category_batch,
+)
+
+DEFAULT_BLOCK_SIZE = 256
+
+# 기본 비교 설정 (첫 번째가 기준 = 현재 운영 가중치)
+DEFAULT_SIMILAR_CONFIGS: Dict[str, Tuple[float, float, float]] = {
+    "현재": SIMILAR_WEIGHTS,
+    "유사도 중시": (0.7, 0.2, 0.1),
+    "감성 중시": (0.4, 0.45, 0.15),
+    "평점 중시": (0.4, 0.2, 0.4),
+}
+DEFAULT_RANKING_CONFIGS: Dict[str, Tuple[float, float]] = {
+    "현재": RANKING_WEIGHTS,
+    "감성 중시": (0.8, 0.2),
+    "평점 중시": (0.4, 0.6),
+}
+
+
+def parse_weights(text: str, size: int) -> Tuple[float, ...]:
+    """ "0.7,0.2,0.1" → (0.7, 0.2, 0.1) (개수 확인)"""
+    weights = tuple(float(w) for w in text.split(","))
+    if len(weights) != size:
+        raise ValueError(f"가중치 {size}개가 필요합니다: {text}")
+    return weights
+
+
+def _source_rows(
+    store, n_sources: Optional[int] = None, seed: int = 0
+) -> np.ndarray:
+    """기준 상품 행 (벡터가 있는 행 전체, n_sources가 있으면 무작위 표본)"""
+    rows = np.flatnonzero(store.has_vector)
+    if n_sources is not None and n_sources < len(rows):
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(rows, size=n_sources, replace=False))
+    return rows
+
+
+def _query_vectors(store, rows: np.ndarray) -> np.ndarray:
+    """기준 벡터 (혼합 저장소는 기본 혼합 가중치 적용)"""
+    if not store.blocks:
+        return store.vectors(rows)
+    return np.stack([store.query_vector(int(row)) for row in rows])
+
+
+def replay_similar(
+    store,
+    configs: Dict[str, Tuple[float, float, float]],
+    top_n: int = 10,
+    source_rows: Optional[np.ndarray] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, float], float]:
+    """
+    유사 상품 추천 재생 (기준 상품과 같은 카테고리 상위 top_n)
+
+    Returns:
+        (기준 상품 행 (m,),
+         설정별 추천 행 (m, top_n) - 모자라면 -1,
+         설정별 점수 합산/선택 시간(초),
+         공유 유사도 계산 시간(초))
+    """
+    if source_rows is None:
+        source_rows = _source_rows(store)
+    source_rows = np.asarray(source_rows, dtype=np.int64)
+
+    picks = {name: np.full((len(source_rows), top_n), -1, dtype=np.int64) for name in configs}
+    seconds = {name: 0.0 for name in configs}
+    similarity_s = 0.0
+
+    offsets = store.category_offsets
+    source_codes = store.category_codes[source_rows]
+    for code in np.unique(source_codes):
+        candidates = np.asarray(store.category_order[offsets[code] : offsets[code + 1]])
+        candidates = candidates[store.has_vector[candidates]]
+        zeros = np.zeros(len(candidates), dtype=np.int64)
+        sentiment = store.sentiment[candidates][None, :]
+        rating = store.normalized_rating[candidates][None, :]
+        positions = np.flatnonzero(source_codes == code)
+
+        for start in range(0, len(positions), block_size):
+            block = positions[start : start + block_size]
+            queries = source_rows[block]
+
+            started = time.perf_counter()
+            similarity = store.similarity_matrix(
+                _query_vectors(store, queries), candidates
+            ).astype(np.float64)
+            # 자기 자신(같은 product_id의 모든 행) 제외
+            excluded = np.zeros(similarity.shape, dtype=bool)
+            for i, row in enumerate(queries):
+                same = store.rows_of(store.product_ids[row])
+                excluded[i] = np.isin(candidates, same)
+            similarity_s += time.perf_counter() - started
+
+            for name, weights in configs.items():
+                started = time.perf_counter()
+                scores, _ = combine_similar(similarity, sentiment, rating, weights)
+                scores[excluded] = -np.inf
+                selected = top_k_per_category_batch(scores, candidates, zeros, top_n)
+                out = picks[name]
+                for i, pos in zip(block, selected):
+                    out[i, : len(pos)] = candidates[pos]
+                seconds[name] += time.perf_counter() - started
+
+    return source_rows, picks, seconds, similarity_s
+
+
+def replay_ranking(
+    store,
+    configs: Dict[str, Tuple[float, float]],
+    top_n: int = 10,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+    """
+    전체 랭킹(조건 검색) 재생 - 카테고리별 상위 top_n
+
+    Returns:
+        (설정별 추천 행 (카테고리 수, top_n) - 모자라면 -1, 설정별 시간(초))
+    """
+    rows = np.asarray(store.category_order)
+    codes = store.category_codes[rows]
+    n_categories = len(store.category_names)
+
+    picks, seconds = {}, {}
+    for name, weights in configs.items():
+        started = time.perf_counter()
+        scores = score_ranking(store.sentiment[rows], store.normalized_rating[rows], weights)
+        selected = rows[top_k_per_category(scores, rows, codes, top_n)]
+        out = np.full((n_categories, top_n), -1, dtype=np.int64)
+        selected_codes = store.category_codes[selected]
+        starts = np.searchsorted(selected_codes, np.arange(n_categories))
+        rank = np.arange(len(selected)) - starts[selected_codes]
+        out[selected_codes, rank] = selected
+        picks[name] = out
+        seconds[name] = time.perf_counter() - started
+    return picks, seconds
+
+
+def _overlap(lists: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+    """행별 추천 목록 겹침 비율 (-1 채움 제외, 기준 목록 길이 대비)"""
+    valid = (lists >= 0)[:, :, None] & (baseline >= 0)[:, None, :]
+    common = ((lists[:, :, None] == baseline[:, None, :]) & valid).any(axis=2).sum(axis=1)
+    sizes = (baseline >= 0).sum(axis=1)
+    return np.divide(common, sizes, out=np.ones(len(sizes)), where=sizes > 0)
+
+
+def replay_report(
+    picks: Dict[str, np.ndarray],
+    seconds: Dict[str, float],
+    n_products: int,
+    weights: Dict[str, tuple],
+    baseline: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    설정별 지표 표 (baseline이 None이면 첫 번째 설정 기준)
+
+    Args:
+        n_products: 커버리지 분모 (추천 대상 상품 수)
+    """
+    names = list(picks)
+    baseline = baseline or names[0]
+    base = picks[baseline]
+
+    records = []
+    for name in names:
+        lists = picks[name]
+        recommended = lists[lists >= 0]
+        counts = np.bincount(recommended) if len(recommended) else np.zeros(1, dtype=np.int64)
+        counts = np.sort(counts[counts > 0])[::-1]
+        top_items = max(1, int(np.ceil(n_products * 0.01)))
+        records.append(
+            {
+                "config": name,
+                "weights": ", ".join(f"{w:g}" for w in weights[name]),
+                "overlap@k": float(_overlap(lists, base).mean()) if len(lists) else 1.0,
+                "top1": float((lists[:, 0] == base[:, 0]).mean()) if len(lists) else 1.0,
+                "coverage": len(counts) / max(n_products, 1),
+                "concentration": counts[:top_items].sum() / max(len(recommended), 1),
+                "seconds": seconds[name],
+            }
+        )
+    return pd.DataFrame(records)
+
+
+def print_replay_report(title: str, report: pd.DataFrame, extra: str = ""):
+    print(f"\n[{title}]{(' ' + extra) if extra else ''}")
+    print(
+        f"{'설정':<12} {'가중치':<16} {'overlap@k':>10} {'top1':>7} "
+        f"{'coverage':>9} {'집중도':>7} {'시간(초)':>9}"
+    )
+    for row in report.itertuples(index=False):
+        print(
+            f"{row.config:<12} {row.weights:<16} {row[2]:>10.3f} {row.top1:>7.3f} "
+            f"{row.coverage:>9.3f} {row.concentration:>7.3f} {row.seconds:>9.2f}"
+        )
+
+
+def replay_weight_configs(
+    store,
+    similar_configs: Optional[Dict[str, Tuple[float, float, float]]] = None,
+    ranking_configs: Optional[Dict[str, Tuple[float, float]]] = None,
+    top_n: int = 10,
+    n_sources: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: int = 0,
+    verbose: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """
+    유사 상품 추천 / 전체 랭킹을 여러 가중치 설정으로 재생하고 지표 표 반환
+
+    Returns:
+        {"similar": 유사 상품 지표 표, "ranking": 전체 랭킹 지표 표}
+    """
+    similar_configs = similar_configs or DEFAULT_SIMILAR_CONFIGS
+    ranking_configs = ranking_configs or DEFAULT_RANKING_CONFIGS
+    n_products = int(store.has_vector.sum())
+
+    sources = _source_rows(store, n_sources, seed)
+    _, picks, seconds, similarity_s = replay_similar(
+        store, similar_configs, top_n, sources, block_size
+    )
+    similar = replay_report(picks, seconds, n_products, similar_configs)
+
+    ranking_picks, ranking_seconds = replay_ranking(store, ranking_configs, top_n)
+    ranking = replay_report(ranking_picks, ranking_seconds, len(store), ranking_configs)
+
+    if verbose:
+        print_replay_report(
+            "유사 상품 추천",
+            similar,
+            f"기준 상품 {len(sources):,}개 × 설정 {len(similar_configs)}개, "
+            f"top {top_n}, 공유 유사도 계산 {similarity_s:.2f}초",
+        )
+        print_replay_report(
+            "전체 랭킹", ranking, f"카테고리 {len(store.category_names)}개, top {top_n}"
+        )
+    return {"similar": similar, "ranking": ranking}
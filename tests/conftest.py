@@ -0,0 +1,177 @@
+"""
+테스트 공용 가상 상품 데이터
+
+작은 고정 시드 데이터로 빠르게 돌도록 기본 크기는 수백 개 상품 × 16차원이다.
+bench 마커 테스트만 10만 행 원본(bench_raw_catalog)을 쓴다.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.embedding_store import register_catalog_products
+from services.product_filter import MAIN_CATS
+
+SKIN_TYPES = ["건성", "지성", "민감성", "복합/혼합(건성)", "복합/혼합(지성)"]
+
+
+def synthetic_products(
+    n: int = 400, dim: int = 16, n_categories: int = 4, seed: int = 0
+) -> pd.DataFrame:
+    """
+    임베딩 컬럼이 있는 가상 상품 (Athena integrated_products_final 형태)
+
+    벡터는 잠재 군집 중심 + 잡음이라 이웃 구조가 있고,
+    감성/평점/벡터 결측 행이 섞여 있다.
+    """
+    rng = np.random.default_rng(seed)
+
+    def clustered_vectors():
+        centers = rng.standard_normal((8, dim))
+        noise = rng.standard_normal((n, dim))
+        return (centers[rng.integers(0, 8, n)] + noise * 0.7).astype(np.float32)
+
+    category = rng.choice([f"카테고리{c}" for c in range(n_categories)], n)
+    total_reviews = rng.integers(0, 1000, n)
+    rating_counts = np.stack(
+        [rng.multinomial(t, [0.05, 0.05, 0.1, 0.3, 0.5]) for t in total_reviews]
+    )
+    vocabulary = np.array([f"키워드{k}" for k in range(40)], dtype=object)
+
+    df = pd.DataFrame(
+        {
+            "product_id": [f"상품_{i}" for i in range(n)],
+            "product_name": [f"상품명 {i}" for i in range(n)],
+            "brand": rng.choice(["A", "B", "C", "D"], n),
+            "category": category,
+            "category_path": [f"쿠팡 홈 > 뷰티 > 스킨케어 > {c}" for c in category],
+            "skin_type": rng.choice(SKIN_TYPES, n),
+            "sentiment_score": rng.uniform(0, 1, n),
+            "avg_rating_with_text": np.round(rng.uniform(1, 5, n), 2),
+            "total_reviews": total_reviews,
+            **{f"rating_{i}": rating_counts[:, i - 1] for i in range(1, 6)},
+            "price": rng.integers(1000, 50000, n),
+            "product_url": "",
+            "top_keywords": [
+                list(rng.choice(vocabulary, size=size, replace=False))
+                for size in rng.integers(2, 7, n)
+            ],
+            "product_vector_roberta_semantic": list(clustered_vectors()),
+            "product_vector_roberta_sentiment": list(clustered_vectors()),
+        }
+    )
+    # 결측 케이스
+    df.loc[df.index % 37 == 1, "sentiment_score"] = np.nan
+    df.loc[df.index % 31 == 2, "avg_rating_with_text"] = np.nan
+    df.loc[df.index % 29 == 3, "product_vector_roberta_semantic"] = None
+    return df
+
+
+def synthetic_raw_catalog(n: int, seed: int = 0, vector_dim: int = 0) -> pd.DataFrame:
+    """
+    make_df() 입력 형태의 가상 Athena 원본 (화면용 카탈로그 테스트용)
+
+    product_id가 겹치는 행, 결측/비정상 카테고리 경로, 배열/문자열/결측 키워드를 섞는다.
+    vector_dim > 0 이면 Athena처럼 임베딩 벡터 컬럼 2개를 붙인다.
+    """
+    rng = np.random.default_rng(seed)
+    paths = [
+        f"쿠팡 홈 > 뷰티 > {main} > {middle} > {sub}"
+        for main in MAIN_CATS
+        for middle in ("기초", "포인트", "바디")
+        for sub in ("크림", "토너", "에센스", "세럼", "패드")
+    ] + ["쿠팡 홈 > 뷰티 > 스킨케어 > 크림", "쿠팡 홈 > 생활용품 > 세제", ""]
+    vocabulary = np.array([f"키워드{k}" for k in range(300)], dtype=object)
+    n_products = max(1, int(n * 0.9))
+    product_ids = rng.integers(0, n_products, n)
+
+    category_path = np.array(paths, dtype=object)[rng.integers(0, len(paths), n)]
+    category_path[rng.random(n) < 0.01] = None
+    keywords = [
+        list(rng.choice(vocabulary, size=size, replace=False))
+        for size in rng.integers(0, 6, n)
+    ]
+    for i in np.flatnonzero(rng.random(n) < 0.05):
+        keywords[i] = "['수분', '진정']"
+    for i in np.flatnonzero(rng.random(n) < 0.02):
+        keywords[i] = None
+    skin_type = np.array(
+        ["건성", "지성", "민감성", "복합/혼합(건성)", None], dtype=object
+    )[rng.integers(0, 5, n)]
+
+    total_reviews = rng.integers(0, 600, n)
+    shares = rng.dirichlet([0.2, 0.2, 0.3, 1.0, 8.0], size=n)
+    rating_counts = np.floor(shares * total_reviews[:, None]).astype(np.int64)
+    raw = pd.DataFrame(
+        {
+            "product_id": [f"상품_{i}" for i in product_ids],
+            "product_name": [f"상품명 {i}" for i in product_ids],
+            "brand": rng.choice(["A", "B", "C", "D"], n),
+            "price": rng.integers(1000, 50000, n),
+            "product_url": "",
+            # Athena처럼 임베딩별 대표 리뷰 ID만 있음 (화면용 컬럼은 make_df가 만듦)
+            "representative_review_id_roberta_sentiment": rng.integers(0, 10**6, n),
+            "representative_review_id_roberta_semantic": rng.integers(0, 10**6, n),
+            "total_reviews": rating_counts.sum(axis=1),
+            **{f"rating_{i}": rating_counts[:, i - 1] for i in range(1, 6)},
+            "avg_rating_with_text": np.round(rng.uniform(3.5, 5, n), 2),
+            "top_keywords": pd.Series(keywords, dtype=object),
+            "category": rng.choice(["크림", "토너", "에센스"], n),
+            "category_path": category_path,
+            "skin_type": skin_type,
+        }
+    )
+    for vector_type in ("roberta_semantic", "roberta_sentiment") if vector_dim else ():
+        vectors = rng.standard_normal((n, vector_dim)).astype(np.float32)
+        raw[f"product_vector_{vector_type}"] = list(vectors)
+    return raw
+
+
+@pytest.fixture(scope="session")
+def products() -> pd.DataFrame:
+    """기본 가상 상품 400개 (테스트끼리 공유하므로 수정하지 말 것)"""
+    return synthetic_products()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def catalog_version(products) -> str:
+    """앱처럼 카탈로그 데이터 지문으로 버전을 정해 둠 (디스크 결과 파일은 이 버전으로 검증)"""
+    return register_catalog_products(products)
+
+
+@pytest.fixture(scope="session")
+def make_products():
+    """크기/시드를 바꾼 가상 상품이 필요한 테스트용 생성 함수"""
+    return synthetic_products
+
+
+@pytest.fixture(scope="session")
+def raw_catalog() -> pd.DataFrame:
+    """화면용 카탈로그 원본 3000행 (테스트끼리 공유하므로 수정하지 말 것)"""
+    return synthetic_raw_catalog(3000)
+
+
+@pytest.fixture(scope="session")
+def make_raw_catalog():
+    """크기/벡터 차원을 바꾼 화면용 카탈로그 원본이 필요한 테스트용 생성 함수"""
+    return synthetic_raw_catalog
+
+
+@pytest.fixture(scope="session")
+def bench_raw_catalog() -> pd.DataFrame:
+    """벤치마크용 화면용 카탈로그 원본 10만 행 (bench 마커 테스트에서만 생성)"""
+    return synthetic_raw_catalog(100_000)
+
+
+@pytest.fixture(scope="session")
+def timed():
+    """func(*args) 결과와 걸린 초를 돌려주는 측정 함수"""
+
+    def run(func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+    return run
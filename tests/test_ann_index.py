@@ -0,0 +1,33 @@
+"""
+카테고리별 HNSW 인덱스 재현율 / 저장·로드 검증
+"""
+
+import pytest
+
+from services.embedding_store import EmbeddingStore
+
+hnswlib = pytest.importorskip("hnswlib")
+
+from services.ann_index import AnnIndex, ann_recall_report  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def store(products):
+    return EmbeddingStore.from_products(products)
+
+
+def test_recall_against_exact(store):
+    ann_index = AnnIndex.build(store, ef_search=64)
+    report = ann_recall_report(store, ann_index, n_queries=50, k=10)
+    assert report["recall"] >= 0.95
+
+
+def test_save_load_checks_fingerprint(store, make_products, tmp_path):
+    AnnIndex.build(store).save(str(tmp_path))
+
+    loaded = AnnIndex.load(store, str(tmp_path))
+    assert loaded is not None
+    assert sorted(loaded.indexes) == sorted(AnnIndex.build(store).indexes)
+
+    other = EmbeddingStore.from_products(make_products(n=300, seed=1))
+    assert AnnIndex.load(other, str(tmp_path)) is None
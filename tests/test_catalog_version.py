@@ -0,0 +1,51 @@
+"""
+데이터 지문 기반 카탈로그 버전: 같은 데이터 = 같은 버전, 데이터를 읽기 전에는 디스크 파일을 믿지 않음
+"""
+
+import numpy as np
+
+from services import catalog_version
+from services.catalog_version import get_catalog_version, is_verified_version
+from services.embedding_store import (
+    EmbeddingStore,
+    load_embedding_store,
+    register_catalog_products,
+    save_embedding_store,
+)
+
+
+def test_same_data_same_version(products):
+    version = register_catalog_products(products)
+    assert is_verified_version(version)
+    # 조회 순서가 달라도 같은 버전
+    shuffled = products.sample(frac=1, random_state=0)
+    assert register_catalog_products(shuffled) == version
+
+    changed = products.copy()
+    changed.at[0, "product_vector_roberta_sentiment"] = (
+        np.asarray(changed.at[0, "product_vector_roberta_sentiment"]) + 0.5
+    )
+    assert register_catalog_products(changed) != version
+    assert register_catalog_products(products) == version
+
+
+def test_unverified_store_rejected(products, tmp_path, monkeypatch):
+    monkeypatch.delenv("CATALOG_VERSION", raising=False)
+    monkeypatch.setattr(catalog_version, "_data_fingerprint", None)
+    version = get_catalog_version()
+    assert not is_verified_version(version)
+
+    store = EmbeddingStore.from_products(products)
+    assert store.version == version
+    save_embedding_store(store, str(tmp_path))
+    # 프로세스가 바뀌어도 같은 unverified 버전이 나오므로 어느 데이터인지 알 수 없는 파일은 무시
+    assert load_embedding_store(store.vector_type, str(tmp_path), version=version) is None
+
+
+def test_declared_version(monkeypatch):
+    monkeypatch.setenv("CATALOG_VERSION", "2026-10-17")
+    monkeypatch.setattr(catalog_version, "_generation", 0)
+    assert get_catalog_version() == "2026-10-17"
+    assert is_verified_version(get_catalog_version())
+    monkeypatch.setattr(catalog_version, "_generation", 2)
+    assert get_catalog_version() == "2026-10-17@2"
@@ -0,0 +1,393 @@
+"""
+화면용 카탈로그: 컬럼 정규화 / 타입 압축 / 필터 인덱스 / 미리 계산한 정렬 = 이전 구현 결과 검증
+"""
+
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from services.near_duplicates import attach_dup_clusters
+from services.product_clusters import attach_product_clusters
+from services.product_filter import ProductFilter, norm_cat, split_category
+from services.product_sort import DEFAULT_SORT, SORT_KEYS
+from utils.catalog_schema import (
+    compact_catalog,
+    isin_codes,
+    memory_report,
+    print_memory_report,
+)
+from utils.data_utils import (
+    DEFAULT_IMAGE_URL,
+    _register_catalog_indexes,
+    apply_filters,
+    catalog_sort_index,
+    filter_catalog,
+    filter_rows,
+    normalize_columns,
+    popular_products,
+    sort_products,
+)
+from utils.load_data import make_df
+
+
+def normalize_columns_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """행 단위 파이썬 구현 - normalize_columns() 결과 동일성 확인용 기준"""
+    df = df.copy()
+
+    # 카테고리 정규화
+    if "category_path_norm" not in df.columns:
+        if "category_path" in df.columns:
+            df["category_path_norm"] = df["category_path"].apply(norm_cat)
+        elif "path" in df.columns:
+            df["category_path_norm"] = df["path"].apply(norm_cat)
+        elif "category" in df.columns:
+            df["category_path_norm"] = (
+                df["category"].astype(str).str.replace("_", "/", regex=False)
+            )
+        else:
+            df["category_path_norm"] = ""
+
+    # main/middle/sub 카테고리 분리
+    if "main_category" not in df.columns:
+        df[["main_category", "middle_category", "sub_category"]] = (
+            df["category_path_norm"].apply(split_category).apply(pd.Series)
+        )
+
+    if "sub_category" not in df.columns:
+        df["sub_category"] = df["category"] if "category" in df.columns else ""
+
+    # 평점 컬럼
+    if "score" not in df.columns and "avg_rating_with_text" in df.columns:
+        df["score"] = df["avg_rating_with_text"]
+
+    # 뱃지 초기화
+    if "badge" not in df.columns:
+        df["badge"] = ""
+    df["badge"] = df["badge"].fillna("").astype(str)
+
+    # 뱃지 계산
+    if "total_reviews" in df.columns:
+        tr = pd.to_numeric(df["total_reviews"], errors="coerce").fillna(0)
+        need = df["badge"].eq("")
+        best = need & (tr >= 200) & (df["score"] >= 4.9)
+        reco = need & (tr >= 200) & (df["score"] >= 4.8) & (~best)
+        df.loc[best, "badge"] = "BEST"
+        df.loc[reco, "badge"] = "추천"
+
+    # 이미지 URL
+    if "image_url" not in df.columns:
+        df["image_url"] = DEFAULT_IMAGE_URL
+
+    # 대표 리뷰 ID
+    if "representative_review_id_roberta" not in df.columns:
+        if "representative_review_id_roberta_sentiment" in df.columns:
+            df["representative_review_id_roberta"] = df[
+                "representative_review_id_roberta_sentiment"
+            ]
+        elif "representative_review_id_roberta_semantic" in df.columns:
+            df["representative_review_id_roberta"] = df[
+                "representative_review_id_roberta_semantic"
+            ]
+        else:
+            df["representative_review_id_roberta"] = np.nan
+
+    # 제품 URL
+    if "product_url" not in df.columns:
+        df["product_url"] = ""
+
+    # 키워드 문자열
+    if "top_keywords_str" not in df.columns:
+        if "top_keywords" in df.columns:
+            df["top_keywords_str"] = df["top_keywords"].apply(
+                lambda x: (
+                    ", ".join(map(str, x))
+                    if isinstance(x, (list, np.ndarray))
+                    else re.sub(r"[\[\]']", "", str(x))
+                )
+            )
+        else:
+            df["top_keywords_str"] = ""
+
+    return df
+
+
+def apply_filters_chain(
+    df: pd.DataFrame,
+    selected_sub_cat: list,
+    selected_skin: list,
+    min_rating: float,
+    max_rating: float,
+    min_price: int,
+    max_price: int,
+) -> pd.DataFrame:
+    """이전 구현 (전체 복사 후 bool 마스크 연쇄) - 필터 인덱스 결과 비교용"""
+    filtered_df = df.copy()
+    if selected_sub_cat:
+        filtered_df = filtered_df[isin_codes(filtered_df["sub_category"], selected_sub_cat)]
+    if selected_skin:
+        filtered_df = filtered_df[isin_codes(filtered_df["skin_type"], selected_skin)]
+    filtered_df = filtered_df[
+        (filtered_df["score"] >= min_rating) & (filtered_df["score"] <= max_rating)
+    ]
+    filtered_df = filtered_df[
+        (filtered_df["price"] >= min_price) & (filtered_df["price"] <= max_price)
+    ]
+    return filtered_df
+
+
+@pytest.fixture(scope="module")
+def catalog(raw_catalog):
+    """인덱스를 등록한 화면용 카탈로그 (prepare_dataframe과 같은 순서로 생성)"""
+    catalog = compact_catalog(
+        attach_product_clusters(attach_dup_clusters(normalize_columns(make_df(raw_catalog))))
+    )
+    catalog.attrs["catalog_version"] = "test-data-utils"
+    _register_catalog_indexes(catalog)
+    return catalog
+
+
+def filter_scenarios(catalog: pd.DataFrame, n: int, seed: int = 0) -> list:
+    """(카테고리, 피부 타입, 최소/최대 평점, 최소/최대 가격) 조건 - 첫 번째는 조건 없음"""
+    rng = np.random.default_rng(seed)
+    subs = catalog["sub_category"].dropna().unique().tolist()
+    skins = catalog["skin_type"].dropna().unique().tolist()
+    scenarios = [([], [], 0.0, 5.0, 0, int(catalog["price"].max()))]
+    for _ in range(n - 1):
+        low = float(rng.choice([0.0, 3.0, 4.0, 4.5]))
+        price_low = int(rng.integers(0, 20000))
+        scenarios.append(
+            (
+                list(rng.choice(subs, size=int(rng.integers(1, 4)), replace=False)),
+                list(rng.choice(skins, size=int(rng.integers(0, 3)), replace=False)),
+                low,
+                5.0,
+                price_low,
+                price_low + int(rng.integers(5000, 60000)),
+            )
+        )
+    return scenarios
+
+
+def test_normalize_columns_matches_loop(raw_catalog):
+    # make_df 결과 + make_df를 거치지 않은 원본 직접 입력 둘 다 확인
+    for frame in (make_df(raw_catalog), raw_catalog):
+        pd.testing.assert_frame_equal(
+            normalize_columns(frame), normalize_columns_loop(frame)
+        )
+
+
+def test_compacted_catalog_filters_match(make_raw_catalog):
+    # make_df 경로 (운영) + 벡터 컬럼이 남은 원본 (compact_catalog가 벡터 컬럼을 버리는지)
+    raw = make_raw_catalog(500, vector_dim=8)
+    for frame in (normalize_columns(make_df(raw)), normalize_columns(raw)):
+        frame = attach_product_clusters(attach_dup_clusters(frame))
+        compacted = compact_catalog(frame)
+        assert not any(c.startswith("product_vector_") for c in compacted.columns)
+
+        subs = list(frame["sub_category"].dropna().unique()[:3])
+        skins = list(frame["skin_type"].dropna().unique()[:2])
+        args = (subs, skins, 3.0, 5.0, 0, 40000)
+        assert apply_filters(frame, *args).index.equals(apply_filters(compacted, *args).index)
+
+
+def test_compact_catalog_keeps_keyword_lists(raw_catalog):
+    frame = normalize_columns(raw_catalog)
+    compacted = compact_catalog(frame)
+    # 리스트 키워드는 repr 문자열이 되지 않고, 결합 문자열 컬럼만 Arrow 문자열로 바뀜
+    assert compacted["top_keywords"].tolist() == frame["top_keywords"].tolist()
+    assert isinstance(compacted["top_keywords_str"].dtype, pd.StringDtype)
+    assert compacted["top_keywords_str"].tolist() == frame["top_keywords_str"].tolist()
+
+
+def test_filter_index_matches_chain(catalog):
+    for scenario in filter_scenarios(catalog, 30):
+        rows = filter_rows(catalog, *scenario)
+        # 인덱스 경로 = 컬럼 비교 경로(복사본에는 인덱스가 없음)
+        assert rows is None or np.array_equal(rows, filter_rows(catalog.copy(), *scenario))
+        pd.testing.assert_frame_equal(
+            apply_filters(catalog, *scenario, collapse_dups=False),
+            apply_filters_chain(catalog, *scenario),
+        )
+
+
+def test_filter_catalog_positions(catalog):
+    no_condition = filter_scenarios(catalog, 1)[0]
+    filtered, positions = filter_catalog(catalog, *no_condition, collapse_dups=False)
+    # 모든 행이 통과해도 공유 카탈로그 객체를 돌려주지 않음
+    assert filtered is not catalog and apply_filters(catalog, *no_condition) is not catalog
+    assert np.array_equal(positions, np.arange(len(catalog)))
+
+    for scenario in filter_scenarios(catalog, 5, seed=2):
+        filtered, positions = filter_catalog(catalog, *scenario, search_text="1")
+        assert filtered.index.equals(catalog.index[positions])
+
+    # 카탈로그가 아닌 DataFrame은 행 위치 없음
+    assert filter_catalog(catalog.head(50), *no_condition)[1] is None
+
+
+@pytest.mark.parametrize("min_rating, max_rating", [(4.5, 4.8), (3.0, 4.6)])
+def test_recommendation_prefilter_matches_sidebar(make_raw_catalog, min_rating, max_rating):
+    """추천 사전 필터(Athena 원본 행의 저장소)와 사이드바 필터가 같은 상품을 고름"""
+    raw = make_raw_catalog(1000, vector_dim=8)
+    catalog = compact_catalog(normalize_columns(make_df(raw)))
+    catalog.attrs["catalog_version"] = "test-prefilter-parity"
+    _register_catalog_indexes(catalog)
+
+    sidebar, _ = filter_catalog(
+        catalog, [], [], min_rating, max_rating, 0, 10**6, collapse_dups=False
+    )
+    store = EmbeddingStore.from_products(raw)
+    admitted = store.admitted_mask(
+        ProductFilter(min_rating=min_rating, max_rating=max_rating)
+    )
+    assert 0 < len(sidebar) < len(catalog)
+    assert set(store.product_ids[admitted]) == set(sidebar["product_id"])
+
+
+def test_presorted_matches_sort_values(catalog):
+    scenarios = [(s, "") for s in filter_scenarios(catalog, 6, seed=1)] + [
+        (filter_scenarios(catalog, 1)[0], "1")
+    ]
+    for filters, text in scenarios:
+        filtered, positions = filter_catalog(catalog, *filters, search_text=text)
+        assert catalog_sort_index(filtered) is None and positions is not None
+        for option in SORT_KEYS:
+            # 행 위치 없이 부르면 sort_values 경로
+            pd.testing.assert_frame_equal(
+                sort_products(filtered, option, catalog=catalog, positions=positions),
+                sort_products(filtered, option),
+            )
+
+    pd.testing.assert_frame_equal(popular_products(catalog), popular_products(catalog.copy()))
+
+
+@pytest.mark.bench
+def test_normalize_columns_bench(bench_raw_catalog, timed):
+    for label, frame in (("make_df 결과", make_df(bench_raw_catalog)), ("원본", bench_raw_catalog)):
+        expected, loop_seconds = timed(normalize_columns_loop, frame)
+        actual, seconds = timed(normalize_columns, frame)
+        pd.testing.assert_frame_equal(actual, expected)
+        print(
+            f"\n[normalize_columns] {label} {len(frame):,}행: "
+            f"행 단위 {loop_seconds * 1000:.1f}ms / 현재 {seconds * 1000:.1f}ms"
+        )
+
+
+@pytest.mark.bench
+def test_catalog_memory_bench(make_raw_catalog, timed):
+    raw = make_raw_catalog(100_000, vector_dim=128)
+    frame = attach_product_clusters(
+        attach_dup_clusters(normalize_columns(make_df(raw)))
+    )
+    compacted, seconds = timed(compact_catalog, frame)
+    print(f"\n[compact_catalog] {len(frame):,}행, 압축 {seconds * 1000:.0f}ms")
+    print_memory_report(memory_report(frame, compacted), top=12)
+
+    subs = list(frame["sub_category"].dropna().unique()[:3])
+    skins = list(frame["skin_type"].dropna().unique()[:2])
+    args = (subs, skins, 3.0, 5.0, 0, 40000)
+    assert apply_filters(frame, *args).index.equals(apply_filters(compacted, *args).index)
+
+
+@pytest.fixture(scope="module")
+def bench_catalog(bench_raw_catalog):
+    """인덱스를 등록한 10만 행 원본의 화면용 카탈로그 (bench 마커 테스트용)"""
+    catalog = compact_catalog(
+        attach_product_clusters(
+            attach_dup_clusters(normalize_columns(make_df(bench_raw_catalog)))
+        )
+    )
+    catalog.attrs["catalog_version"] = "bench-data-utils"
+    _register_catalog_indexes(catalog)
+    return catalog
+
+
+@pytest.mark.bench
+def test_filter_bench(bench_catalog):
+    scenarios = filter_scenarios(bench_catalog, 50)
+    timings = {"filter_rows (인덱스)": 0.0, "apply_filters": 0.0, "이전 구현": 0.0}
+    for scenario in scenarios:
+        start = time.perf_counter()
+        rows = filter_rows(bench_catalog, *scenario)
+        timings["filter_rows (인덱스)"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = apply_filters(bench_catalog, *scenario, collapse_dups=False)
+        timings["apply_filters"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = apply_filters_chain(bench_catalog, *scenario)
+        timings["이전 구현"] += time.perf_counter() - start
+
+        assert rows is None or np.array_equal(rows, filter_rows(bench_catalog.copy(), *scenario))
+        pd.testing.assert_frame_equal(actual, expected)
+
+    print(f"\n[필터 평균 시간] 조건 {len(scenarios)}개, {len(bench_catalog):,}개 상품")
+    for name, seconds in timings.items():
+        print(f"  {name:<24} {seconds / len(scenarios) * 1e6:>10.0f}µs")
+
+
+
+@pytest.mark.bench
+def test_sort_bench(bench_catalog):
+    # 전체 / 카테고리 일부 / 좁은 조건 + 검색어
+    scenarios = [(s, "") for s in filter_scenarios(bench_catalog, 8, seed=1)] + [
+        (filter_scenarios(bench_catalog, 1)[0], "1")
+    ]
+    sort_index = catalog_sort_index(bench_catalog)
+    timings = {"순서 계산만": 0.0, "미리 계산한 순서": 0.0, "sort_values": 0.0}
+    for filters, text in scenarios:
+        filtered, positions = filter_catalog(bench_catalog, *filters, search_text=text)
+        for option in SORT_KEYS:
+            start = time.perf_counter()
+            sort_index.order(option, positions)
+            timings["순서 계산만"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = sort_products(
+                filtered, option, catalog=bench_catalog, positions=positions
+            )
+            timings["미리 계산한 순서"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = sort_products(filtered, option)
+            timings["sort_values"] += time.perf_counter() - start
+            pd.testing.assert_frame_equal(actual, expected)
+
+    runs = len(scenarios) * len(SORT_KEYS)
+    print(f"\n[정렬 평균 시간] {runs}회 (미리 계산한 순서 = 순서 계산 + 행 복사)")
+    for name, seconds in timings.items():
+        print(f"  {name:<24} {seconds / runs * 1e6:>10.0f}µs")
+
+
+
+@pytest.mark.bench
+def test_rerun_bench(bench_raw_catalog, bench_catalog, timed):
+    """재실행 비용: 카탈로그를 매번 만들던 경로 vs 공유 카탈로그에서 필터/정렬만"""
+
+    def rebuild():
+        catalog = compact_catalog(
+            attach_product_clusters(
+                attach_dup_clusters(normalize_columns(make_df(bench_raw_catalog)))
+            )
+        )
+        catalog.attrs["catalog_version"] = "bench-rerun"
+        _register_catalog_indexes(catalog)
+        return catalog
+
+    def interact(catalog):
+        filtered, positions = filter_catalog(catalog, *filter_scenarios(catalog, 2)[1])
+        sort_products(filtered, DEFAULT_SORT, catalog=catalog, positions=positions)
+        popular_products(catalog)
+
+    _, rebuild_seconds = timed(rebuild)
+    _, interact_seconds = timed(interact, bench_catalog)
+    print(
+        f"\n[재실행 비용] {len(bench_catalog):,}개 상품: "
+        f"카탈로그 재생성 {rebuild_seconds * 1000:.0f}ms / "
+        f"공유 카탈로그 필터·정렬 {interact_seconds * 1000:.1f}ms"
+    )
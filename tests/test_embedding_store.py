@@ -0,0 +1,44 @@
+"""
+메모리 맵 저장소 저장/로드 검증
+"""
+
+import numpy as np
+import pytest
+
+from services.embedding_store import (
+    EmbeddingStore,
+    load_embedding_store,
+    save_embedding_store,
+)
+from services.recommend_similar_products import _select_from_store
+
+
+@pytest.mark.parametrize("precision", ["float32", "int8"])
+def test_roundtrip(products, tmp_path, precision):
+    store = EmbeddingStore.from_products(products, precision=precision)
+    store.fit_projection(8)
+    save_embedding_store(store, str(tmp_path))
+    # 같은 경로에 다시 저장해도 (디렉토리 교체) 읽을 수 있어야 함
+    save_embedding_store(store, str(tmp_path))
+
+    loaded = load_embedding_store(store.vector_type, str(tmp_path), version=store.version)
+    assert loaded is not None
+    assert loaded.fingerprint == store.fingerprint
+    assert np.array_equal(loaded.product_ids, store.product_ids)
+    assert np.array_equal(loaded.has_vector, store.has_vector)
+    assert loaded.projection.dim == 8
+
+    rows = np.arange(len(store))
+    np.testing.assert_array_equal(loaded.vectors(rows), store.vectors(rows))
+    for product_id in ("상품_0", "상품_5"):
+        expected = _select_from_store(store, product_id, top_n=5)
+        actual = _select_from_store(loaded, product_id, top_n=5)
+        assert np.array_equal(actual[0], expected[0])
+        np.testing.assert_allclose(actual[1], expected[1])
+
+
+def test_version_mismatch(products, tmp_path):
+    store = EmbeddingStore.from_products(products)
+    save_embedding_store(store, str(tmp_path))
+    assert load_embedding_store(store.vector_type, str(tmp_path), version="다른 버전") is None
+    assert load_embedding_store("roberta_sentiment", str(tmp_path)) is None
@@ -0,0 +1,57 @@
+"""
+키워드 희소 행렬 자카드 유사도 = 파이썬 set 계산 검증, 하이브리드 추천 확인
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from services.keyword_index import KeywordIndex, parse_keywords
+from services.recommend_similar_products import _batch_from_store, _select_from_store
+
+
+def test_parse_keywords():
+    assert parse_keywords(["수분", "진정"]) == ["수분", "진정"]
+    assert parse_keywords('["수분", "진정", "수분"]') == ["수분", "진정"]
+    assert parse_keywords(None) == []
+
+
+def test_jaccard_matches_sets(products):
+    index = KeywordIndex(products["top_keywords"])
+    keyword_sets = [set(kws) for kws in products["top_keywords"]]
+
+    for row in (0, 17, 123):
+        target = keyword_sets[row]
+        expected = np.array(
+            [
+                len(target & other) / len(target | other) if target | other else 0.0
+                for other in keyword_sets
+            ]
+        )
+        np.testing.assert_allclose(index.similarity(row), expected)
+
+    rows = np.array([5, 3, 99])
+    np.testing.assert_allclose(index.similarity(0, rows), index.similarity(0)[rows])
+
+
+def test_empty_keywords():
+    index = KeywordIndex(pd.Series([[], ["수분"], None], dtype=object))
+    assert index.similarity(0).tolist() == [0.0, 0.0, 0.0]
+    assert index.similarity(1).tolist() == [0.0, 1.0, 0.0]
+
+
+@pytest.mark.parametrize("keyword_weight", [0.3, 1.0])
+def test_hybrid_batch_matches_single(products, keyword_weight):
+    store = EmbeddingStore.from_products(products)
+    product_ids = store.product_ids[store.has_vector][:8].tolist()
+
+    batch = dict(
+        _batch_from_store(store, product_ids, top_n=5, keyword_weight=keyword_weight)
+    )
+    for pid in product_ids:
+        rows, scores, _ = _select_from_store(
+            store, pid, top_n=5, keyword_weight=keyword_weight
+        )
+        assert batch[pid].product_ids.tolist() == store.product_ids[rows].tolist()
+        np.testing.assert_allclose(batch[pid].recommend_score, scores, atol=1e-6)
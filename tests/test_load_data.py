@@ -0,0 +1,167 @@
+"""
+make_df() = 행 단위 구현 결과 검증
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.load_data import make_df
+
+
+def make_df_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """행 단위 파이썬 구현 - make_df() 결과 동일성 확인용 기준"""
+    rating_df = df.groupby("product_id", as_index=False).agg(
+        {
+            "rating_1": "sum",
+            "rating_2": "sum",
+            "rating_3": "sum",
+            "rating_4": "sum",
+            "rating_5": "sum",
+            "total_reviews": "sum",
+        }
+    )
+
+    # 상품 평점
+    rating_df["score"] = (
+        rating_df["rating_1"] * 1
+        + rating_df["rating_2"] * 2
+        + rating_df["rating_3"] * 3
+        + rating_df["rating_4"] * 4
+        + rating_df["rating_5"] * 5
+    ) / rating_df["total_reviews"]
+
+    rating_df["score"] = rating_df["score"].round(2)
+    rating_df["score"] = rating_df["score"].fillna(0)
+
+    image_url = f"https://tr.rbxcdn.com/180DAY-981c49e917ba903009633ed32b3d0ef7/420/420/Hat/Webp/noFilter"
+
+    # 추천 뱃지
+    def calc_badge(score, total_reviews):
+        if total_reviews >= 200:
+            if score >= 4.9:
+                return "BEST"
+            elif score >= 4.7:
+                return "추천"
+        return ""
+
+    rating_df["badge"] = rating_df.apply(
+        lambda x: calc_badge(x["score"], x["total_reviews"]), axis=1
+    )
+
+    # 카테고리 정규화
+    main_cats = ["스킨케어", "클렌징/필링", "선케어/태닝", "메이크업"]
+
+    def norm_cat(path):
+        if not isinstance(path, str):
+            return ""
+
+        parts = [p.strip() for p in path.split(">")]
+
+        for main in main_cats:
+            if main in parts:
+                idx = parts.index(main)
+                return " > ".join(parts[idx:])
+        return ""
+
+    def split_category(path: str):
+        if not isinstance(path, str):
+            return "", "", ""
+
+        parts = [p.strip() for p in path.split(">")]
+
+        main = parts[0] if len(parts) >= 1 else ""
+        middle = parts[1] if len(parts) >= 2 else ""
+        sub = parts[-1] if len(parts) >= 3 else parts[-1] if parts else ""
+
+        return main, middle, sub
+
+    # unhashable값들 문자열 변환
+    def _make_hashable_df(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for col in df.columns:
+            if (
+                df[col]
+                .apply(lambda x: isinstance(x, (list, np.ndarray, dict, set)))
+                .any()
+            ):
+                df[col] = df[col].apply(
+                    lambda x: (
+                        ", ".join(map(str, x))
+                        if isinstance(x, (list, np.ndarray))
+                        else (str(x) if pd.notna(x) else "")
+                    )
+                )
+        return df
+
+    df = df.copy()
+    df["category_path_norm"] = df["category_path"].apply(norm_cat)
+    df[["main_category", "middle_category", "sub_category"]] = (
+        df["category_path_norm"].apply(split_category).apply(pd.Series)
+    )
+    df["image_url"] = image_url
+    df["representative_review_id_roberta"] = df[
+        "representative_review_id_roberta_sentiment"
+    ]
+    df["top_keywords"] = df["top_keywords"].apply(
+        lambda x: (
+            ", ".join(x)
+            if isinstance(x, (list, np.ndarray))
+            else (x if isinstance(x, str) else "")
+        )
+    )
+
+    product_df = (
+        df[
+            [
+                "product_id",
+                "product_name",
+                "brand",
+                "price",
+                "image_url",
+                "product_url",
+                "representative_review_id_roberta",
+                "total_reviews",
+                "top_keywords",
+                "category",
+                "category_path_norm",
+                "main_category",
+                "middle_category",
+                "sub_category",
+                "skin_type",
+            ]
+        ]
+        .drop_duplicates("product_id")
+        .copy()
+    )
+
+    fin_df = product_df.merge(
+        rating_df[["product_id", "score", "badge"]], on="product_id", how="left"
+    )
+
+    fin_df = _make_hashable_df(fin_df)
+
+    return fin_df
+
+
+def test_make_df_matches_loop(raw_catalog):
+    pd.testing.assert_frame_equal(make_df(raw_catalog), make_df_loop(raw_catalog))
+
+
+def test_make_df_representative_review(raw_catalog):
+    # 감성 임베딩 대표 리뷰가 없으면 의미 임베딩 대표 리뷰를 씀
+    raw = raw_catalog.drop(columns="representative_review_id_roberta_sentiment")
+    expected = raw.drop_duplicates("product_id")["representative_review_id_roberta_semantic"]
+    actual = make_df(raw)["representative_review_id_roberta"]
+    assert actual.tolist() == expected.tolist()
+
+
+@pytest.mark.bench
+def test_make_df_bench(bench_raw_catalog, timed):
+    expected, loop_seconds = timed(make_df_loop, bench_raw_catalog)
+    actual, seconds = timed(make_df, bench_raw_catalog)
+    pd.testing.assert_frame_equal(actual, expected)
+    print(
+        f"\n[make_df] 원본 {len(bench_raw_catalog):,}행 → {len(actual):,}개 상품: "
+        f"행 단위 {loop_seconds * 1000:.1f}ms / 현재 {seconds * 1000:.1f}ms"
+    )
@@ -0,0 +1,123 @@
+"""
+중복 상품 탐지: 심은 중복에 대한 쌍 단위 정밀도/재현율, 저장/로드, 그리드 접기
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.catalog_version import get_catalog_version
+from services.embedding_store import EmbeddingStore
+from services.near_duplicates import (
+    attach_dup_clusters,
+    collapse_duplicates,
+    find_near_duplicates,
+    load_dup_clusters,
+    normalize_name,
+    write_dup_clusters,
+)
+
+
+def with_duplicates(products: pd.DataFrame, dup_rate: float = 0.05, seed: int = 1):
+    """
+    일부 상품을 용량/수량 표기만 다른 이름 + 약간 흔든 벡터로 1~3개 복제
+
+    Returns:
+        (products, 정답 군집 배열 - 원본 행 번호)
+    """
+    n = len(products)
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(n, size=int(n * dup_rate), replace=False)
+    variants = [" 50ml", " 100ml x 2", " 1+1 기획", " 30매", " 대용량 500ml"]
+
+    copies = []
+    truth = list(range(n))
+    for src in sources:
+        for k in range(int(rng.integers(1, 4))):
+            row = products.iloc[src].copy()
+            row["product_id"] = f"{row['product_id']}_dup{k}"
+            row["product_name"] = row["product_name"] + variants[k % len(variants)]
+            for col in ("product_vector_roberta_semantic", "product_vector_roberta_sentiment"):
+                if row[col] is not None:
+                    vector = np.asarray(row[col], dtype=np.float32)
+                    noise = rng.standard_normal(len(vector)).astype(np.float32)
+                    row[col] = vector + noise * np.linalg.norm(vector) * 0.15 / np.sqrt(
+                        len(vector)
+                    )
+            copies.append(row)
+            truth.append(src)
+    products = pd.concat([products, pd.DataFrame(copies)], ignore_index=True)
+    return products, np.asarray(truth)
+
+
+def pair_count(labels: np.ndarray) -> int:
+    _, counts = np.unique(labels, return_counts=True)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+@pytest.fixture(scope="module")
+def planted(products):
+    duplicated, truth = with_duplicates(products)
+    store = EmbeddingStore.from_products(duplicated)
+    return duplicated, truth, store, find_near_duplicates(store, verbose=False)
+
+
+def test_normalize_name():
+    assert normalize_name("수분 크림 50ml x 2") == normalize_name("수분크림")
+    assert normalize_name(None) == ""
+
+
+def test_precision_recall(planted):
+    _, truth, store, clusters = planted
+    predicted = pd.factorize(
+        clusters.set_index("product_id")["dup_cluster"].reindex(
+            store.product_ids.astype(str)
+        )
+    )[0]
+    # 벡터가 없는 상품은 탐지 대상이 아니므로 정답에서도 제외
+    truth = np.where(store.has_vector, truth, -1 - np.arange(len(truth)))
+
+    both = predicted.astype(np.int64) * (truth.max() + len(truth) + 1) + truth
+    true_positive = pair_count(both)
+    assert pair_count(truth) > 0
+    assert true_positive / max(pair_count(predicted), 1) >= 0.95
+    assert true_positive / pair_count(truth) >= 0.9
+
+
+def test_write_load_and_collapse(planted, tmp_path):
+    duplicated, _, store, clusters = planted
+    path = str(tmp_path / "near_duplicates.parquet")
+    write_dup_clusters(clusters, get_catalog_version(), path)
+    loaded = load_dup_clusters(path)
+    pd.testing.assert_frame_equal(loaded, clusters.reset_index(drop=True))
+
+    df = attach_dup_clusters(duplicated.drop(columns=["top_keywords"]), loaded)
+    collapsed = collapse_duplicates(df)
+    assert collapsed["dup_cluster"].is_unique
+    assert len(collapsed) == df["dup_cluster"].nunique()
+    # 군집마다 dup_rank 0 (리뷰가 가장 많은) 상품이 남음
+    assert (collapsed.loc[collapsed["dup_size"] > 1, "dup_rank"] == 0).all()
+
+
+def test_collapse_by_position():
+    # 인덱스 라벨이 겹치는 행(concat 결과)도 군집마다 정확히 한 행만 남음
+    df = pd.DataFrame(
+        {
+            "dup_cluster": ["a", "a", "b", "c", "c"],
+            "dup_size": [2, 2, 1, 2, 2],
+            "dup_rank": [1, 0, 0, 1, 0],
+            "reco_score": [0.9, 0.1, 0.5, 0.2, 0.8],
+        },
+        index=[0, 1, 0, 1, 2],
+    )
+    assert collapse_duplicates(df)["dup_rank"].tolist() == [0, 0, 0]
+    assert collapse_duplicates(df)["dup_cluster"].tolist() == ["a", "b", "c"]
+    by_score = collapse_duplicates(df, best_by="reco_score")
+    assert by_score["reco_score"].tolist() == [0.9, 0.5, 0.8]
+
+
+def test_load_other_version(planted, tmp_path):
+    _, _, _, clusters = planted
+    path = str(tmp_path / "near_duplicates.parquet")
+    write_dup_clusters(clusters, "다른 버전", path)
+    assert load_dup_clusters(path) is None
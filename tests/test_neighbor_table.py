@@ -0,0 +1,58 @@
+"""
+사전 계산 이웃 테이블 조회 = 실시간 계산 검증
+"""
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from services.neighbor_table import (
+    NeighborTable,
+    compute_neighbor_table,
+    write_neighbor_table,
+)
+from services.recommend_similar_products import _select_from_store
+
+
+@pytest.fixture(scope="module")
+def store(products):
+    return EmbeddingStore.from_products(products)
+
+
+@pytest.mark.parametrize("categories", [None, ["카테고리1", "카테고리3"]])
+def test_lookup_matches_live(store, categories, tmp_path):
+    top_n = 5
+    path = str(tmp_path / "neighbors.parquet")
+    write_neighbor_table(compute_neighbor_table(store, top_k=20, block_size=64), path)
+    table = NeighborTable(pq.read_table(path))
+
+    for row in np.flatnonzero(store.has_vector)[:30]:
+        product_id = store.product_ids[row]
+        looked_up = table.lookup(product_id, categories=categories, top_n=top_n)
+        rows, scores, similarity = _select_from_store(
+            store, product_id, categories=categories, top_n=top_n
+        )
+        assert np.array_equal(looked_up.product_ids, store.product_ids[rows])
+        np.testing.assert_allclose(looked_up.recommend_score, scores, atol=1e-5)
+        np.testing.assert_allclose(looked_up.cosine_similarity, similarity, atol=1e-5)
+
+
+def test_lookup_beyond_top_k(store):
+    table = NeighborTable(compute_neighbor_table(store, top_k=5))
+    assert table.lookup(store.product_ids[0], top_n=6) is None
+    assert table.lookup("없는_상품", top_n=5) is None
+
+
+def test_is_fresh_checks_fingerprint(store, products):
+    table = NeighborTable(compute_neighbor_table(store, top_k=5))
+    assert table.is_fresh(store)
+
+    # 상품 목록은 같고 벡터만 바뀐 저장소의 테이블은 쓰지 않음
+    changed = products.copy()
+    changed["product_vector_roberta_semantic"] = [
+        None if v is None else np.asarray(v) * 2 + 1
+        for v in changed["product_vector_roberta_semantic"]
+    ]
+    other = EmbeddingStore.from_products(changed, version=store.version)
+    assert not table.is_fresh(other)
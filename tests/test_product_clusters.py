@@ -0,0 +1,98 @@
+"""
+임베딩 군집: 미니배치 k-means 품질, 저장/로드, 군집 조회 검증
+"""
+
+import numpy as np
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from utils.catalog_schema import compact_catalog
+from services.product_clusters import (
+    ClusterRows,
+    _init_centroids,
+    assign_clusters,
+    attach_product_clusters,
+    build_product_clusters,
+    cluster_products,
+    cluster_representatives,
+    load_product_clusters,
+    write_product_clusters,
+)
+
+
+def full_kmeans(store, centroids: np.ndarray, n_iter: int) -> np.ndarray:
+    """비교용 전체 배치(Lloyd) 구면 k-means - 반복마다 전체 행 배정"""
+    centroids = centroids.copy()
+    for _ in range(n_iter):
+        labels, _ = assign_clusters(store, centroids)
+        rows = np.flatnonzero(labels >= 0)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels[rows], store.vectors(rows))
+        moved = np.linalg.norm(sums, axis=1) > 0
+        centroids[moved] = sums[moved] / np.linalg.norm(sums[moved], axis=1)[:, None]
+    return centroids
+
+
+@pytest.fixture(scope="module")
+def clustered(products):
+    store = EmbeddingStore.from_products(products)
+    clusters = build_product_clusters(store, n_clusters=8, batch_size=64, verbose=False)
+    return store, clusters
+
+
+def test_quality_close_to_full_batch(clustered):
+    store, clusters = clustered
+    rows = np.flatnonzero(store.has_vector)
+    init = _init_centroids(store, rows, 8, np.random.default_rng(0), 20000)
+    _, full_similarity = assign_clusters(store, full_kmeans(store, init, 20))
+
+    minibatch = clusters.frame["cluster_similarity"].mean()
+    assert minibatch >= full_similarity[rows].mean() - 0.02
+
+
+def test_frame_layout(clustered):
+    store, clusters = clustered
+    frame = clusters.frame
+    assert len(frame) == int(store.has_vector.sum())
+    assert frame["product_id"].is_unique
+    assert (np.diff(frame["cluster_id"].to_numpy()) >= 0).all()
+    assert clusters.sizes.sum() == len(frame)
+    assert clusters.summary()["size"].is_monotonic_decreasing
+
+
+def test_write_load_and_lookup(clustered, products, tmp_path):
+    _, clusters = clustered
+    write_product_clusters(clusters, str(tmp_path))
+    loaded = load_product_clusters(str(tmp_path))
+    assert loaded is not None and loaded.labels == clusters.labels
+    assert np.array_equal(loaded.offsets, clusters.offsets)
+
+    df = attach_product_clusters(products, loaded)
+    biggest = int(clusters.summary()["cluster_id"].iloc[0])
+    picked = cluster_products(df, biggest)
+    assert picked["product_id"].tolist() == clusters.members(biggest).tolist()
+
+    heads = cluster_representatives(df, per_cluster=2)
+    assert (heads.groupby("cluster_id").size() <= 2).all()
+    # 벡터가 없는 상품은 군집 없음
+    missing = products["product_vector_roberta_semantic"].isna().to_numpy()
+    assert (df.loc[missing, "cluster_id"] == -1).all()
+
+
+def test_cluster_products_positions(clustered, products):
+    _, clusters = clustered
+    df = compact_catalog(attach_product_clusters(products, clusters))
+    assert isinstance(df.attrs["cluster_rows"], ClusterRows)
+    # attrs가 따라간 파생 DataFrame은 행 구성이 다르므로 컬럼 비교 경로와 같아야 함
+    shuffled = df.sample(frac=1.0, random_state=0)
+    subset = df.iloc[::2]
+    for cluster_id in range(-1, len(clusters)):
+        expected = df[df["cluster_id"] == cluster_id].sort_values("cluster_rank", kind="stable")
+        assert df.attrs["cluster_rows"].positions(df, cluster_id) is not None
+        assert cluster_products(df, cluster_id)["product_id"].tolist() == (
+            expected["product_id"].tolist()
+        )
+        # 군집 없음(-1)은 순위가 모두 0이라 순서 비교에서 제외
+        for frame in (shuffled, subset) if cluster_id >= 0 else ():
+            picked = cluster_products(frame, cluster_id)["product_id"].tolist()
+            assert picked == [p for p in expected["product_id"] if p in set(frame["product_id"])]
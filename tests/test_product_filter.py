@@ -0,0 +1,64 @@
+"""
+사이드바 사전 필터 인덱스 = 컬럼 비교 결과 검증
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.product_filter import FilterIndex, ProductFilter, norm_cat, split_category
+
+
+def reference_mask(products: pd.DataFrame, score: pd.Series, f: ProductFilter) -> np.ndarray:
+    sub_category = products["category_path"].map(norm_cat).map(lambda p: split_category(p)[2])
+    keep = pd.Series(True, index=products.index)
+    if f.sub_categories:
+        keep &= sub_category.isin(f.sub_categories)
+    if f.skin_types:
+        keep &= products["skin_type"].isin(f.skin_types)
+    if f.min_rating is not None:
+        keep &= score >= f.min_rating
+    if f.max_rating is not None:
+        keep &= score <= f.max_rating
+    if f.min_price is not None:
+        keep &= products["price"] >= f.min_price
+    if f.max_price is not None:
+        keep &= products["price"] <= f.max_price
+    return keep.to_numpy()
+
+
+FILTERS = [
+    ProductFilter(skin_types=["건성"]),
+    ProductFilter(sub_categories=["카테고리0", "카테고리2"], max_price=20000),
+    ProductFilter(min_rating=4.0, max_rating=4.6, min_price=5000),
+    ProductFilter(skin_types=["지성", "없는 값"], sub_categories=["카테고리1"], min_rating=3.5),
+    ProductFilter(sub_categories=["없는 카테고리"]),
+]
+
+
+@pytest.mark.parametrize("product_filter", FILTERS)
+def test_rows_and_mask_match_columns(products, product_filter):
+    index = FilterIndex(products)
+    score_of = np.full(len(products), np.nan)
+    score_of[index.score[1]] = index.score[0]
+    expected = reference_mask(products, pd.Series(score_of), product_filter)
+
+    mask = index.mask(product_filter)
+    rows = index.rows(product_filter)
+    assert np.array_equal(mask, expected)
+    assert np.array_equal(rows, np.flatnonzero(expected))
+
+
+def test_no_condition(products):
+    index = FilterIndex(products)
+    assert index.rows(None) is None and index.mask(None) is None
+    # 모든 행이 들어가는 범위는 조건 없음과 같음
+    assert index.rows(ProductFilter(min_price=0)) is None
+    assert index.mask(ProductFilter(min_price=0)) is None
+
+
+def test_filter_dict_roundtrip():
+    product_filter = ProductFilter(skin_types=["건성"], max_price=20000)
+    restored = ProductFilter.from_dict(product_filter.to_dict())
+    assert restored.key() == product_filter.key()
+    assert ProductFilter.from_dict(None) is None
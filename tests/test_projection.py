@@ -0,0 +1,39 @@
+"""
+PCA 축소 유사도 / 후보 재정렬 검증
+"""
+
+import numpy as np
+
+from services.embedding_store import EmbeddingStore
+from services.projection import PcaProjection, pca_report
+from services.recommend_similar_products import _select_from_store
+
+
+def test_full_rank_projection_is_exact(products):
+    store = EmbeddingStore.from_products(products)
+    projection = PcaProjection.fit(store.matrix, store.has_vector, store.dim)
+    rows = np.flatnonzero(store.has_vector)
+    target = store.vector(rows[0])
+    np.testing.assert_allclose(
+        projection.dot(target, rows), store.matrix[rows] @ target, atol=1e-4
+    )
+    assert projection.explained > 0.999
+
+
+def test_report_shortlist_recall(products):
+    store = EmbeddingStore.from_products(products)
+    report = pca_report(
+        store.matrix, store.has_vector, [8], n_queries=30, k=10, shortlist=100
+    )
+    assert report["pca8"]["rerank_recall"] >= 0.95
+
+
+def test_pca_mode_reranks_exactly(products):
+    store = EmbeddingStore.from_products(products)
+    store.fit_projection(8)
+    # 카테고리당 상품 수가 PCA_SHORTLIST보다 적으면 후보가 전체 → 정확 검색과 같음
+    for product_id in ("상품_0", "상품_10"):
+        exact = _select_from_store(store, product_id, top_n=5)
+        approx = _select_from_store(store, product_id, top_n=5, search_mode="pca")
+        assert np.array_equal(approx[0], exact[0])
+        np.testing.assert_allclose(approx[1], exact[1])
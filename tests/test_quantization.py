@@ -0,0 +1,48 @@
+"""
+float16 / int8 양자화 오차와 양자화 저장소 추천 결과 검증
+"""
+
+import numpy as np
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from services.quantization import QuantizedMatrix, quantization_report
+from services.recommend_similar_products import _select_from_store
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-3), ("int8", 3e-2)])
+def test_dot_error(products, dtype, tolerance):
+    store = EmbeddingStore.from_products(products)
+    quantized = QuantizedMatrix.from_matrix(store.matrix, dtype)
+    rows = np.flatnonzero(store.has_vector)
+    target = store.vector(rows[0])
+
+    np.testing.assert_allclose(
+        quantized.dot(target, rows, block_size=64),
+        store.matrix[rows] @ target,
+        atol=tolerance,
+    )
+
+
+def test_report_recall(products):
+    store = EmbeddingStore.from_products(products)
+    report = quantization_report(store.matrix, store.has_vector, n_queries=30, k=10)
+    assert report["float16"]["rerank_recall"] >= 0.99
+    assert report["int8"]["rerank_recall"] >= 0.9
+    assert report["int8"]["mb"] < report["float32"]["mb"] / 3
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8"])
+def test_quantized_store_recommendations(products, precision):
+    exact = EmbeddingStore.from_products(products)
+    quantized = EmbeddingStore.from_products(products, precision=precision)
+    assert quantized.matrix is None
+
+    hits = total = 0
+    for row in np.flatnonzero(exact.has_vector)[:30]:
+        product_id = exact.product_ids[row]
+        expected, _, _ = _select_from_store(exact, product_id, top_n=5)
+        actual, _, _ = _select_from_store(quantized, product_id, top_n=5)
+        hits += len(np.intersect1d(expected, actual))
+        total += len(expected)
+    assert hits / total >= 0.9
@@ -0,0 +1,109 @@
+"""
+추천 서비스: 동시 요청(마이크로 배치) 결과 = 단건 계산 결과 검증
+"""
+
+import threading
+import urllib.error
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services import embedding_store
+from services.catalog_version import get_catalog_version
+from services.embedding_store import EmbeddingStore
+from services.product_filter import ProductFilter
+from services.reco_client import RecoClient
+from services.reco_server import MicroBatcher, RecoService, create_server
+from services.recommend_similar_products import _reco_cache, _select_from_store
+from services.similarity_engine import ScoredProducts
+
+
+@pytest.fixture
+def registered_store(products, monkeypatch, tmp_path):
+    """가상 상품 저장소를 현재 카탈로그 버전으로 등록"""
+    monkeypatch.setenv("CATALOG_VERSION", "test-reco-server")
+    monkeypatch.chdir(tmp_path)  # 디스크의 이웃 테이블/인덱스를 읽지 않도록
+    store = EmbeddingStore.from_products(products)
+    monkeypatch.setitem(
+        embedding_store._stores, (store.vector_type, get_catalog_version()), store
+    )
+    _reco_cache.clear()
+    yield store
+    _reco_cache.clear()
+
+
+def start_server(service=None):
+    server = create_server("127.0.0.1", 0, service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, RecoClient(f"http://127.0.0.1:{server.server_address[1]}")
+
+
+@pytest.fixture
+def service(registered_store):
+    """임시 포트에 서비스 실행"""
+    server, client = start_server()
+    yield registered_store, client
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "categories, product_filter",
+    [
+        (None, None),
+        (["카테고리0", "카테고리3"], None),
+        (None, ProductFilter(skin_types=["건성"], max_price=20000)),
+    ],
+)
+def test_concurrent_requests_match_single(service, categories, product_filter):
+    store, client = service
+    product_ids = store.product_ids[store.has_vector][:32].tolist()
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        served = list(
+            executor.map(
+                lambda pid: client.similar(
+                    pid,
+                    categories=categories,
+                    top_n=5,
+                    product_filter=product_filter,
+                    search_mode="exact",
+                ),
+                product_ids,
+            )
+        )
+
+    for pid, results in zip(product_ids, served):
+        rows, scores, _ = _select_from_store(
+            store, pid, categories=categories, top_n=5, product_filter=product_filter
+        )
+        assert results.product_ids.tolist() == store.product_ids[rows].tolist(), pid
+        np.testing.assert_allclose(results.recommend_score, scores, atol=1e-6)
+
+    stats = client.stats()
+    assert stats["batches"] >= 1 and stats["similar"] == len(product_ids)
+
+
+def test_search(service):
+    _, client = service
+    ranked = client.search(top_n=5, product_filter=ProductFilter(skin_types=["건성"]))
+    assert isinstance(ranked, ScoredProducts) and ranked.size > 0
+
+
+class StuckBatcher(MicroBatcher):
+    """결과를 돌려주지 않는 배치 (계산이 밀린 상황)"""
+
+    def submit(self, key, product_filter):
+        return Future()
+
+
+def test_batch_timeout_is_503(registered_store):
+    server, client = start_server(RecoService(StuckBatcher(), timeout=0.05))
+    try:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            client.similar(registered_store.product_ids[0], search_mode="exact")
+        assert excinfo.value.code == 503
+    finally:
+        server.shutdown()
+        server.server_close()
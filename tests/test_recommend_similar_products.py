@@ -0,0 +1,188 @@
+"""
+행렬 엔진 추천 점수가 기존 상품별 루프 계산과 같은지 확인
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.embedding_store import DEFAULT_BLEND_WEIGHTS, VECTOR_TYPES, EmbeddingStore
+from services.neighbor_table import NeighborTable, compute_neighbor_table
+from services.product_filter import ProductFilter
+from services.recommend_similar_products import (
+    _batch_from_store,
+    _recommend_from_store,
+    _select_from_store,
+    cosine_similarity,
+)
+
+
+def score_products_loop(
+    all_products: pd.DataFrame,
+    product_id: Optional[str],
+    vector_type: str = "roberta_semantic",
+) -> Dict[str, float]:
+    """기존 상품별 루프 방식 점수 (product_id -> recommend_score, 자기 자신 제외)"""
+    vector_col = f"product_vector_{vector_type}"
+    target_vector = None
+    if product_id is not None:
+        target_vector = all_products.loc[
+            all_products["product_id"] == product_id, vector_col
+        ].iloc[0]
+
+    scores = {}
+    for _, product in all_products.iterrows():
+        if product_id is not None and product["product_id"] == product_id:
+            continue
+
+        sentiment = product.get("sentiment_score")
+        if sentiment is None or pd.isna(sentiment):
+            sentiment = 0.5
+        avg_rating = product.get("avg_rating_with_text", 0)
+        if avg_rating is None or pd.isna(avg_rating):
+            avg_rating = 0
+        normalized_rating = avg_rating / 5.0
+
+        if product_id is not None:
+            product_vector = product[vector_col]
+            if product_vector is None or len(product_vector) == 0:
+                continue
+            similarity = cosine_similarity(target_vector, product_vector)
+            score = similarity * 0.5 + sentiment * 0.3 + normalized_rating * 0.2
+        else:
+            score = sentiment * 0.6 + normalized_rating * 0.4
+        scores[product["product_id"]] = float(score)
+    return scores
+
+
+@pytest.mark.parametrize("product_id", ["상품_0", None])
+def test_engine_matches_loop(products, product_id):
+    expected = score_products_loop(products, product_id)
+    results = _recommend_from_store(
+        EmbeddingStore.from_products(products),
+        product_id=product_id,
+        top_n=len(products),
+    )
+    actual = {
+        item["product_id"]: item["recommend_score"]
+        for items in results.values()
+        for item in items
+    }
+    assert set(actual) == set(expected)
+    assert max(abs(actual[pid] - expected[pid]) for pid in expected) <= 1e-5
+
+
+@pytest.mark.parametrize(
+    "weights", [None, {"roberta_semantic": 0.8, "roberta_sentiment": 0.2}]
+)
+def test_blend_matches_weighted_cosine(products, weights):
+    stores = [EmbeddingStore.from_products(products, t) for t in VECTOR_TYPES]
+    blend = EmbeddingStore.stack(stores)
+    weights_used = weights or DEFAULT_BLEND_WEIGHTS
+
+    target_row = blend.row_of("상품_0")
+    rows = np.flatnonzero(blend.has_vector)
+    actual = blend.vectors(rows) @ blend.query_vector(target_row, weights)
+
+    total = sum(weights_used.get(t, 0.0) for t in VECTOR_TYPES)
+    expected = sum(
+        weights_used.get(store.vector_type, 0.0)
+        / total
+        * (store.vectors(rows) @ store.vector(target_row))
+        for store in stores
+    )
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "product_filter",
+    [
+        ProductFilter(skin_types=["건성"], max_price=20000),
+        ProductFilter(
+            sub_categories=["카테고리0", "카테고리1"], min_rating=4.0, max_rating=4.5
+        ),
+    ],
+)
+def test_prefilter_matches_filtered_catalog(products, product_filter):
+    """사전 필터 검색 = 조건에 맞는 상품만 남긴 카탈로그에서의 검색 (테이블 조회 포함)"""
+    product_id, top_n = "상품_0", 10
+    store = EmbeddingStore.from_products(products)
+    score = store.filter_index.score
+    score_of = np.full(len(store), np.nan)
+    score_of[score[1]] = score[0]
+
+    catalog = store.products
+    keep = pd.Series(True, index=catalog.index)
+    if product_filter.sub_categories:
+        keep &= catalog["category"].isin(product_filter.sub_categories)
+    if product_filter.skin_types:
+        keep &= catalog["skin_type"].isin(product_filter.skin_types)
+    if product_filter.min_rating is not None:
+        keep &= score_of >= product_filter.min_rating
+    if product_filter.max_rating is not None:
+        keep &= score_of <= product_filter.max_rating
+    if product_filter.max_price is not None:
+        keep &= catalog["price"] <= product_filter.max_price
+    # 기준 상품은 조건과 관계없이 남겨 둠 (자기 자신은 결과에서 제외됨)
+    keep |= catalog["product_id"] == product_id
+    reference = EmbeddingStore.from_products(products[keep.to_numpy()])
+
+    rows, scores, _ = _select_from_store(
+        store, product_id, top_n=top_n, product_filter=product_filter
+    )
+    ref_rows, ref_scores, _ = _select_from_store(reference, product_id, top_n=top_n)
+
+    # 카테고리 코드는 저장소마다 다르므로 카테고리명 순으로 맞춰 비교
+    def by_category(target, selected_rows, selected_scores):
+        names = target.products["category"].to_numpy(dtype=str)[selected_rows]
+        order = np.argsort(names, kind="stable")
+        return target.product_ids[selected_rows][order], selected_scores[order]
+
+    ids, scores = by_category(store, rows, scores)
+    ref_ids, ref_scores = by_category(reference, ref_rows, ref_scores)
+    assert np.array_equal(ids, ref_ids)
+    np.testing.assert_allclose(scores, ref_scores)
+
+    # 테이블 조회: 통과한 이웃으로 top_n을 채우면 실시간 결과와 같아야 함
+    table = NeighborTable(compute_neighbor_table(store, top_k=top_n * 4))
+    admitted = store.admitted_mask(product_filter)
+    looked_up = table.lookup(
+        product_id, top_n=top_n, admit=lambda ids: admitted[store.rows_of_ids(ids)]
+    )
+    if looked_up is not None:
+        assert np.array_equal(looked_up.product_ids, store.product_ids[rows])
+
+
+@pytest.mark.parametrize(
+    "categories, product_filter",
+    [(None, None), (["카테고리1"], ProductFilter(skin_types=["건성", "지성"]))],
+)
+def test_batch_matches_single(products, categories, product_filter):
+    store = EmbeddingStore.from_products(products)
+    # 벡터 없는 상품 / 없는 상품 / 중복 요청 포함
+    product_ids = ["상품_3", "없는_상품"] + [f"상품_{i}" for i in range(20)] + ["상품_5"]
+
+    batch = list(
+        _batch_from_store(
+            store,
+            product_ids,
+            categories=categories,
+            top_n=5,
+            block_size=7,
+            product_filter=product_filter,
+        )
+    )
+    assert [pid for pid, _ in batch] == product_ids
+    for pid, results in batch:
+        selected = _select_from_store(
+            store, pid, categories=categories, top_n=5, product_filter=product_filter
+        )
+        if selected is None:
+            assert results.size == 0
+            continue
+        rows, scores, similarity = selected
+        assert results.product_ids.tolist() == store.product_ids[rows].tolist()
+        np.testing.assert_allclose(results.recommend_score, scores, atol=1e-6)
+        np.testing.assert_allclose(results.cosine_similarity, similarity, atol=1e-6)
@@ -0,0 +1,128 @@
+"""
+카테고리 샤드 병렬 계산 = 단일 프로세스 계산 검증
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import services.recommend_similar_products as reco
+from services.embedding_store import VECTOR_TYPES, EmbeddingStore
+from services.product_filter import ProductFilter
+from services.recommend_similar_products import (
+    _select_from_store,
+    recommend_similar_arrays,
+)
+from services.sharded_scoring import (
+    ShardedScorer,
+    get_sharded_scorer,
+    load_shard_catalog,
+    write_category_shards,
+)
+
+VERSION = "test-catalog@shards"
+
+
+def _open_scorer(store, shard_dir):
+    assert write_category_shards(store, shard_dir) == len(store.category_names)
+    return ShardedScorer(
+        os.path.join(shard_dir, store.vector_type),
+        load_shard_catalog(shard_dir, store.vector_type, VERSION),
+        workers=2,
+    )
+
+
+@pytest.fixture(scope="module")
+def sharded(products, tmp_path_factory):
+    store = EmbeddingStore.from_products(products, version=VERSION)
+    shard_dir = str(tmp_path_factory.mktemp("shards"))
+    scorer = _open_scorer(store, shard_dir)
+    yield store, shard_dir, scorer
+    scorer.shutdown()
+
+
+def _assert_same(actual, expected, label):
+    rows, scores, similarity = actual
+    assert np.array_equal(rows, expected[0]), label
+    np.testing.assert_allclose(scores, expected[1], atol=1e-6)
+    np.testing.assert_allclose(similarity, expected[2], atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "categories, product_filter",
+    [
+        (None, None),
+        (["카테고리2"], None),
+        (None, ProductFilter(skin_types=["건성", "민감성"], max_price=30000)),
+    ],
+)
+def test_matches_single_process(sharded, categories, product_filter):
+    store, _, scorer = sharded
+    for product_id in store.product_ids[store.has_vector][:10]:
+        actual = scorer.select(
+            product_id, categories=categories, top_n=8, product_filter=product_filter
+        )
+        expected = _select_from_store(
+            store,
+            product_id,
+            categories=categories,
+            top_n=8,
+            product_filter=product_filter,
+        )
+        _assert_same(actual, expected, product_id)
+
+
+def test_catalog_has_no_vectors(sharded):
+    store, _, scorer = sharded
+    catalog = scorer.catalog
+    assert catalog.matrix is None and catalog.quantized is None
+    assert np.array_equal(catalog.product_ids, store.product_ids)
+    assert catalog.fingerprint == store.fingerprint
+    assert scorer.select("없는_상품") is None
+
+
+def test_blend_matches_single_process(products, tmp_path):
+    stores = [
+        EmbeddingStore.from_products(products, t, version=VERSION) for t in VECTOR_TYPES
+    ]
+    blend = EmbeddingStore.stack(stores)
+    scorer = _open_scorer(blend, str(tmp_path))
+    try:
+        weights = {"roberta_semantic": 0.8, "roberta_sentiment": 0.2}
+        for product_id in blend.product_ids[blend.has_vector][:5]:
+            actual = scorer.select(product_id, top_n=5, blend_weights=weights)
+            expected = _select_from_store(
+                blend, product_id, top_n=5, blend_weights=weights
+            )
+            _assert_same(actual, expected, product_id)
+    finally:
+        scorer.shutdown()
+
+
+def test_arrays_skip_embedding_store(sharded, monkeypatch):
+    store, _, scorer = sharded
+
+    def fail(**kwargs):
+        raise AssertionError("샤드 경로에서 임베딩 저장소를 열었습니다.")
+
+    monkeypatch.setattr(reco, "get_sharded_scorer", lambda vector_type: scorer)
+    monkeypatch.setattr(reco, "get_embedding_store", fail)
+
+    product_id = store.product_ids[store.has_vector][0]
+    result = recommend_similar_arrays(product_id, top_n=8)
+    rows = _select_from_store(store, product_id, top_n=8)[0]
+    assert np.array_equal(result.product_ids, store.product_ids[rows])
+
+
+def test_scorer_requires_matching_shards(sharded):
+    store, shard_dir, _ = sharded
+    assert get_sharded_scorer(store.vector_type, VERSION, shard_dir, workers=0) is None
+    assert get_sharded_scorer(store.vector_type, "other@1", shard_dir, workers=1) is None
+    assert (
+        get_sharded_scorer(
+            store.vector_type, "test-catalog@unverified-0", shard_dir, workers=1
+        )
+        is None
+    )
+    assert load_shard_catalog(shard_dir, "roberta_sentiment") is None
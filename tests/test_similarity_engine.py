@@ -0,0 +1,74 @@
+"""
+카테고리별 상위 k 선택 = 전체 정렬 결과 검증 (동점 포함)
+"""
+
+import numpy as np
+import pytest
+
+from services.similarity_engine import (
+    ScoredProducts,
+    select_top_k,
+    top_k_per_category,
+    top_k_per_category_batch,
+)
+
+
+def sorted_top_k(scores, rows, codes, k):
+    """기준: (카테고리, 점수 내림차순, 행 번호) 전체 정렬 후 카테고리별 앞에서 k개"""
+    order = np.lexsort((rows, -scores, codes))
+    picked = []
+    for code in np.unique(codes):
+        group = order[codes[order] == code]
+        group = group[np.isfinite(scores[group])]
+        picked.append(group[:k])
+    return np.concatenate(picked)
+
+
+@pytest.fixture
+def candidates():
+    rng = np.random.default_rng(0)
+    n = 500
+    # 동점이 많도록 점수를 반올림
+    scores = np.round(rng.uniform(0, 1, n), 2)
+    rows = rng.permutation(n)
+    codes = np.sort(rng.integers(0, 5, n))
+    return scores, rows, codes
+
+
+@pytest.mark.parametrize("k", [1, 7, 40, 1000])
+def test_select_top_k(candidates, k):
+    scores, rows, _ = candidates
+    expected = np.lexsort((rows, -scores))[:k]
+    assert np.array_equal(select_top_k(scores, rows, k), expected)
+
+
+@pytest.mark.parametrize("k", [1, 7, 40, 1000])
+def test_top_k_per_category(candidates, k):
+    scores, rows, codes = candidates
+    expected = sorted_top_k(scores, rows, codes, k)
+    assert np.array_equal(top_k_per_category(scores, rows, codes, k), expected)
+
+
+@pytest.mark.parametrize("k", [1, 7, 40])
+def test_batch_matches_single(candidates, k):
+    scores, rows, codes = candidates
+    rng = np.random.default_rng(1)
+    batch = np.stack([scores, rng.permutation(scores), np.round(scores, 1)])
+    # 제외 대상(-inf)
+    batch[0, :3] = -np.inf
+
+    for query, picked in zip(batch, top_k_per_category_batch(batch, rows, codes, k)):
+        assert np.array_equal(picked, sorted_top_k(query, rows, codes, k))
+
+
+def test_scored_products_roundtrip():
+    results = ScoredProducts(
+        np.array(["a", "b"], dtype=object),
+        np.array(["스킨", "로션"], dtype=object),
+        np.array([0.9, 0.8]),
+        np.array([0.7, 0.6]),
+    )
+    restored = ScoredProducts.from_dict(results.to_dict())
+    assert restored.product_ids.tolist() == ["a", "b"]
+    np.testing.assert_allclose(restored.recommend_score, results.recommend_score)
+    assert ScoredProducts.empty().size == 0
@@ -0,0 +1,58 @@
+"""
+SingleFlight / TTLCache 동작 검증
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.singleflight import SingleFlight, TTLCache
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute(value):
+        calls.append(value)
+        started.set()
+        time.sleep(0.1)
+        return value * 2
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(flight.do, "key", compute, 21)
+        started.wait()
+        followers = [executor.submit(flight.do, "key", compute, 21) for _ in range(7)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == [42] * 8
+    assert calls == [21]
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("실패")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    # 실패한 호출은 남지 않으므로 다음 호출은 새로 계산
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_ttl_cache_expiry_and_lru():
+    cache = TTLCache(max_entries=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # 가장 오래 사용하지 않은 "b"가 제거됨
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
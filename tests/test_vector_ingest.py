@@ -0,0 +1,65 @@
+"""
+벡터 컬럼 일괄 변환 (문자열 / Arrow list / fixed_size_list) 검증
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from services.vector_ingest import (
+    column_to_matrix,
+    ingest_benchmark,
+    parse_vector_strings,
+    split_vector_columns,
+)
+
+
+def test_parse_vector_strings():
+    values = ["[0.5, -1.25, 2]", None, "[]", "null", " [1e-3,0,3.5] "]
+    matrix, has_vector = parse_vector_strings(values)
+    assert has_vector.tolist() == [True, False, False, False, True]
+    np.testing.assert_array_equal(
+        matrix,
+        np.array(
+            [[0.5, -1.25, 2], [0, 0, 0], [0, 0, 0], [0, 0, 0], [1e-3, 0, 3.5]],
+            dtype=np.float32,
+        ),
+    )
+
+
+def test_parse_vector_strings_rejects_bad_rows():
+    with pytest.raises(ValueError):
+        parse_vector_strings(["[1, 2]", "[1, 2, 3]"])
+    with pytest.raises(ValueError):
+        parse_vector_strings(["[1, x]"])
+
+
+def test_all_formats_match_json_loads():
+    report = ingest_benchmark(n=300, dim=8)
+    assert set(report) == {"json_loads", "bulk_string", "arrow_list", "arrow_fixed"}
+    for row in report.values():
+        assert row["max_abs_err"] == 0
+
+
+def test_column_to_matrix_formats():
+    rng = np.random.default_rng(0)
+    expected = rng.standard_normal((5, 4)).astype(np.float32)
+    lists = [row.tolist() for row in expected]
+    strings = [json.dumps(row) for row in lists]
+    arrow = pa.array(lists, type=pa.list_(pa.float32()))
+
+    for values in (lists, strings, arrow, pd.Series(strings)):
+        matrix, has_vector = column_to_matrix(values)
+        assert has_vector.all()
+        np.testing.assert_array_equal(matrix, expected)
+
+
+def test_split_vector_columns(products):
+    meta, vectors = split_vector_columns(products, ["roberta_semantic"])
+    assert not any(c.startswith("product_vector_") for c in meta.columns)
+    matrix, has_vector = vectors["roberta_semantic"]
+    assert matrix.shape == (len(products), 16)
+    assert has_vector.tolist() == products["product_vector_roberta_semantic"].notna().tolist()
@@ -0,0 +1,56 @@
+"""
+가중치 재생 결과 = 단건 추천 결과 검증, 지표 표 형태 확인
+"""
+
+import numpy as np
+import pytest
+
+from services.embedding_store import EmbeddingStore
+from services.recommend_similar_products import _select_from_store
+from services.similarity_engine import SIMILAR_WEIGHTS
+from services.weight_replay import (
+    parse_weights,
+    replay_ranking,
+    replay_similar,
+    replay_weight_configs,
+)
+
+
+@pytest.fixture(scope="module")
+def store(products):
+    return EmbeddingStore.from_products(products)
+
+
+def test_parse_weights():
+    assert parse_weights("0.7,0.2,0.1", 3) == (0.7, 0.2, 0.1)
+    with pytest.raises(ValueError):
+        parse_weights("0.5,0.5", 3)
+
+
+def test_similar_replay_matches_single(store):
+    top_n = 5
+    rows = np.flatnonzero(store.has_vector)[:40]
+    _, picks, _, _ = replay_similar(store, {"현재": SIMILAR_WEIGHTS}, top_n, rows, block_size=16)
+
+    for i, row in enumerate(rows):
+        pid = store.product_ids[row]
+        category = store.category_names[store.category_codes[row]]
+        selected, _, _ = _select_from_store(store, pid, [category], top_n)
+        expected = np.full(top_n, -1, dtype=np.int64)
+        expected[: len(selected)] = selected
+        assert np.array_equal(picks["현재"][i], expected), pid
+
+
+def test_ranking_replay_matches_single(store):
+    picks, _ = replay_ranking(store, {"현재": (0.6, 0.4)}, top_n=5)
+    selected, _, _ = _select_from_store(store, None, top_n=5)
+    assert np.array_equal(picks["현재"][picks["현재"] >= 0], selected)
+
+
+def test_report(store):
+    reports = replay_weight_configs(store, top_n=5, n_sources=50, verbose=False)
+    similar = reports["similar"]
+    assert similar["config"].iloc[0] == "현재"
+    assert similar["overlap@k"].iloc[0] == 1.0 and similar["top1"].iloc[0] == 1.0
+    assert similar["coverage"].between(0, 1).all()
+    assert reports["ranking"]["overlap@k"].iloc[0] == 1.0
@@ -0,0 +1,159 @@
+"""
+화면용 카탈로그 메모리 압축 (스키마 기반)
+
+모든 세션이 같은 카탈로그 DataFrame을 공유하므로(prepare_dataframe) 컬럼 타입을 좁혀 메모리를 줄인다.
+- 값 종류가 적은 문자열 → category (코드 + 고유값)
+- 정수 → 값 범위에 맞는 가장 작은 정수 타입
+- 나머지 문자열 → Arrow 문자열 (결측은 NaN 그대로)
+- 임베딩 벡터 컬럼 → 화면에서 쓰지 않으므로 제거 (추천 계산은 임베딩 저장소 사용)
+
+평점/점수 같은 실수 컬럼은 필터 경계값 비교가 달라지지 않도록 float64 그대로 둔다.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# 컬럼 → 압축 방식
+CATALOG_SCHEMA = {
+    "brand": "category",
+    "category": "category",
+    "main_category": "category",
+    "middle_category": "category",
+    "sub_category": "category",
+    "skin_type": "category",
+    "image_url": "category",
+    "category_path": "category",
+    "category_path_norm": "category",
+    "price": "integer",
+    "total_reviews": "integer",
+    "rating_1": "integer",
+    "rating_2": "integer",
+    "rating_3": "integer",
+    "rating_4": "integer",
+    "rating_5": "integer",
+    "dup_rank": "integer",
+    "dup_size": "integer",
+    "cluster_id": "integer",
+    "cluster_rank": "integer",
+    "product_id": "string",
+    "product_name": "string",
+    "product_url": "string",
+    "top_keywords": "string",
+    "top_keywords_str": "string",
+    "badge": "string",
+    "dup_cluster": "string",
+    "representative_review_id_roberta": "string",
+}
+# 화면용 카탈로그에서 제거할 컬럼 접두어
+DROP_PREFIXES = ("product_vector_",)
+
+
+def _string_dtype():
+    """결측을 NaN으로 다루는 Arrow 문자열 타입 (pandas 버전별)"""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:
+        return "string[pyarrow_numpy]"
+
+
+def _is_text(series: pd.Series) -> bool:
+    """문자열 컬럼인지 (배열 값이 든 object 컬럼은 문자열로 바꾸면 repr이 되므로 제외)"""
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    return series.dtype == object and not series.map(type).isin([list, np.ndarray]).any()
+
+
+def compact_catalog(df: pd.DataFrame, schema: Optional[dict] = None) -> pd.DataFrame:
+    """
+    스키마대로 컬럼 타입 압축 (새 DataFrame 반환)
+
+    스키마에 있어도 타입이 맞지 않는 컬럼(예: 숫자로 들어온 리뷰 ID, 결측이 있는 정수,
+    make_df를 거치지 않아 리스트로 남은 top_keywords)은 그대로 둔다.
+    """
+    schema = schema or CATALOG_SCHEMA
+    dropped = [c for c in df.columns if str(c).startswith(DROP_PREFIXES)]
+    df = df.drop(columns=dropped)
+
+    string_dtype = _string_dtype()
+    converted = {}
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if kind == "category" and _is_text(series):
+            converted[col] = series.astype("category")
+        elif kind == "integer" and pd.api.types.is_integer_dtype(series.dtype):
+            converted[col] = pd.to_numeric(series, downcast="integer")
+        elif kind == "string" and _is_text(series):
+            converted[col] = series.astype(string_dtype)
+    return df.assign(**converted)
+
+
+def _memory_usage(df: pd.DataFrame) -> pd.Series:
+    """
+    컬럼별 메모리 (bytes, deep=True)
+
+    object 컬럼에 든 배열(임베딩 벡터)은 pandas가 배열 머리만 세므로 배열 데이터 크기를 더한다.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    for col in df.columns[df.dtypes == object]:
+        arrays = df[col].map(lambda x: x.nbytes if isinstance(x, np.ndarray) else 0)
+        usage[col] += int(arrays.sum())
+    return usage
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    컬럼별 메모리 사용량 비교 (bytes, deep=True)
+
+    Returns:
+        column, dtype_before, dtype_after, bytes_before, bytes_after 컬럼 (큰 순)
+        제거된 컬럼은 bytes_after = 0
+    """
+    bytes_before = _memory_usage(before)
+    bytes_after = _memory_usage(after)
+    report = pd.DataFrame(
+        {
+            "column": bytes_before.index,
+            "dtype_before": [str(before[c].dtype) for c in bytes_before.index],
+            "dtype_after": [
+                str(after[c].dtype) if c in after.columns else "(제거)"
+                for c in bytes_before.index
+            ],
+            "bytes_before": bytes_before.to_numpy(),
+            "bytes_after": bytes_after.reindex(bytes_before.index).fillna(0).to_numpy(
+                dtype=np.int64
+            ),
+        }
+    )
+    return report.sort_values("bytes_before", ascending=False, kind="stable").reset_index(
+        drop=True
+    )
+
+
+def print_memory_report(report: pd.DataFrame, top: Optional[int] = None):
+    before = report["bytes_before"].sum()
+    after = report["bytes_after"].sum()
+    print(
+        f"✓ 카탈로그 메모리: {before / 2**20:.1f}MB → {after / 2**20:.1f}MB "
+        f"({after / max(before, 1):.0%})"
+    )
+    rows = report if top is None else report.head(top)
+    for row in rows.itertuples(index=False):
+        print(
+            f"  {row.column:<36} {row.dtype_before:>10} → {row.dtype_after:<12} "
+            f"{row.bytes_before / 2**20:>8.2f}MB → {row.bytes_after / 2**20:>8.2f}MB"
+        )
+
+
+def isin_codes(series: pd.Series, values) -> np.ndarray:
+    """
+    series.isin(values)와 같은 bool 배열 - category 컬럼은 고유값에서 코드를 찾아 정수 코드끼리 비교
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.categories.get_indexer(list(values))
+        codes = codes[codes >= 0]
+        return np.isin(series.cat.codes.to_numpy(), codes)
+    return series.isin(values).to_numpy()
@@ -2,48 +2,57 @@
 데이터 로딩 및 컬럼 정규화 유틸리티
 """
 
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Optional, Tuple
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
 
-from utils.load_data import make_df
+from utils.catalog_schema import compact_catalog, isin_codes
+from utils.load_data import (
+    join_lists,
+    list_mask,
+    make_df,
+    representative_review_ids,
+)
 from services.athena_queries import fetch_all_products, fetch_reviews_by_product
-
-# 메인 카테고리 목록
-MAIN_CATS = [
-    "스킨케어",
-    "클렌징/필링",
-    "선케어/태닝",
-    "메이크업",
-]
+from services.embedding_store import register_catalog_products, refresh_embedding_store
+from services.near_duplicates import (
+    DEFAULT_DUP_PATH,
+    attach_dup_clusters,
+    collapse_duplicates,
+)
+from services.product_clusters import DEFAULT_CLUSTER_DIR, attach_product_clusters
+from services.product_filter import (
+    FilterIndex,
+    ProductFilter,
+    normalize_category_paths,
+    split_category_paths,
+)
+from services.product_sort import (
+    DEFAULT_SORT,
+    POPULAR,
+    SORT_KEYS,
+    SortIndex,
+    badge_rank,
+    popular_columns,
+    sort_keys,
+)
+
+logger = logging.getLogger(__name__)
+
+# 카탈로그 버전 → (화면용 카탈로그 약한 참조, 필터 인덱스, 정렬 순서)
+_catalog_indexes: dict = {}
+_catalog_lock = threading.Lock()
 
 DEFAULT_IMAGE_URL = "https://tr.rbxcdn.com/180DAY-981c49e917ba903009633ed32b3d0ef7/420/420/Hat/Webp/noFilter"
 
 
-def norm_cat(path: str) -> str:
-    """카테고리 경로 정규화"""
-    if not isinstance(path, str):
-        return ""
-    parts = [p.strip() for p in path.split(">")]
-    for main in MAIN_CATS:
-        if main in parts:
-            idx = parts.index(main)
-            return " > ".join(parts[idx:])
-    return ""
-
-
-def split_category(path: str) -> tuple:
-    """카테고리 경로를 main/middle/sub로 분리"""
-    if not isinstance(path, str):
-        return "", "", ""
-    parts = [p.strip() for p in path.split(">")]
-    main = parts[0] if len(parts) >= 1 else ""
-    middle = parts[1] if len(parts) >= 2 else ""
-    sub = parts[-1] if len(parts) >= 3 else (parts[-1] if parts else "")
-    return main, middle, sub
-
-
 @st.cache_data(ttl=300, show_spinner=False)
 def load_products_from_athena() -> pd.DataFrame:
     """Athena에서 전체 상품 데이터 로드"""
@@ -63,9 +72,9 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # 카테고리 정규화
     if "category_path_norm" not in df.columns:
         if "category_path" in df.columns:
-            df["category_path_norm"] = df["category_path"].apply(norm_cat)
+            df["category_path_norm"] = normalize_category_paths(df["category_path"])
         elif "path" in df.columns:
-            df["category_path_norm"] = df["path"].apply(norm_cat)
+            df["category_path_norm"] = normalize_category_paths(df["path"])
         elif "category" in df.columns:
             df["category_path_norm"] = (
                 df["category"].astype(str).str.replace("_", "/", regex=False)
@@ -76,7 +85,7 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # main/middle/sub 카테고리 분리
     if "main_category" not in df.columns:
         df[["main_category", "middle_category", "sub_category"]] = (
-            df["category_path_norm"].apply(split_category).apply(pd.Series)
+            split_category_paths(df["category_path_norm"])
         )
 
     if "sub_category" not in df.columns:
@@ -106,16 +115,7 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
     # 대표 리뷰 ID
     if "representative_review_id_roberta" not in df.columns:
-        if "representative_review_id_roberta_sentiment" in df.columns:
-            df["representative_review_id_roberta"] = df[
-                "representative_review_id_roberta_sentiment"
-            ]
-        elif "representative_review_id_roberta_semantic" in df.columns:
-            df["representative_review_id_roberta"] = df[
-                "representative_review_id_roberta_semantic"
-            ]
-        else:
-            df["representative_review_id_roberta"] = np.nan
+        df["representative_review_id_roberta"] = representative_review_ids(df)
 
     # 제품 URL
     if "product_url" not in df.columns:
@@ -124,30 +124,138 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # 키워드 문자열
     if "top_keywords_str" not in df.columns:
         if "top_keywords" in df.columns:
-            df["top_keywords_str"] = df["top_keywords"].apply(
-                lambda x: (
-                    ", ".join(map(str, x))
-                    if isinstance(x, (list, np.ndarray))
-                    else re.sub(r"[\[\]']", "", str(x))
-                )
-            )
+            keywords = df["top_keywords"]
+            lists = list_mask(keywords)
+            # str(x)와 같게 결측도 "None"/"nan" 문자열로 (astype(str)은 결측을 유지함)
+            keywords_str = keywords.map(str).str.replace(r"[\[\]']", "", regex=True)
+            if lists.any():
+                keywords_str[lists] = join_lists(keywords[lists])
+            df["top_keywords_str"] = keywords_str
         else:
             df["top_keywords_str"] = ""
 
     return df
 
 
-def prepare_dataframe() -> pd.DataFrame:
-    """메인 DataFrame 준비"""
+def _artifact_stamp() -> tuple:
+    """화면용 카탈로그에 붙이는 오프라인 결과 파일(중복 군집/임베딩 군집)의 수정 시각"""
+    stamps = []
+    for path in (DEFAULT_DUP_PATH, os.path.join(DEFAULT_CLUSTER_DIR, "product_clusters.parquet")):
+        try:
+            stamps.append(os.path.getmtime(path))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2, ttl=300)
+def _prepared_catalog(artifact_stamp: tuple) -> pd.DataFrame:
+    """
+    화면용 카탈로그 생성 (오프라인 결과 파일 시각당 1회, 모든 세션 공유)
+
+    Athena 원본 캐시(load_products_from_athena)와 같이 5분마다 다시 만들고,
+    읽은 원본의 데이터 지문으로 카탈로그 버전을 정한다 (데이터가 바뀐 경우에만 버전이 바뀜).
+    반환된 DataFrame은 세션끼리 같은 객체이므로 호출하는 쪽에서 수정하지 않는다.
+    (필터/정렬/추천 결과는 모두 새 DataFrame을 만든다)
+    메모리 압축 효과와 재실행 비용은 tests/test_data_utils.py의 bench 마커 테스트로 잰다.
+    """
+    start = time.perf_counter()
     product_df = load_products_from_athena()
+    catalog_version = register_catalog_products(product_df)
+
+    df = normalize_columns(make_df(product_df))
+    # 중복 상품 군집 (오프라인 dedup-build 결과, 없으면 상품마다 단독 군집)
+    df = attach_dup_clusters(df)
+    # 임베딩 군집 (오프라인 cluster-build 결과, 없으면 cluster_id = -1)
+    df = attach_product_clusters(df)
+
+    # 컬럼 타입 압축 (category / 작은 정수 / Arrow 문자열, 벡터 컬럼 제거)
+    df = compact_catalog(df)
+
+    df.attrs["catalog_version"] = catalog_version
+    _register_catalog_indexes(df)
+    logger.info(
+        "화면용 카탈로그 준비: %s개 상품, %.2f초 (버전 %s)",
+        f"{len(df):,}",
+        time.perf_counter() - start,
+        catalog_version,
+    )
+    return df
 
-    try:
-        df = make_df(product_df)
-    except Exception:
-        df = product_df.copy()
 
-    df = normalize_columns(df)
-    return df
+def _register_catalog_indexes(df: pd.DataFrame) -> Tuple[FilterIndex, SortIndex]:
+    """
+    화면용 카탈로그의 필터 인덱스 / 정렬 순서 생성 (카탈로그 버전당 1회)
+
+    필터: sub_category / skin_type 값별 비트맵 + score / price 정렬 배열.
+    정렬: 정렬 옵션 5개 + 인기 상품 순서의 행 번호 순열과 행별 순위.
+    DataFrame 객체에 묶어 두므로 같은 객체가 들어올 때만 쓰인다
+    (필터 결과는 filter_catalog()가 돌려준 카탈로그 행 위치로 정렬 순서를 쓴다).
+    상호작용별 필터/정렬 시간은 tests/test_data_utils.py의 bench 마커 테스트로 잰다.
+    """
+    start = time.perf_counter()
+    filter_index = FilterIndex(df)
+    sort_index = SortIndex(df)
+    with _catalog_lock:
+        # 캐시에서 밀려난 카탈로그의 인덱스는 정리
+        for version in [v for v, entry in _catalog_indexes.items() if entry[0]() is None]:
+            del _catalog_indexes[version]
+        _catalog_indexes[df.attrs["catalog_version"]] = (
+            weakref.ref(df),
+            filter_index,
+            sort_index,
+        )
+    logger.info(
+        "필터/정렬 인덱스 생성: %s, %.0fms",
+        df.attrs["catalog_version"],
+        (time.perf_counter() - start) * 1000,
+    )
+    return filter_index, sort_index
+
+
+def _catalog_entry(df: pd.DataFrame) -> Optional[tuple]:
+    with _catalog_lock:
+        entry = _catalog_indexes.get(df.attrs.get("catalog_version"))
+    if entry is None or entry[0]() is not df:
+        return None
+    return entry
+
+
+def catalog_filter_index(df: pd.DataFrame) -> Optional[FilterIndex]:
+    """df가 화면용 카탈로그 그 자체이면 필터 인덱스, 아니면 None"""
+    entry = _catalog_entry(df)
+    return None if entry is None else entry[1]
+
+
+def catalog_sort_index(df: pd.DataFrame) -> Optional[SortIndex]:
+    """df가 화면용 카탈로그 그 자체이면 미리 계산한 정렬 순서, 아니면 None"""
+    entry = _catalog_entry(df)
+    return None if entry is None else entry[2]
+
+
+def prepare_dataframe() -> pd.DataFrame:
+    """
+    메인 DataFrame 준비 (5분 공유 캐시)
+
+    재실행(rerun)마다 make_df / normalize_columns를 다시 하지 않고
+    공유 캐시의 DataFrame을 그대로 돌려준다. df.attrs["catalog_version"]에 버전이 들어 있다.
+    """
+    return _prepared_catalog(_artifact_stamp())
+
+
+def invalidate_prepared_catalog() -> str:
+    """
+    카탈로그 갱신 훅 - Athena 원본/화면용 카탈로그 캐시를 비우고 카탈로그 버전을 올린다.
+
+    임베딩 저장소 등 버전 단위 캐시도 다음 요청 시 다시 만들어진다.
+    사이드바의 관리자용 "카탈로그 새로고침" 버튼(CATALOG_ADMIN 설정)에서 호출한다.
+
+    Returns:
+        새 카탈로그 버전 (데이터를 다시 읽으면 데이터 지문 버전으로 확정)
+    """
+    load_products_from_athena.clear()
+    _prepared_catalog.clear()
+    return refresh_embedding_store()
 
 
 def get_options(df: pd.DataFrame) -> tuple:
@@ -163,7 +271,7 @@ def get_options(df: pd.DataFrame) -> tuple:
     return skin_options, product_options
 
 
-def apply_filters(
+def filter_rows(
     df: pd.DataFrame,
     selected_sub_cat: list,
     selected_skin: list,
@@ -171,49 +279,99 @@ def apply_filters(
     max_rating: float,
     min_price: int,
     max_price: int,
-    search_text: str = "",
-) -> pd.DataFrame:
-    """필터 조건 적용"""
-    filtered_df = df.copy()
+) -> Optional[np.ndarray]:
+    """
+    사이드바 조건(카테고리/피부 타입/평점/가격)을 통과하는 행 위치 (오름차순, df 복사 없음)
+
+    화면용 카탈로그는 필터 인덱스로, 그 밖의 DataFrame(군집 상품 등)은 컬럼 비교로 계산한다.
+
+    Returns:
+        행 위치 배열, 모든 행이 통과하면 None
+    """
+    index = catalog_filter_index(df)
+    if index is not None:
+        return index.rows(
+            ProductFilter(
+                sub_categories=selected_sub_cat or None,
+                skin_types=selected_skin or None,
+                min_rating=min_rating,
+                max_rating=max_rating,
+                min_price=min_price,
+                max_price=max_price,
+            )
+        )
 
-    # 카테고리 필터
+    masks = []
+    # 카테고리 / 피부 타입 필터 (category 컬럼은 코드 비교)
     if selected_sub_cat:
-        filtered_df = filtered_df[filtered_df["sub_category"].isin(selected_sub_cat)]
-
-    # 피부 타입 필터
+        masks.append(isin_codes(df["sub_category"], selected_sub_cat))
     if selected_skin:
-        filtered_df = filtered_df[filtered_df["skin_type"].isin(selected_skin)]
+        masks.append(isin_codes(df["skin_type"], selected_skin))
 
-    # 평점 필터
-    filtered_df = filtered_df[
-        (filtered_df["score"] >= min_rating) & (filtered_df["score"] <= max_rating)
-    ]
+    # 평점 / 가격 필터
+    score = df["score"].to_numpy()
+    price = df["price"].to_numpy()
+    masks.append((score >= min_rating) & (score <= max_rating))
+    masks.append((price >= min_price) & (price <= max_price))
 
-    # 가격 필터
-    filtered_df = filtered_df[
-        (filtered_df["price"] >= min_price) & (filtered_df["price"] <= max_price)
-    ]
+    admitted = np.logical_and.reduce(masks)
+    return None if admitted.all() else np.flatnonzero(admitted)
+
+
+def filter_catalog(
+    df: pd.DataFrame,
+    selected_sub_cat: list,
+    selected_skin: list,
+    min_rating: float,
+    max_rating: float,
+    min_price: int,
+    max_price: int,
+    search_text: str = "",
+    collapse_dups: bool = True,
+) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """
+    필터 조건 적용 + 결과 행이 df의 몇 번째 행인지
+
+    collapse_dups=True이면 같은 상품의 다른 product_id(dup_cluster)는
+    리뷰가 가장 많은 하나만 남긴다.
+
+    Returns:
+        (필터 결과 - 모든 행이 통과해도 df와 다른 새 DataFrame,
+         df 기준 행 위치 - sort_products(catalog=df, positions=)에 넘기면 정렬 없이 순서를 얻음.
+         df가 화면용 카탈로그가 아니거나 인덱스가 중복이면 None)
+    """
+    rows = filter_rows(
+        df, selected_sub_cat, selected_skin, min_rating, max_rating, min_price, max_price
+    )
+    positions = np.arange(len(df)) if rows is None else rows
+    if catalog_sort_index(df) is None or not df.index.is_unique:
+        positions = None
+    # 통과한 행만 꺼냄 (전체 통과여도 공유 캐시 객체 대신 얕은 복사본)
+    filtered_df = df.copy(deep=False) if rows is None else df.take(rows)
 
     # 컬럼 보정
+    fixes = {}
     if (
         "score" not in filtered_df.columns
         and "avg_rating_with_text" in filtered_df.columns
     ):
-        filtered_df["score"] = filtered_df["avg_rating_with_text"]
+        fixes["score"] = filtered_df["avg_rating_with_text"]
 
     if "image_url" not in filtered_df.columns:
-        filtered_df["image_url"] = None
+        fixes["image_url"] = None
     if "badge" not in filtered_df.columns:
-        filtered_df["badge"] = ""
+        fixes["badge"] = ""
     if "category_path_norm" not in filtered_df.columns:
-        filtered_df["category_path_norm"] = (
+        fixes["category_path_norm"] = (
             filtered_df["category"] if "category" in filtered_df.columns else ""
         )
+    if fixes:
+        filtered_df = filtered_df.assign(**fixes)
 
     # 키워드/제품명 검색
     if search_text:
         s = search_text.strip()
-        filtered_df = filtered_df[
+        matched = (
             filtered_df["product_name"]
             .astype(str)
             .str.contains(s, case=False, na=False, regex=False)
@@ -221,55 +379,92 @@ def apply_filters(
             | filtered_df.get("top_keywords", pd.Series([""] * len(filtered_df)))
             .astype(str)
             .str.contains(s, case=False, na=False, regex=False)
-        ]
+        ).to_numpy()
+        filtered_df = filtered_df[matched]
+        if positions is not None:
+            positions = positions[matched]
 
-    return filtered_df
+    if collapse_dups:
+        collapsed = collapse_duplicates(filtered_df)
+        if positions is not None and collapsed is not filtered_df:
+            positions = positions[filtered_df.index.isin(collapsed.index)]
+        filtered_df = collapsed
 
+    return filtered_df, positions
 
-def sort_products(df: pd.DataFrame, sort_option: str) -> pd.DataFrame:
-    """정렬 옵션 적용"""
-    df = df.copy()
 
-    # 유사도/추천점수 기본값
-    if "reco_score" not in df.columns:
-        df["reco_score"] = 0.0
-    if "similarity" not in df.columns:
-        df["similarity"] = 0.0
+def apply_filters(
+    df: pd.DataFrame,
+    selected_sub_cat: list,
+    selected_skin: list,
+    min_rating: float,
+    max_rating: float,
+    min_price: int,
+    max_price: int,
+    search_text: str = "",
+    collapse_dups: bool = True,
+) -> pd.DataFrame:
+    """필터 조건 적용 (행 위치가 필요 없을 때, 항상 새 DataFrame) - filter_catalog() 참고"""
+    return filter_catalog(
+        df,
+        selected_sub_cat,
+        selected_skin,
+        min_rating,
+        max_rating,
+        min_price,
+        max_price,
+        search_text=search_text,
+        collapse_dups=collapse_dups,
+    )[0]
+
+
+def sort_products(
+    df: pd.DataFrame,
+    sort_option: str,
+    catalog: Optional[pd.DataFrame] = None,
+    positions: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    정렬 옵션 적용
+
+    화면용 카탈로그 자체, 또는 filter_catalog(catalog, ...)의 결과와 행 위치를 받으면
+    카탈로그 버전별로 미리 계산한 순서에서 해당 행만 골라 순서를 정하고(정렬 없음),
+    그 밖의 DataFrame은 sort_values로 정렬한다.
+
+    Args:
+        catalog / positions: df가 화면용 카탈로그에서 고른 행이면 그 카탈로그와 행 위치
+    """
+    # 유사도/추천점수 기본값 (assign은 원본을 바꾸지 않음)
+    defaults = {c: 0.0 for c in ("reco_score", "similarity") if c not in df.columns}
+
+    sort_index = catalog_sort_index(df)
+    if sort_index is not None:
+        positions = None
+    elif catalog is not None and positions is not None and len(positions) == len(df):
+        sort_index = catalog_sort_index(catalog)
+    option = sort_option if sort_option in SORT_KEYS else DEFAULT_SORT
+    if sort_index is not None and sort_index.has(option):
+        order = sort_index.order(option, positions)
+        rows = order if positions is None else positions[order]
+        return df.take(order).assign(**defaults, badge_rank=sort_index.badge_rank[rows])
+
+    by, ascending = sort_keys(sort_option)
+    return df.assign(**defaults, badge_rank=badge_rank(df)).sort_values(
+        by=by, ascending=ascending
+    )
 
-    # 뱃지 순서
-    badge_order = {"BEST": 0, "추천": 1, "": 2}
-    df["badge_rank"] = df.get("badge", "").map(badge_order).fillna(2)
 
-    if sort_option == "추천순":
-        df = df.sort_values(
-            by=["badge_rank", "score", "total_reviews"],
-            ascending=[True, False, False],
-        )
-    elif sort_option == "평점 높은 순":
-        df = df.sort_values(
-            by=["score", "total_reviews"],
-            ascending=[False, False],
-        )
-    elif sort_option == "리뷰 많은 순":
-        df = df.sort_values(
-            by=["total_reviews", "score"],
-            ascending=[False, False],
-        )
-    elif sort_option == "가격 낮은 순":
-        df = df.sort_values(
-            by=["price", "score"],
-            ascending=[True, False],
-        )
-    elif sort_option == "가격 높은 순":
-        df = df.sort_values(
-            by=["price", "score"],
-            ascending=[False, False],
-        )
-    else:
-        # 기본 정렬
-        df = df.sort_values(
-            by=["badge_rank", "score", "total_reviews"],
-            ascending=[True, False, False],
-        )
+def popular_products(df: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """
+    인기 상품 상위 n개 (리뷰 많은 순 → 평점 높은 순, 인덱스 초기화)
 
-    return df
+    화면용 카탈로그는 미리 계산한 순서의 앞부분만 꺼낸다.
+    """
+    sort_index = catalog_sort_index(df)
+    if sort_index is not None and sort_index.has(POPULAR):
+        return df.take(sort_index.top(POPULAR, n)).reset_index(drop=True)
+
+    by, ascending = popular_columns(df)
+    if not by:
+        return df.head(n).reset_index(drop=True)
+    return df.sort_values(by=by, ascending=ascending).head(n).reset_index(drop=True)
@@ -6,6 +6,12 @@ import streamlit as st
 import re
 import ast
 
+from services.product_filter import (
+    normalize_category_paths,
+    rating_scores,
+    split_category_paths,
+)
+
 
 @st.cache_data
 def load_raw_df(parquet_root: Path) -> pd.DataFrame:
@@ -96,132 +102,119 @@ def rating_trend(
     return trend_df
 
 
-def make_df(df: pd.DataFrame) -> pd.DataFrame:
-    rating_df = df.groupby("product_id", as_index=False).agg(
-        {
-            "rating_1": "sum",
-            "rating_2": "sum",
-            "rating_3": "sum",
-            "rating_4": "sum",
-            "rating_5": "sum",
-            "total_reviews": "sum",
-        }
-    )
-
-    # 상품 평점
-    rating_df["score"] = (
-        rating_df["rating_1"] * 1
-        + rating_df["rating_2"] * 2
-        + rating_df["rating_3"] * 3
-        + rating_df["rating_4"] * 4
-        + rating_df["rating_5"] * 5
-    ) / rating_df["total_reviews"]
-
-    rating_df["score"] = rating_df["score"].round(2)
-    rating_df["score"] = rating_df["score"].fillna(0)
-
-    image_url = f"https://tr.rbxcdn.com/180DAY-981c49e917ba903009633ed32b3d0ef7/420/420/Hat/Webp/noFilter"
-
-    # 추천 뱃지
-    def calc_badge(score, total_reviews):
-        if total_reviews >= 200:
-            if score >= 4.9:
-                return "BEST"
-            elif score >= 4.7:
-                return "추천"
-        return ""
-
-    rating_df["badge"] = rating_df.apply(
-        lambda x: calc_badge(x["score"], x["total_reviews"]), axis=1
-    )
-
-    # 카테고리 정규화
-    main_cats = ["스킨케어", "클렌징/필링", "선케어/태닝", "메이크업"]
-
-    def norm_cat(path):
-        if not isinstance(path, str):
-            return ""
+IMAGE_URL = "https://tr.rbxcdn.com/180DAY-981c49e917ba903009633ed32b3d0ef7/420/420/Hat/Webp/noFilter"
+
+# 화면용 상품 컬럼 (make_df 결과 순서)
+PRODUCT_COLUMNS = [
+    "product_id",
+    "product_name",
+    "brand",
+    "price",
+    "image_url",
+    "product_url",
+    "representative_review_id_roberta",
+    "total_reviews",
+    "top_keywords",
+    "category",
+    "category_path_norm",
+    "main_category",
+    "middle_category",
+    "sub_category",
+    "skin_type",
+]
+
+# Athena 원본의 임베딩별 대표 리뷰 ID (앞에 있는 컬럼 우선)
+REPRESENTATIVE_REVIEW_COLUMNS = [
+    "representative_review_id_roberta_sentiment",
+    "representative_review_id_roberta_semantic",
+]
+
+
+def list_mask(values: pd.Series) -> np.ndarray:
+    """list / ndarray 값인 행 bool 마스크"""
+    if values.dtype != object:
+        return np.zeros(len(values), dtype=bool)
+    return values.map(type).isin([list, np.ndarray]).to_numpy()
+
+
+def join_lists(values: pd.Series, sep: str = ", ") -> pd.Series:
+    """list / ndarray 값만 문자열로 합친 Series (그 외 행은 그대로)"""
+    mask = list_mask(values)
+    if not mask.any():
+        return values
+    values = values.copy()
+    values[mask] = values[mask].map(lambda x: sep.join(map(str, x)))
+    return values
+
+
+def representative_review_ids(df: pd.DataFrame) -> pd.Series:
+    """화면용 대표 리뷰 ID: 임베딩별 컬럼 중 먼저 있는 것 (없으면 결측)"""
+    for col in REPRESENTATIVE_REVIEW_COLUMNS:
+        if col in df.columns:
+            return df[col]
+    return pd.Series(np.nan, index=df.index)
+
+
+def _make_hashable_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    unhashable 값(list / ndarray / dict / set)이 있는 컬럼을 문자열로 변환
+
+    object 컬럼만 검사하고, 해당 컬럼에서는 list/ndarray → ", " 결합,
+    그 외 값 → str (결측은 "")
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        types = df[col].map(type)
+        if not types.isin([list, np.ndarray, dict, set]).any():
+            continue
+        values = df[col]
+        lists = types.isin([list, np.ndarray]).to_numpy()
+        converted = values.where(values.notna(), "").astype(str)
+        converted[lists] = values[lists].map(lambda x: ", ".join(map(str, x)))
+        df[col] = converted
+    return df
 
-        parts = [p.strip() for p in path.split(">")]
 
-        for main in main_cats:
-            if main in parts:
-                idx = parts.index(main)
-                return " > ".join(parts[idx:])
-        return ""
-
-    def split_category(path: str):
-        if not isinstance(path, str):
-            return "", "", ""
-
-        parts = [p.strip() for p in path.split(">")]
-
-        main = parts[0] if len(parts) >= 1 else ""
-        middle = parts[1] if len(parts) >= 2 else ""
-        sub = parts[-1] if len(parts) >= 3 else parts[-1] if parts else ""
-
-        return main, middle, sub
-
-    # unhashable값들 문자열 변환
-    def _make_hashable_df(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        for col in df.columns:
-            if (
-                df[col]
-                .apply(lambda x: isinstance(x, (list, np.ndarray, dict, set)))
-                .any()
-            ):
-                df[col] = df[col].apply(
-                    lambda x: (
-                        ", ".join(map(str, x))
-                        if isinstance(x, (list, np.ndarray))
-                        else (str(x) if pd.notna(x) else "")
-                    )
-                )
-        return df
+def make_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Athena 상품 원본 → 화면용 상품 DataFrame (product_id당 1행)
+
+    카테고리 경로 분리는 고유 경로마다 한 번만 계산해 매핑하고,
+    평점/뱃지는 컬럼 연산으로 계산한다.
+    """
+    rating_cols = ["rating_1", "rating_2", "rating_3", "rating_4", "rating_5"]
+    rating_df = df.groupby("product_id", as_index=False)[
+        rating_cols + ["total_reviews"]
+    ].sum()
+
+    # 상품 평점 (추천 사전 필터의 평점 조건도 같은 함수로 계산)
+    rating_df["score"] = rating_scores(rating_df)
+
+    # 추천 뱃지 (리뷰 200개 이상: 4.9 이상 BEST, 4.7 이상 추천)
+    enough = rating_df["total_reviews"] >= 200
+    rating_df["badge"] = np.select(
+        [enough & (rating_df["score"] >= 4.9), enough & (rating_df["score"] >= 4.7)],
+        ["BEST", "추천"],
+        default="",
+    ).astype(object)
 
     df = df.copy()
-    df["category_path_norm"] = df["category_path"].apply(norm_cat)
-    df[["main_category", "middle_category", "sub_category"]] = (
-        df["category_path_norm"].apply(split_category).apply(pd.Series)
-    )
-    df["image_url"] = image_url
-    df["top_keywords"] = df["top_keywords"].apply(
-        lambda x: (
-            ", ".join(x)
-            if isinstance(x, (list, np.ndarray))
-            else (x if isinstance(x, str) else "")
-        )
+    df["category_path_norm"] = normalize_category_paths(df["category_path"])
+    df[["main_category", "middle_category", "sub_category"]] = split_category_paths(
+        df["category_path_norm"]
     )
+    df["image_url"] = IMAGE_URL
+    if "representative_review_id_roberta" not in df.columns:
+        df["representative_review_id_roberta"] = representative_review_ids(df)
 
-    product_df = (
-        df[
-            [
-                "product_id",
-                "product_name",
-                "brand",
-                "price",
-                "image_url",
-                "product_url",
-                "representative_review_id_roberta",
-                "total_reviews",
-                "top_keywords",
-                "category",
-                "category_path_norm",
-                "main_category",
-                "middle_category",
-                "sub_category",
-                "skin_type",
-            ]
-        ]
-        .drop_duplicates("product_id")
-        .copy()
-    )
+    # 키워드: 배열은 ", "로 결합, 문자열은 그대로, 그 외는 ""
+    keywords = join_lists(df["top_keywords"])
+    df["top_keywords"] = keywords.where(keywords.map(type).eq(str), "").infer_objects()
+
+    product_df = df[PRODUCT_COLUMNS].drop_duplicates("product_id").copy()
 
     fin_df = product_df.merge(
         rating_df[["product_id", "score", "badge"]], on="product_id", how="left"
     )
 
-    fin_df = _make_hashable_df(fin_df)
-
-    return fin_df
+    return _make_hashable_df(fin_df)